@@ -18,16 +18,101 @@ module.
 from abc import ABCMeta, abstractmethod
 
 
+###############################################################################
+# `EventType` Class.
+###############################################################################
+class EventType(type):
+    """ Metaclass of events, supporting compact events with declared fields.
+
+    An event class may declare the names of its attributes in a ``__fields__``
+    tuple. The fields declared by an event class and its bases are stored in
+    ``__slots__`` rather than in an instance dict, and a constructor accepting
+    the fields as arguments (defaulting to None) is generated, unless the class
+    defines ``__slots__`` or ``__init__`` itself. Abstract event classes meant
+    to be combined by multiple inheritance should define ``__slots__ = ()``, so
+    that their fields are stored by their concrete subclasses.
+
+    Events with declared fields still accept extra attributes, which are
+    stored in the instance dict. As `BaseEvent` already has an instance dict
+    and weak references, ``'__dict__'`` and ``'__weakref__'`` are dropped
+    from the ``__slots__`` of its subclasses.
+
+    An event class mixing in a class with another metaclass, such as a
+    ``HasTraits`` subclass, must use a metaclass deriving from both::
+
+        class TraitsEventType(EventType, MetaHasTraits):
+            pass
+
+        class TraitsEvent(BaseEvent, HasTraits):
+            __metaclass__ = TraitsEventType
+    """
+    def __new__(mcs, name, bases, namespace):
+        slots = namespace.get('__slots__')
+        if slots is not None and not isinstance(slots, basestring):
+            inherited = []
+            if any([getattr(base, '__dictoffset__', 0) for base in bases]):
+                inherited.append('__dict__')
+            if any([getattr(base, '__weakrefoffset__', 0)
+                    for base in bases]):
+                inherited.append('__weakref__')
+            if inherited:
+                namespace['__slots__'] = tuple([slot for slot in slots
+                                                if slot not in inherited])
+        fields = []
+        for base in reversed(bases):
+            for field in getattr(base, '_all_fields', ()):
+                if field not in fields:
+                    fields.append(field)
+        for field in namespace.get('__fields__', ()):
+            if field not in fields:
+                fields.append(field)
+        namespace['_all_fields'] = tuple(fields)
+        if fields:
+            if '__slots__' not in namespace:
+                slotted = set()
+                for base in bases:
+                    for cls in base.__mro__:
+                        slotted.update(cls.__dict__.get('__slots__', ()))
+                namespace['__slots__'] = tuple([field for field in fields
+                                                if field not in slotted])
+            if '__init__' not in namespace:
+                namespace['__init__'] = _make_init(name, fields)
+        return super(EventType, mcs).__new__(mcs, name, bases, namespace)
+
+
+def _make_init(name, fields):
+    """ Generate the constructor of an event class with declared fields.
+    """
+    lines = ['def __init__(self, source=None, {0}, **kwargs):'.format(
+                ', '.join(['{0}=None'.format(field) for field in fields])),
+             '    self.source = [] if source is None else source',
+             '    self._handled = False']
+    lines.extend(['    self.{0} = {0}'.format(field) for field in fields])
+    lines.extend(['    if kwargs:',
+                  '        self.__dict__.update(kwargs)'])
+    namespace = {}
+    exec '\n'.join(lines) in namespace
+    init = namespace['__init__']
+    init.__doc__ = 'Create a {0} with the fields: {1}.'.format(name,
+                                                        ', '.join(fields))
+    return init
+
+
 ###############################################################################
 # `BaseEvent` Class.
 ###############################################################################
 class BaseEvent(object):
     """ Base class for all events.
+
+    Attributes of an event are stored in an instance dict, unless they are
+    declared as ``__fields__`` (see `EventType`).
     """
+    __metaclass__ = EventType
+    __slots__ = ('source', '_handled', '__dict__', '__weakref__')
 
     def __init__(self, source=None, **kwargs):
         # The source of the event.
-        kwargs['source'] = [] if source is None else source
+        self.source = [] if source is None else source
         self.__dict__.update(**kwargs)
         
         # Whether the event has been handled by a listener.
@@ -38,6 +123,28 @@ class BaseEvent(object):
         """
         self._handled = True
 
+    def __getstate__(self):
+        """ Return the state of the event for pickling, as a tuple of its
+        instance dict and a dict of the values of its slots.
+        """
+        slots = {}
+        for name in _slot_names(type(self)):
+            try:
+                slots[name] = getattr(self, name)
+            except AttributeError:
+                # Unset slot.
+                pass
+        return self.__dict__.copy(), slots
+
+    def __setstate__(self, state):
+        """ Restore the state returned by `__getstate__`.
+        """
+        attrs, slots = state
+        if attrs:
+            self.__dict__.update(attrs)
+        for name, value in slots.iteritems():
+            setattr(self, name, value)
+
     def pre_emit(self):
         """ Called before emitting an event.
 
@@ -52,6 +159,21 @@ class BaseEvent(object):
         """
         pass
 
+
+def _slot_names(cls):
+    """ The names of the slots of a class and its bases, except the instance
+    dict and weak reference slots.
+    """
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get('__slots__', ())
+        if isinstance(slots, basestring):
+            slots = (slots,)
+        for name in slots:
+            if name not in ('__dict__', '__weakref__') and name not in names:
+                names.append(name)
+    return names
+
 ###############################################################################
 # `BaseEventManager` Class.
 ###############################################################################
@@ -96,6 +218,41 @@ class BaseEventManager(object):
         """
         raise NotImplementedError
 
+    def connect_many(self, cls, listeners, filter=None, priority=0):
+        """ Add many listeners for the event at once.
+
+        Implementations may override this to add the listeners in a single
+        pass. The default implementation connects each listener separately.
+
+        Parameters:
+        -----------
+        cls : class
+            The class of events for which the listeners are registered.
+        listeners : iterable
+            The listeners, each either a callable, connected with the
+            ``filter`` and ``priority`` arguments, or a ``(func, filter)`` or
+            ``(func, filter, priority)`` tuple.
+        filter : dict
+            The filter of the listeners given as callables.
+        priority : int
+            The priority of the listeners not given with a priority.
+        """
+        for listener in listeners:
+            if isinstance(listener, tuple):
+                func, lfilter, lpriority = (listener + (priority,))[:3]
+                self.connect(cls, func, lfilter, lpriority)
+            else:
+                self.connect(cls, listener, filter, priority)
+
+    def disconnect_many(self, cls, funcs):
+        """ Disconnect many listeners at once.
+
+        Implementations may override this to remove the listeners in a single
+        pass. The default implementation disconnects each listener separately.
+        """
+        for func in funcs:
+            self.disconnect(cls, func)
+
     @abstractmethod
     def emit(self, evt, block=True):
         """ Notifies all listeners about the event with the specified arguments.
@@ -106,15 +263,32 @@ class BaseEventManager(object):
             The BaseEvent instance to emit.
         block : bool
             Whether to block the call until the event handling is finished.
-            If block is False, the event will be emitted in a separate thread
-            and the thread will be returned, so you can later query its status
-            or do ``wait()`` on the thread.
+            If block is False, the event will be emitted asynchronously and
+            a handle will be returned, so you can later query its status or
+            do ``wait()`` on the handle.
 
         Note: Listeners of superclasses of the event are also called.
         BaseEvent listener will also be notified about any derived class events.
         """
         raise NotImplementedError
 
+    def emit_many(self, events, block=True):
+        """ Notifies all listeners about each of the events in turn.
+
+        Implementations may override this to resolve listeners once per event
+        class for the whole batch. The default implementation emits each event
+        separately.
+
+        Parameters:
+        -----------
+        events : iterable of BaseEvent instances
+            The events to emit, in order.
+        block : bool
+            Whether to block the call until the event handling is finished.
+        """
+        for evt in events:
+            self.emit(evt, block)
+
     @abstractmethod
     def disable(self, cls):
         """ Disable the event from generating notifications.
@@ -7,6 +7,18 @@
 
 # Local imports
 from .abstract_event_manager import BaseEvent, BaseEventManager
+from .coalescing import Coalescer
+from .error_policies import (ErrorPolicy, LogPolicy, LogOncePolicy,
+    SampledLogPolicy, CountPolicy, DisconnectPolicy, RaisePolicy,
+    ListenerFailures)
 from .event_manager import EventManager
+from .executors import (BoundedExecutor, OrderedExecutor, EventFuture,
+    QueueFullError, shutdown_at_exit)
+from .filters import FilterOperator, In, Prefix, Range, NotEqual
+from .last_value_cache import LastValueCache
+from .profiling import ListenerStats
 from .progress_events import (ProgressEvent, ProgressStartEvent,
     ProgressStepEvent, ProgressEndEvent, ProgressManager)
+from .scheduler import Scheduler, ScheduledCall
+from .topics import TopicRegistry, TopicSubscriber
+from .tracing import DispatchTracer, ChromeTraceExporter
@@ -0,0 +1,406 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" This module defines an event manager for asyncio applications.
+
+The main class of the module is the `AsyncEventManager`, whose listeners may
+be coroutine functions and whose ``emit()`` returns a future which can be
+awaited. It requires ``asyncio``, or its ``trollius`` backport, and is
+therefore not imported by the `encore.events.api` module.
+"""
+
+# Standard library imports.
+import functools
+import itertools
+import logging
+import traceback
+
+try:
+    import asyncio
+except ImportError:
+    import trollius as asyncio
+
+# Local imports.
+from .event_manager import EventManager
+
+# Logging.
+logger = logging.getLogger(__name__)
+
+
+def _is_awaitable(result):
+    """ Whether the result of a listener is a coroutine or a future to run on
+    the event loop.
+    """
+    return asyncio.iscoroutine(result) or isinstance(result, asyncio.Future)
+
+
+###############################################################################
+# `AsyncDispatch` Private Class.
+###############################################################################
+class AsyncDispatch(object):
+    """ The state of the delivery of an event to groups of listeners.
+
+    The listeners of a group are called together and the next group is only
+    called once the coroutines returned by the listeners of the group are
+    done.
+    """
+    def __init__(self, event_manager, evt, groups, future, loop):
+        self.event_manager = event_manager
+        self.evt = evt
+        self.groups = groups
+        self.future = future
+        self.loop = loop
+        self._index = 0
+        self._pending = 0
+
+    def step(self):
+        """ Call the groups of listeners until one returns coroutines.
+        """
+        evt = self.evt
+        groups = self.groups
+        while self._index < len(groups):
+            if self.future.cancelled():
+                return
+            group = groups[self._index]
+            self._index += 1
+            tasks = []
+            for linfo in group:
+                if linfo[-1].executor is not None:
+                    try:
+                        self.event_manager._submit_delivery(evt, linfo[-1],
+                                                            self.loop)
+                    except BaseException as e:
+                        # Raised by the error policy for a refused submit.
+                        self._fail(e)
+                        return
+                    continue
+                try:
+                    result = linfo[-1].dispatch(evt)
+                except BaseException as e:
+                    if not self._listener_error(linfo[-1], e):
+                        return
+                    continue
+                if _is_awaitable(result):
+                    tasks.append((linfo[-1], asyncio.ensure_future(result,
+                                                            loop=self.loop)))
+            if tasks:
+                self._pending = len(tasks)
+                for notifier, task in tasks:
+                    task.add_done_callback(self._make_done(notifier))
+                return
+            if self._handled(group):
+                break
+        self._finish()
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+    def _make_done(self, notifier):
+        def done(task):
+            if self.future.done():
+                # Failed or cancelled.
+                return
+            if not task.cancelled() and task.exception() is not None:
+                exc = task.exception()
+                if not self._listener_error(notifier, exc,
+                        ''.join(traceback.format_exception_only(type(exc),
+                                                                exc))):
+                    return
+            self._pending -= 1
+            if self._pending == 0:
+                if self._handled(self.groups[self._index-1]):
+                    self._finish()
+                else:
+                    self.step()
+        return done
+
+    def _listener_error(self, notifier, exc, tb=None):
+        """ Handle the exception of a listener according to the error policy.
+
+        Returns whether the delivery goes on. If the error policy raises an
+        exception, the delivery is stopped and the exception is set on the
+        future, rather than raised in the event loop.
+        """
+        try:
+            self.event_manager._listener_error(self.evt, notifier, exc, tb)
+        except BaseException as e:
+            self._fail(e)
+            return False
+        return True
+
+    def _fail(self, exc):
+        """ Stop the delivery and set the exception on the future.
+        """
+        self.evt.post_emit()
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+    def _handled(self, group):
+        evt = self.evt
+        if evt._handled:
+            logger.info('Event: {0} handled by listeners: {1}'.format(
+                        evt, [linfo[-1]() for linfo in group]))
+            return True
+        return False
+
+    def _finish(self):
+        self.evt.post_emit()
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+###############################################################################
+# `AsyncEventManager` Class.
+###############################################################################
+class AsyncEventManager(EventManager):
+    """ An event manager whose listeners may be coroutine functions.
+
+    Registration, filtering, priorities and subclass propagation are the same
+    as for the `EventManager`. Listeners may return a coroutine (or future),
+    which is run on the event loop before the next listeners are notified.
+    ``emit()`` returns a future which is done when all the listeners are::
+
+        yield From(event_manager.emit(evt))   # trollius
+        await event_manager.emit(evt)         # asyncio
+
+    By default listeners are notified sequentially in order of priority. With
+    ``concurrent=True``, the coroutines of listeners of the same priority are
+    run concurrently, and listeners of lower priority are notified when they
+    are all done. An event marked as handled is then not delivered to lower
+    priority listeners, but is delivered to all the listeners of the priority
+    of the listener which marked it.
+
+    Listeners connected with an executor, or with ``coalesce_by``, are
+    called by the executor (or the scheduler thread), and the coroutines they
+    return are run on the event loop. Delayed emits are made on the event
+    loop.
+
+    Last value caches are supported, and the coroutines of the listeners
+    notified of the cached events on connection are run in turn. Dispatch
+    profiling and tracing are not supported, as the listeners of concurrent
+    emits interleave on the event loop.
+    """
+    def __init__(self, loop=None, concurrent=False, error_policy=None):
+        """ Constructor.
+
+        Parameters:
+        -----------
+        loop : event loop
+            The event loop to run the coroutines of the listeners on. Defaults
+            to the current event loop when an event is emitted.
+        concurrent : bool
+            Whether to run the listeners of the same priority concurrently.
+        error_policy : ErrorPolicy
+            The policy handling the exceptions raised by listeners, see
+            `EventManager`.
+        """
+        super(AsyncEventManager, self).__init__(error_policy=error_policy)
+        self.loop = loop
+        self.concurrent = concurrent
+
+    def connect(self, cls, func, filter=None, priority=0, executor=None,
+                coalesce_by=None, window=0.1, batch=False, replay=False):
+        """ Add a listener for the event, see ``EventManager.connect()``.
+
+        With ``replay=True``, returns a future which is done when the listener
+        has been notified of the cached events, including its coroutines.
+        """
+        return super(AsyncEventManager, self).connect(cls, func, filter,
+            priority, executor, coalesce_by, window, batch, replay)
+
+    def emit(self, evt, block=True):
+        """ Notifies all listeners about the event and returns a future.
+
+        The future is done when all the listeners, including their coroutines,
+        are done. Listeners which do not return coroutines are called before
+        ``emit()`` returns, up to the first listener returning a coroutine.
+
+        Parameters:
+        -----------
+        evt : BaseEvent instance
+            The BaseEvent instance to emit.
+        block : bool
+            Unused, the returned future can be awaited to wait until the event
+            handling is finished.
+        """
+        return self._emit(evt, self._get_loop())
+
+    def emit_many(self, events, block=True):
+        """ Notifies all listeners about each of the events in turn.
+
+        Returns a future which is done when all the events have been handled.
+        Each event is emitted once the previous one has been handled. If the
+        handling of an event fails, the following events are not emitted and
+        the exception is set on the returned future.
+        """
+        loop = self._get_loop()
+        future = asyncio.Future(loop=loop)
+        events = iter(events)
+        def failed(emitted):
+            if future.done():
+                return True
+            if emitted.cancelled():
+                future.cancel()
+                return True
+            if emitted.exception() is not None:
+                future.set_exception(emitted.exception())
+                return True
+            return False
+        def emit_next(previous=None):
+            if previous is not None and failed(previous):
+                return
+            for evt in events:
+                emitted = self._emit(evt, loop)
+                if not emitted.done():
+                    emitted.add_done_callback(emit_next)
+                    return
+                if failed(emitted):
+                    return
+            if not future.done():
+                future.set_result(None)
+        emit_next()
+        return future
+
+    def emit_later(self, evt, delay, key=None, block=True):
+        """ Emit an event on the event loop after a delay.
+
+        The delay is kept by the scheduler thread, see
+        ``EventManager.emit_later()``, which then hands the emit over to the
+        event loop. ``block`` is unused.
+        """
+        scheduler = self._get_scheduler()
+        return scheduler.schedule(scheduler.timer() + delay,
+                                  self._emit_threadsafe,
+                                  (evt, self._get_loop()), key)
+
+    def emit_at(self, evt, when, key=None, block=True):
+        """ Emit an event on the event loop at the time ``when`` of the timer
+        of the scheduler.
+
+        See ``emit_later()`` for the other parameters.
+        """
+        return self._get_scheduler().schedule(when, self._emit_threadsafe,
+                                              (evt, self._get_loop()), key)
+
+    def enable_profiling(self, timer=None):
+        """ Not supported, raises NotImplementedError.
+        """
+        raise NotImplementedError('AsyncEventManager does not support '
+                                  'dispatch profiling')
+
+    def add_tracer(self, tracer):
+        """ Not supported, raises NotImplementedError.
+        """
+        raise NotImplementedError('AsyncEventManager does not support '
+                                  'dispatch tracing')
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+    def _emit(self, evt, loop):
+        """ Notify the listeners about the event, running their coroutines
+        on ``loop``, and return a future.
+        """
+        future = asyncio.Future(loop=loop)
+        plan = self._get_plan(type(evt))
+        if not plan.enabled:
+            future.set_result(None)
+            return future
+        if plan.caches:
+            self._store(evt, plan.caches)
+
+        listeners = self._plan_listeners(plan, evt)
+        if self.concurrent:
+            groups = [tuple(group) for priority, group in
+                      itertools.groupby(listeners, lambda linfo: linfo[0])]
+        else:
+            groups = [(linfo,) for linfo in listeners]
+
+        evt.pre_emit()
+        AsyncDispatch(self, evt, groups, future, loop).step()
+        return future
+
+    def _emit_threadsafe(self, evt, loop):
+        """ Emit an event on ``loop`` from another thread.
+        """
+        loop.call_soon_threadsafe(self._emit, evt, loop)
+
+    def _replay(self, cls, func, filter=None):
+        """ Notify a connected listener of the cached events of class ``cls``
+        matching the filter, each once the coroutine of the previous one is
+        done, and return a future done when they all are.
+        """
+        loop = self._get_loop()
+        future = asyncio.Future(loop=loop)
+        notifier, events = self._replayed(cls, func, filter)
+        events = iter(events)
+        def listener_error(evt, exc, tb=None):
+            try:
+                self._listener_error(evt, notifier, exc, tb)
+            except BaseException as e:
+                future.set_exception(e)
+                return False
+            return True
+        def replay_next(evt=None, task=None):
+            if (task is not None and not task.cancelled() and
+                    task.exception() is not None):
+                exc = task.exception()
+                if not listener_error(evt, exc,
+                        ''.join(traceback.format_exception_only(type(exc),
+                                                                exc))):
+                    return
+            for evt in events:
+                if notifier.executor is not None:
+                    self._submit_delivery(evt, notifier, loop)
+                    continue
+                try:
+                    result = notifier.dispatch(evt)
+                except BaseException as e:
+                    if not listener_error(evt, e):
+                        return
+                    continue
+                if _is_awaitable(result):
+                    asyncio.ensure_future(result, loop=loop).add_done_callback(
+                        functools.partial(replay_next, evt))
+                    return
+            future.set_result(None)
+        replay_next()
+        return future
+
+    def _deliver(self, evt, notifier, loop=None):
+        """ Notify a listener called by an executor about an event, and run
+        the coroutine it returns, if any, on ``loop``.
+
+        The delivery is done once the listener has returned, its coroutine
+        is not waited for, but its exception is handled by the error policy.
+        """
+        try:
+            result = notifier.dispatch(evt)
+        except BaseException as e:
+            self._delivery_error(evt, notifier, e)
+            return
+        if _is_awaitable(result):
+            if loop is None:
+                loop = self._get_loop()
+            loop.call_soon_threadsafe(self._run_delivery, evt, notifier,
+                                      result, loop)
+
+    def _run_delivery(self, evt, notifier, result, loop):
+        """ Run the coroutine of a listener called by an executor.
+        """
+        def done(task):
+            if not task.cancelled() and task.exception() is not None:
+                exc = task.exception()
+                self._delivery_error(evt, notifier, exc,
+                    ''.join(traceback.format_exception_only(type(exc), exc)))
+        asyncio.ensure_future(result, loop=loop).add_done_callback(done)
+
+    def _get_loop(self):
+        """ Return the event loop to run the listener coroutines on.
+        """
+        if self.loop is None:
+            return asyncio.get_event_loop()
+        return self.loop
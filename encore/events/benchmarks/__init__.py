@@ -0,0 +1,17 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" Performance benchmarks of the event dispatch system.
+
+Each module can be run as a script, e.g.::
+
+    python -m encore.events.benchmarks.emit_threads
+
+The `suite` module runs the emit benchmarks together and writes their
+results as JSON, to compare releases::
+
+    python -m encore.events.benchmarks.suite -o results.json
+"""
@@ -0,0 +1,90 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" Benchmark of emit throughput with concurrent emitter threads.
+
+A number of threads emit the same event class as fast as they can while,
+optionally, another thread keeps connecting and disconnecting listeners.
+Emitting never takes a lock, so the aggregate throughput should not degrade
+as emitter threads are added, even with connection churn.
+"""
+
+# Standard library imports.
+import optparse
+import threading
+from timeit import default_timer
+
+# Local imports.
+from encore.events.api import BaseEvent, EventManager
+
+
+class BenchEvent(BaseEvent):
+    pass
+
+
+def run(num_threads, num_events=20000, num_listeners=10, churn=True):
+    """ Emit ``num_events`` events from each of ``num_threads`` threads.
+
+    Returns a dict with the aggregate emit throughput.
+    """
+    evt_mgr = EventManager()
+    for i in range(num_listeners):
+        evt_mgr.connect(BenchEvent, lambda evt: None,
+                        filter={'key': i} if i % 2 else None)
+
+    stop = threading.Event()
+    def churner():
+        churn_listener = lambda evt: None
+        while not stop.is_set():
+            evt_mgr.connect(BenchEvent, churn_listener, filter={'key': 1})
+            evt_mgr.disconnect(BenchEvent, churn_listener)
+
+    def emitter():
+        emit = evt_mgr.emit
+        evt = BenchEvent(key=1)
+        for i in xrange(num_events):
+            emit(evt)
+
+    threads = [threading.Thread(target=emitter) for i in range(num_threads)]
+    if churn:
+        churn_thread = threading.Thread(target=churner)
+        churn_thread.start()
+    start = default_timer()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = default_timer() - start
+    stop.set()
+    if churn:
+        churn_thread.join()
+
+    total = num_threads * num_events
+    return {'threads': num_threads, 'events': total, 'churn': churn,
+            'seconds': elapsed, 'events_per_second': total / elapsed}
+
+
+def main(argv=None):
+    parser = optparse.OptionParser(description=__doc__.strip().split('\n')[0])
+    parser.add_option('-t', '--max-threads', type='int', default=8)
+    parser.add_option('-n', '--events', type='int', default=20000,
+                      help='number of events emitted by each thread')
+    parser.add_option('--no-churn', action='store_false', dest='churn',
+                      default=True)
+    options, args = parser.parse_args(argv)
+
+    print '{0:>8} {1:>10} {2:>10} {3:>14}'.format('threads', 'events',
+                                                  'seconds', 'events/s')
+    num_threads = 1
+    while num_threads <= options.max_threads:
+        result = run(num_threads, options.events, churn=options.churn)
+        print '{threads:>8} {events:>10} {seconds:>10.3f} '\
+              '{events_per_second:>14.0f}'.format(**result)
+        num_threads *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" Benchmark of the construction cost and size of events.
+
+Compares events with declared fields, such as `ProgressStepEvent` and
+`StoreProgressStepEvent`, with equivalent events storing their attributes in
+an instance dict.
+"""
+
+# Standard library imports.
+import optparse
+import sys
+import timeit
+
+# Local imports.
+from encore.events.api import BaseEvent, ProgressStepEvent
+from encore.storage.events import StoreProgressStepEvent
+
+
+class DictProgressStepEvent(BaseEvent):
+    """ A progress step event storing its attributes in an instance dict.
+    """
+
+class DictStoreProgressStepEvent(BaseEvent):
+    """ A store progress step event storing its attributes in an instance dict.
+    """
+
+
+CASES = [
+    ('ProgressStepEvent', ProgressStepEvent, DictProgressStepEvent,
+     dict(operation_id=1, message='Copying', step=1048576)),
+    ('StoreProgressStepEvent', StoreProgressStepEvent,
+     DictStoreProgressStepEvent, dict(operation_id=1, message='Copying',
+                                      step=1048576, key='key', metadata={})),
+]
+
+
+def event_size(evt):
+    """ The memory size of an event and its instance dict, in bytes.
+    """
+    size = sys.getsizeof(evt)
+    if vars(evt):
+        size += sys.getsizeof(vars(evt))
+    return size
+
+
+def construction_time(cls, kwargs, number):
+    """ The mean time to construct an event, in seconds.
+    """
+    source = object()
+    timer = timeit.Timer(lambda: cls(source, **kwargs))
+    return min(timer.repeat(3, number)) / number
+
+
+def run(number=100000):
+    """ Return a list of dicts with the construction time and size of events.
+    """
+    results = []
+    for name, cls, dict_cls, kwargs in CASES:
+        for kind, klass in (('fields', cls), ('dict', dict_cls)):
+            results.append({'event': name, 'kind': kind,
+                'construction_seconds': construction_time(klass, kwargs,
+                                                          number),
+                'size_bytes': event_size(klass(None, **kwargs))})
+    return results
+
+
+def main(argv=None):
+    parser = optparse.OptionParser(description=__doc__.strip().split('\n')[0])
+    parser.add_option('-n', '--number', type='int', default=100000,
+                      help='number of events constructed per repeat')
+    options, args = parser.parse_args(argv)
+
+    print '{0:>24} {1:>8} {2:>14} {3:>8}'.format('event', 'kind',
+                                                 'construct (us)', 'bytes')
+    for result in run(options.number):
+        print '{event:>24} {kind:>8} {0:>14.3f} {size_bytes:>8}'.format(
+                result['construction_seconds'] * 1e6, **result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" Benchmark of emit latency while method listeners are garbage collected.
+
+Short-lived objects connect one of their methods as a listener and are then
+dropped, so that the event manager has to purge the dead listeners while
+events are emitted. Dead listeners are removed as soon as their object is
+collected, so the emit latency should stay flat as the churn goes on.
+"""
+
+# Standard library imports.
+import optparse
+from timeit import default_timer
+
+# Local imports.
+from encore.events.api import BaseEvent, EventManager
+from encore.events.profiling import percentile
+
+
+class BenchEvent(BaseEvent):
+    pass
+
+
+class ShortLived(object):
+
+    def callback(self, evt):
+        pass
+
+
+def run(num_objects=100000, alive=100):
+    """ Connect the methods of ``num_objects`` objects, of which at most
+    ``alive`` are alive at a time, emitting an event for each new object.
+
+    Returns a dict with the emit latency statistics, in microseconds.
+    """
+    evt_mgr = EventManager()
+    evt = BenchEvent(key=1)
+    objects = []
+    latencies = []
+    start = default_timer()
+    for i in xrange(num_objects):
+        obj = ShortLived()
+        evt_mgr.connect(BenchEvent, obj.callback,
+                        filter={'key': i % 4} if i % 2 else None)
+        objects.append(obj)
+        if len(objects) > alive:
+            del objects[0]
+        del obj
+        t = default_timer()
+        evt_mgr.emit(evt)
+        latencies.append(default_timer() - t)
+    elapsed = default_timer() - start
+
+    latencies = sorted(l * 1e6 for l in latencies)
+    return {'objects': num_objects, 'alive': alive, 'seconds': elapsed,
+            'listeners': len(list(evt_mgr.get_listeners(BenchEvent))),
+            'mean_us': sum(latencies) / len(latencies),
+            'p50_us': percentile(latencies, 0.5),
+            'p99_us': percentile(latencies, 0.99),
+            'max_us': latencies[-1]}
+
+
+def main(argv=None):
+    parser = optparse.OptionParser(description=__doc__.strip().split('\n')[0])
+    parser.add_option('-n', '--objects', type='int', default=100000,
+                      help='number of short-lived listener objects')
+    parser.add_option('-a', '--alive', type='int', default=100,
+                      help='number of listener objects alive at a time')
+    options, args = parser.parse_args(argv)
+
+    result = run(options.objects, options.alive)
+    print '{0:>10} {1:>8} {2:>10} {3:>10} {4:>10} {5:>10} {6:>10}'.format(
+        'objects', 'alive', 'seconds', 'mean us', 'p50 us', 'p99 us', 'max us')
+    print '{objects:>10} {alive:>8} {seconds:>10.3f} {mean_us:>10.2f} '\
+          '{p50_us:>10.2f} {p99_us:>10.2f} {max_us:>10.2f}'.format(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,342 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" Benchmark suite of the emit throughput and latency of the EventManager.
+
+The suite varies the number of listeners, their filters, the number of
+sources listened to, the depth and width of the event class hierarchy, the
+kind of listeners, non-blocking emits, concurrent listener churn, the
+scheduling of delayed emits and string topics. The results are written as
+JSON, and can be compared with the results of a previous run to catch
+regressions::
+
+    python -m encore.events.benchmarks.suite -o new.json
+    python -m encore.events.benchmarks.suite --compare old.json
+"""
+
+# Standard library imports.
+import json
+import optparse
+import platform
+import sys
+import time
+from timeit import default_timer
+
+# Local imports.
+from encore.events.api import BaseEvent, EventManager, Prefix
+from encore.events.benchmarks import emit_threads
+from encore.events.profiling import percentile
+
+
+class BenchEvent(BaseEvent):
+    __fields__ = ('key',)
+    __slots__ = ()
+
+
+class Listener(object):
+
+    def callback(self, evt):
+        pass
+
+    def __call__(self, evt):
+        pass
+
+
+def function_listener(evt):
+    pass
+
+
+def measure(emit, events):
+    """ Emit each of the events, returning a dict of the throughput and
+    latency statistics.
+    """
+    # Warm up the caches of the event manager.
+    for evt in events[:100]:
+        emit(evt)
+    latencies = []
+    append = latencies.append
+    timer = default_timer
+    start = timer()
+    for evt in events:
+        t = timer()
+        emit(evt)
+        append(timer() - t)
+    seconds = timer() - start
+    latencies.sort()
+    return {'events': len(latencies), 'seconds': seconds,
+            'events_per_second': len(latencies) / seconds,
+            'p50_us': percentile(latencies, 0.5) * 1e6,
+            'p99_us': percentile(latencies, 0.99) * 1e6,
+            'max_us': latencies[-1] * 1e6}
+
+
+###############################################################################
+# Benchmarks.
+###############################################################################
+def bench_listener_count(number, counts=(1, 10, 100, 1000)):
+    """ Unfiltered function listeners, varying their number.
+    """
+    results = []
+    for count in counts:
+        evt_mgr = EventManager()
+        for i in range(count):
+            evt_mgr.connect(BenchEvent, lambda evt: None)
+        events = [BenchEvent(key=i) for i in xrange(number)]
+        results.append(({'listeners': count}, measure(evt_mgr.emit, events)))
+    return results
+
+
+def bench_filters(number, count=1000):
+    """ ``count`` listeners, either unfiltered or filtered so that each
+    event matches a single listener.
+    """
+    filters = [('none', lambda i: None),
+               ('value', lambda i: {'key': i}),
+               ('prefix', lambda i: {'key': Prefix('{0}/'.format(i))})]
+    keys = {'none': lambda i: i, 'value': lambda i: i,
+            'prefix': lambda i: '{0}/item'.format(i)}
+    results = []
+    for name, make_filter in filters:
+        evt_mgr = EventManager()
+        for i in range(count):
+            evt_mgr.connect(BenchEvent, lambda evt: None,
+                            filter=make_filter(i))
+        events = [BenchEvent(key=keys[name](i % count))
+                  for i in xrange(number)]
+        results.append(({'listeners': count, 'filter': name},
+                        measure(evt_mgr.emit, events)))
+    return results
+
+
+def bench_sources(number, counts=(1, 100, 1000)):
+    """ A listener filtering on the source of events for each of ``count``
+    sources, such as the stores of a process.
+    """
+    results = []
+    for count in counts:
+        evt_mgr = EventManager()
+        sources = [object() for i in range(count)]
+        for source in sources:
+            evt_mgr.connect(BenchEvent, lambda evt: None,
+                            filter={'source': source})
+        events = [BenchEvent(sources[i % count]) for i in xrange(number)]
+        results.append(({'sources': count}, measure(evt_mgr.emit, events)))
+    return results
+
+
+def bench_hierarchy(number, depths=(1, 4, 16), widths=(1, 100)):
+    """ A listener on each class of a chain of ``depth`` event classes, each
+    of which also has ``width - 1`` registered sibling classes.
+    """
+    results = []
+    for depth in depths:
+        for width in widths:
+            evt_mgr = EventManager()
+            cls = BaseEvent
+            for level in range(depth):
+                for sibling in range(width - 1):
+                    evt_mgr.connect(type('Sibling', (cls,), {}),
+                                    lambda evt: None)
+                cls = type('Level{0}'.format(level), (cls,), {})
+                evt_mgr.connect(cls, lambda evt: None)
+            events = [cls() for i in xrange(number)]
+            results.append(({'depth': depth, 'width': width},
+                            measure(evt_mgr.emit, events)))
+    return results
+
+
+def bench_listener_kind(number, count=10):
+    """ ``count`` listeners of each kind of callable.
+    """
+    listeners = [Listener() for i in range(count)]
+    kinds = [('function', lambda i: function_listener),
+             ('lambda', lambda i: lambda evt: None),
+             ('method', lambda i: listeners[i].callback),
+             ('callable', lambda i: listeners[i])]
+    results = []
+    for name, make_listener in kinds:
+        evt_mgr = EventManager()
+        cls = BenchEvent
+        for i in range(count):
+            # Functions are connected once per class, connect them to a
+            # chain of subclasses.
+            cls = type('Kind{0}'.format(i), (cls,), {})
+            evt_mgr.connect(cls, make_listener(i))
+        events = [cls(key=i) for i in xrange(number)]
+        results.append(({'listeners': count, 'kind': name},
+                        measure(evt_mgr.emit, events)))
+    return results
+
+
+def bench_non_blocking(number, count=10):
+    """ Emits submitted to the executor of the event manager. The latency is
+    that of submitting the events, and the time includes their delivery.
+    """
+    evt_mgr = EventManager()
+    for i in range(count):
+        evt_mgr.connect(BenchEvent, lambda evt: None)
+    futures = []
+    def emit(evt):
+        futures.append(evt_mgr.emit(evt, block=False))
+    events = [BenchEvent(key=i) for i in xrange(number)]
+    start = default_timer()
+    result = measure(emit, events)
+    for future in futures:
+        future.wait()
+    result['seconds'] = default_timer() - start
+    # Including the warm up emits.
+    result['events_per_second'] = len(futures) / result['seconds']
+    evt_mgr.executor.shutdown()
+    return [({'listeners': count, 'block': False}, result)]
+
+
+def bench_churn(number, threads=(1, 4)):
+    """ Emitter threads, with or without a thread connecting and
+    disconnecting listeners.
+    """
+    results = []
+    for num_threads in threads:
+        for churn in (False, True):
+            result = emit_threads.run(num_threads, number, churn=churn)
+            results.append(({'threads': num_threads, 'churn': churn},
+                            {'events': result['events'],
+                             'seconds': result['seconds'],
+                             'events_per_second':
+                                result['events_per_second']}))
+    return results
+
+
+def bench_scheduling(number, pending=(0, 1000, 100000)):
+    """ Delayed emits scheduled and cancelled by key, with ``pending``
+    other delayed emits waiting.
+    """
+    results = []
+    for count in pending:
+        evt_mgr = EventManager()
+        for i in xrange(count):
+            evt_mgr.emit_later(BenchEvent(key=i), 3600)
+        def schedule(evt):
+            evt_mgr.emit_later(evt, 3600, key=evt.key)
+            evt_mgr.cancel_emit(evt.key)
+        events = [BenchEvent(key=i) for i in xrange(number)]
+        results.append(({'pending': count}, measure(schedule, events)))
+        evt_mgr.scheduler.shutdown()
+    return results
+
+
+def bench_topics(number, counts=(1, 10)):
+    """ ``count`` listeners notified through class-based emits, including
+    the construction of the events, or through string topics, with exact or
+    wildcard patterns.
+    """
+    results = []
+    for count in counts:
+        evt_mgr = EventManager()
+        for i in range(count):
+            evt_mgr.connect(BenchEvent, lambda evt: None)
+            evt_mgr.subscribe('store.main.update',
+                              lambda topic, payload: None)
+            evt_mgr.subscribe('cache.*.update', lambda topic, payload: None)
+        cases = [
+            ('emit', lambda i: evt_mgr.emit(BenchEvent(key=i))),
+            ('publish', lambda i: evt_mgr.publish('store.main.update', i)),
+            ('publish_wildcard',
+             lambda i: evt_mgr.publish('cache.main.update', i)),
+        ]
+        for name, emit in cases:
+            results.append(({'listeners': count, 'api': name},
+                            measure(emit, range(number))))
+    return results
+
+
+BENCHMARKS = [
+    ('listener_count', bench_listener_count),
+    ('filters', bench_filters),
+    ('sources', bench_sources),
+    ('hierarchy', bench_hierarchy),
+    ('listener_kind', bench_listener_kind),
+    ('non_blocking', bench_non_blocking),
+    ('churn', bench_churn),
+    ('scheduling', bench_scheduling),
+    ('topics', bench_topics),
+]
+
+
+def run(number=10000, names=None):
+    """ Run the benchmarks, or those in ``names``, emitting ``number``
+    events in each case.
+
+    Returns a JSON serializable dict of the environment and the results.
+    """
+    results = []
+    for name, benchmark in BENCHMARKS:
+        if names and name not in names:
+            continue
+        for params, result in benchmark(number):
+            result.update(benchmark=name, params=params)
+            results.append(result)
+    return {'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'number': number,
+            'results': results}
+
+
+def compare(baseline, current, tolerance=0.2):
+    """ Return the results whose throughput dropped by more than the
+    ``tolerance`` fraction from the baseline, as a list of
+    ``(benchmark, params, baseline_eps, current_eps)`` tuples.
+    """
+    def key(result):
+        return result['benchmark'], sorted(result['params'].items())
+    previous = dict([(repr(key(r)), r) for r in baseline['results']])
+    regressions = []
+    for result in current['results']:
+        old = previous.get(repr(key(result)))
+        if old is None:
+            continue
+        if result['events_per_second'] < (old['events_per_second'] *
+                                          (1 - tolerance)):
+            regressions.append((result['benchmark'], result['params'],
+                old['events_per_second'], result['events_per_second']))
+    return regressions
+
+
+def main(argv=None):
+    parser = optparse.OptionParser(description=__doc__.strip().split('\n')[0])
+    parser.add_option('-n', '--events', type='int', default=10000,
+                      help='number of events emitted in each case')
+    parser.add_option('-b', '--benchmark', action='append', dest='names',
+                      help='benchmark to run, may be repeated: ' +
+                           ', '.join([name for name, b in BENCHMARKS]))
+    parser.add_option('-o', '--output', help='file to write the results to')
+    parser.add_option('-c', '--compare', metavar='BASELINE',
+                      help='results file to compare the throughput with')
+    parser.add_option('-t', '--tolerance', type='float', default=0.2,
+                      help='throughput drop reported as a regression')
+    options, args = parser.parse_args(argv)
+
+    report = run(options.events, options.names)
+    data = json.dumps(report, indent=2, sort_keys=True)
+    if options.output:
+        with open(options.output, 'w') as f:
+            f.write(data)
+    else:
+        print data
+
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, options.tolerance)
+        for name, params, old, new in regressions:
+            sys.stderr.write('REGRESSION {0} {1}: {2:.0f} -> {3:.0f} '
+                             'events/s\n'.format(name, params, old, new))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
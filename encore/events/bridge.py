@@ -0,0 +1,301 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" This module defines a bridge forwarding events between processes.
+
+The main class of the module is the `EventBridge`, which connects an event
+manager to the event manager of another process over a
+``multiprocessing.connection`` connection, such as one end of a
+``multiprocessing.Pipe()`` or a Unix socket connection::
+
+    # In the first process.
+    bridge = listen_bridge(event_manager, '/tmp/events.sock',
+                           classes=[StoreModificationEvent])
+
+    # In the second process.
+    bridge = connect_bridge(event_manager, '/tmp/events.sock',
+                            classes=[StoreModificationEvent])
+
+Events of the bridged classes emitted in one process are then emitted in the
+other process, with the bridge as their source.
+"""
+
+# Standard library imports.
+import logging
+import os
+import sys
+import threading
+import Queue
+from multiprocessing import current_process
+from multiprocessing.connection import Listener, Client
+from timeit import default_timer
+
+# Local imports.
+from .abstract_event_manager import BaseEvent
+from .serialization import (event_to_record, event_from_record, dumps, loads,
+    picklable_record, root_classes)
+
+# Logging.
+logger = logging.getLogger(__name__)
+
+# The attribute of forwarded events holding the ids of the nodes they have
+# been emitted on, used to avoid forwarding events in loops.
+PATH_ATTRIBUTE = '_bridge_path'
+
+# Message types.
+_HELLO = 'hello'
+_EVENTS = 'events'
+_CLOSE = 'close'
+
+# Queue item to stop the sender thread.
+_STOP = object()
+
+
+###############################################################################
+# `EventBridge` Class.
+###############################################################################
+class EventBridge(object):
+    """ Forwards events between an event manager and a remote event manager.
+
+    Events of the bridged classes which are not marked as handled by local
+    listeners are converted to records (see `encore.events.serialization`)
+    and sent in batches to the remote bridge, which emits them on its event
+    manager. The `source` of the events is not forwarded, the remote bridge is
+    the source of the events it emits. Attributes which cannot be pickled are
+    dropped.
+
+    Each bridge has a node id identifying its event manager. Forwarded events
+    record the node ids they have been emitted on, and are never forwarded to
+    a node they have already been emitted on, so bridges may be connected in
+    any topology without events bouncing back and forth.
+    """
+
+    def __init__(self, event_manager, connection, classes=(BaseEvent,),
+                 batch_size=100, flush_interval=0.005, node_id=None):
+        """ Constructor.
+
+        Parameters:
+        -----------
+        event_manager : EventManager
+            The local event manager.
+        connection : multiprocessing Connection
+            The connection to the remote bridge.
+        classes : sequence of classes
+            The event classes (and subclasses) to forward to the remote bridge.
+        batch_size : int
+            The maximum number of events sent together.
+        flush_interval : float
+            The maximum time in seconds an event waits for a batch to fill.
+        node_id : str
+            The unique id of the local event manager. Defaults to an id
+            derived from the process id and the event manager.
+        """
+        self.event_manager = event_manager
+        self.connection = connection
+        self.classes = tuple(classes)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        if node_id is None:
+            node_id = '{0}:{1}'.format(os.getpid(), id(event_manager))
+        self.node_id = node_id
+        self.peer_id = None
+
+        # Statistics.
+        self.batches_sent = 0
+        self.events_sent = 0
+        self.events_received = 0
+
+        self._queue = Queue.Queue()
+        self._send_lock = threading.Lock()
+        self._connected = threading.Event()
+        self._closed = False
+        self._threads = []
+
+    def start(self):
+        """ Start forwarding events in both directions.
+        """
+        self._send((_HELLO, self.node_id))
+        for target, name in ((self._receive_loop, 'receiver'),
+                             (self._send_loop, 'sender')):
+            thread = threading.Thread(target=target,
+                        name='EventBridge {0} {1}'.format(self.node_id, name))
+            thread.daemon = True
+            self._threads.append(thread)
+            thread.start()
+        for cls in root_classes(self.classes):
+            # Lowest priority, so that events handled locally (for example
+            # during store transactions) are not forwarded.
+            self.event_manager.connect(cls, self._forward,
+                                       priority=-sys.maxint)
+        return self
+
+    def wait_connected(self, timeout=None):
+        """ Wait until the remote bridge is known. Returns whether it is.
+        """
+        self._connected.wait(timeout)
+        return self._connected.is_set()
+
+    def close(self, timeout=5.0):
+        """ Stop forwarding events and close the connection.
+
+        Pending events are sent before the connection is closed.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for cls in root_classes(self.classes):
+            try:
+                self.event_manager.disconnect(cls, self._forward)
+            except KeyError:
+                pass
+        self._queue.put(_STOP)
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+        self.connection.close()
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+    def _forward(self, evt):
+        """ Listener queueing local events to be sent to the remote bridge.
+        """
+        if self.peer_id in getattr(evt, PATH_ATTRIBUTE, ()):
+            return
+        self._queue.put(event_to_record(evt))
+
+    def _send(self, message):
+        with self._send_lock:
+            self.connection.send_bytes(dumps(message))
+
+    def _send_loop(self):
+        stop = False
+        queue = self._queue
+        while not stop:
+            record = queue.get()
+            if record is _STOP:
+                break
+            batch = [record]
+            deadline = default_timer() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - default_timer()
+                if remaining <= 0:
+                    break
+                try:
+                    record = queue.get(timeout=remaining)
+                except Queue.Empty:
+                    break
+                if record is _STOP:
+                    stop = True
+                    break
+                batch.append(record)
+            self._send_batch(batch)
+        try:
+            self._send((_CLOSE,))
+        except (IOError, EOFError, ValueError):
+            pass
+
+    def _send_batch(self, batch):
+        message = (_EVENTS, self.node_id, batch)
+        try:
+            data = dumps(message)
+        except Exception:
+            batch = [picklable_record(record) for record in batch]
+            data = dumps((_EVENTS, self.node_id, batch))
+        try:
+            with self._send_lock:
+                self.connection.send_bytes(data)
+        except (IOError, EOFError, ValueError):
+            logger.warn('EventBridge {0} failed to send {1} events'.format(
+                        self.node_id, len(batch)))
+            return
+        self.batches_sent += 1
+        self.events_sent += len(batch)
+
+    def _receive_loop(self):
+        while True:
+            try:
+                message = loads(self.connection.recv_bytes())
+            except (IOError, EOFError, ValueError):
+                break
+            kind = message[0]
+            if kind == _EVENTS:
+                self._emit_batch(message[1], message[2])
+            elif kind == _HELLO:
+                self.peer_id = message[1]
+                self._connected.set()
+            elif kind == _CLOSE:
+                break
+        if not self._closed:
+            # Closed by the remote bridge.
+            threading.Thread(target=self.close).start()
+
+    def _emit_batch(self, sender, batch):
+        events = []
+        for record in batch:
+            try:
+                evt = event_from_record(record, source=self)
+            except ImportError:
+                logger.warn('EventBridge {0} cannot import event class {1}'
+                            .format(self.node_id, record[0]))
+                continue
+            path = getattr(evt, PATH_ATTRIBUTE, ())
+            if self.node_id in path:
+                continue
+            setattr(evt, PATH_ATTRIBUTE, path + (sender, self.node_id))
+            events.append(evt)
+        self.events_received += len(events)
+        self.event_manager.emit_many(events)
+
+
+###############################################################################
+# Connection helpers.
+###############################################################################
+def _check_address(address, authkey):
+    """ Return the authentication key of a bridge connection, checking that
+    its address is local.
+
+    Received events are unpickled, so bridges only accept local addresses
+    and always authenticate their peer.
+    """
+    if not isinstance(address, basestring):
+        raise ValueError('Bridges only support Unix socket or named pipe '
+                         'addresses, not {0!r}'.format(address))
+    if authkey is None:
+        authkey = current_process().authkey
+    if not authkey:
+        raise ValueError('Bridges require an authentication key')
+    return authkey
+
+
+def listen_bridge(event_manager, address, authkey=None, **kwargs):
+    """ Wait for a bridge to connect at ``address`` and return the started
+    `EventBridge`.
+
+    ``address`` is a Unix socket path, or a named pipe path on Windows. TCP
+    addresses are rejected, as received events are unpickled. Peers are
+    authenticated with ``authkey``, which defaults to the authentication key
+    of the current process, inherited by the processes it starts with
+    ``multiprocessing``. Other keyword arguments are passed to `EventBridge`.
+    """
+    authkey = _check_address(address, authkey)
+    listener = Listener(address, authkey=authkey)
+    try:
+        connection = listener.accept()
+    finally:
+        listener.close()
+    return EventBridge(event_manager, connection, **kwargs).start()
+
+
+def connect_bridge(event_manager, address, authkey=None, **kwargs):
+    """ Connect to a bridge listening at ``address`` and return the started
+    `EventBridge`.
+
+    See `listen_bridge` for the ``address`` and ``authkey`` arguments.
+    """
+    authkey = _check_address(address, authkey)
+    connection = Client(address, authkey=authkey)
+    return EventBridge(event_manager, connection, **kwargs).start()
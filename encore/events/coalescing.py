@@ -0,0 +1,165 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" This module defines the coalescing of the events delivered to a listener.
+
+A listener connected with ``coalesce_by`` receives at most one event per
+distinct value of the given attributes per window, the last one emitted::
+
+    event_manager.connect(StoreUpdateEvent, refresh, coalesce_by=('key',),
+                          window=0.1)
+
+The `Coalescer` buffers the events of a listener, and the scheduler of the
+event manager flushes the buffer at the end of the window which started with
+the first buffered event, so that a listener is called at least once per
+window during a continuous burst of events. The events still buffered when
+the listener is disconnected are discarded.
+"""
+
+# Standard library imports.
+import threading
+from collections import OrderedDict
+
+# Local imports.
+from .executors import EventFuture
+
+
+###############################################################################
+# `Coalescer` Class.
+###############################################################################
+class Coalescer(object):
+    """ Executor-like buffer of the deliveries of events to a listener,
+    collapsing the events with equal coalescing attributes.
+
+    ``submit(fn, evt, *args)`` buffers the call, replacing a buffered call
+    with the same ``fn`` and ``args`` for an event with the same attribute
+    values, and returns a future which is done once the window is flushed.
+    """
+
+    def __init__(self, scheduler, coalesce_by=(), window=0.1, batch=False,
+                 executor=None):
+        """ Constructor.
+
+        Parameters:
+        -----------
+        scheduler : Scheduler
+            The scheduler flushing the buffer at the end of each window.
+        coalesce_by : sequence of str
+            The names of the attributes of the events collapsed together. A
+            missing attribute counts as None. With no attribute, all the
+            events of a window are collapsed into the last one.
+        window : float
+            The time in seconds during which events are buffered.
+        batch : bool
+            Whether the buffered events are delivered together, as a list
+            given to a single call, rather than in turn.
+        executor : executor
+            The executor the flushed calls are submitted to, or None to call
+            them on the scheduler thread.
+        """
+        if isinstance(coalesce_by, basestring):
+            coalesce_by = (coalesce_by,)
+        self.scheduler = scheduler
+        self.coalesce_by = tuple(coalesce_by)
+        self.window = window
+        self.batch = batch
+        self.executor = executor
+        # {(fn, args, values): (fn, evt, args, [futures])}, in order of the
+        # first event
+        self._buffer = OrderedDict()
+        self._lock = threading.Lock()
+        self._flush_call = None
+        self._discarded = False
+
+    def submit(self, fn, evt, *args):
+        """ Buffer the call ``fn(evt, *args)`` until the end of the window.
+        """
+        key = (fn, args, self._key(evt))
+        future = EventFuture()
+        with self._lock:
+            if self._discarded:
+                future.cancel()
+                return future
+            pending = self._buffer.get(key)
+            futures = [future] if pending is None else pending[3] + [future]
+            self._buffer[key] = (fn, evt, args, futures)
+            if self._flush_call is None:
+                self._flush_call = self.scheduler.schedule_later(
+                    self.window, self.flush)
+        return future
+
+    def flush(self):
+        """ Deliver the buffered events now.
+        """
+        with self._lock:
+            buffer = self._buffer
+            self._buffer = OrderedDict()
+            if self._flush_call is not None:
+                self._flush_call.cancel()
+                self._flush_call = None
+        if not buffer:
+            return
+        items = buffer.values()
+        if self.executor is None:
+            self._deliver(items)
+        else:
+            self.executor.submit(self._deliver, items)
+
+    def discard(self):
+        """ Drop the buffered events, without delivering them, and the
+        events submitted from now on.
+
+        Called when the listener is disconnected. The futures of the dropped
+        events are cancelled.
+        """
+        with self._lock:
+            self._discarded = True
+            buffer = self._buffer
+            self._buffer = OrderedDict()
+            if self._flush_call is not None:
+                self._flush_call.cancel()
+                self._flush_call = None
+        for fn, evt, args, futures in buffer.itervalues():
+            for future in futures:
+                future.cancel()
+
+    def pending(self):
+        """ The number of buffered events.
+        """
+        return len(self._buffer)
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+    def _key(self, evt):
+        key = tuple([getattr(evt, attr, None) for attr in self.coalesce_by])
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable attribute values, not coalesced.
+            return object()
+        return key
+
+    def _deliver(self, items):
+        """ Make the buffered calls and finish their futures.
+        """
+        futures = [future for fn, evt, args, futures in items
+                   for future in futures]
+        for future in futures:
+            future.set_running()
+        try:
+            if self.batch:
+                batches = OrderedDict()
+                for fn, evt, args, f in items:
+                    batches.setdefault((fn, args), []).append(evt)
+                for (fn, args), events in batches.iteritems():
+                    fn(events, *args)
+            else:
+                for fn, evt, args, f in items:
+                    fn(evt, *args)
+        finally:
+            for future in futures:
+                future.set_result(None)
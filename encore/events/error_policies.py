@@ -0,0 +1,242 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" This module defines the policies handling exceptions raised by listeners.
+
+An `EventManager` hands every exception raised by a listener to its error
+policy, which counts the failures of each listener and decides whether to
+log them, disconnect the listener or re-raise the exception::
+
+    event_manager = EventManager(error_policy=LogOncePolicy())
+    ...
+    for failures in event_manager.get_listener_failures():
+        print failures.listener, failures.count
+
+The default `LogPolicy` logs every failure with its traceback. For listeners
+of frequently emitted events, the other policies avoid formatting and logging
+a traceback on every emit.
+"""
+
+# Standard library imports.
+import sys
+import threading
+from types import MethodType
+import weakref
+
+
+def _weak_listener(notifier):
+    """ Return a callable returning the listener of a notifier, without
+    holding a plain callable listener alive.
+    """
+    listener = notifier()
+    if listener is None or isinstance(listener, MethodType):
+        # Method notifiers hold the object of methods weakly.
+        return notifier
+    try:
+        return weakref.ref(listener)
+    except TypeError:
+        return lambda: None
+
+
+###############################################################################
+# `ListenerFailures` Class.
+###############################################################################
+class ListenerFailures(object):
+    """ The failure counters of a listener.
+
+    The counters of a connected listener hold it alive like its notifier.
+    Once the listener is disconnected, they are discarded, or, if the error
+    policy disconnected it, kept with a weak reference to the listener.
+    """
+    __slots__ = ['_notifier', 'count', 'last_exception', 'last_event_class',
+                 'disconnected']
+
+    def __init__(self, notifier):
+        # The notifier of the listener, which holds methods without their
+        # object.
+        self._notifier = notifier
+        # The number of exceptions raised by the listener.
+        self.count = 0
+        # The last exception raised by the listener, and the class of the
+        # event it was raised for.
+        self.last_exception = None
+        self.last_event_class = None
+        # Whether the listener was disconnected by the error policy.
+        self.disconnected = False
+
+    @property
+    def listener(self):
+        """ The listener, or None if it has been garbage collected.
+        """
+        return self._notifier()
+
+    def __repr__(self):
+        return ('ListenerFailures(listener={0}, count={1}, last_exception={2!r}'
+                ', disconnected={3})'.format(self.listener, self.count,
+                    self.last_exception, self.disconnected))
+
+
+###############################################################################
+# `ErrorPolicy` Class.
+###############################################################################
+class ErrorPolicy(object):
+    """ Base class of the listener error policies.
+
+    The failures of the listeners are counted by `listener_error`, subclasses
+    implement `handle` to act on them.
+    """
+
+    def __init__(self):
+        # {notifier: ListenerFailures} of the connected listeners
+        self._failures = {}
+        # ListenerFailures of the listeners disconnected by the policy
+        self._disconnected = []
+        self._lock = threading.Lock()
+
+    def listener_error(self, event_manager, evt, notifier, exc, tb=None):
+        """ Count and handle an exception raised by a listener.
+
+        This is called by the event manager while the exception is being
+        handled, unless the formatted traceback ``tb`` is given.
+
+        Parameters:
+        -----------
+        event_manager : EventManager
+            The event manager which emitted the event.
+        evt : BaseEvent instance
+            The event the listener failed on.
+        notifier : notifier
+            The notifier of the listener.
+        exc : BaseException
+            The exception raised by the listener.
+        tb : str
+            The formatted traceback, if the exception is not being handled.
+        """
+        with self._lock:
+            failures = self._failures.get(notifier)
+            if failures is None:
+                failures = self._failures[notifier] = ListenerFailures(
+                                                                    notifier)
+            failures.count += 1
+            failures.last_exception = exc
+            failures.last_event_class = type(evt)
+        self.handle(event_manager, evt, notifier, exc, tb, failures)
+
+    def handle(self, event_manager, evt, notifier, exc, tb, failures):
+        """ Act on an exception raised by a listener.
+
+        ``failures`` is the `ListenerFailures` of the listener, which already
+        counts this exception. The other parameters are those of
+        `listener_error`.
+        """
+        raise NotImplementedError
+
+    def get_failures(self):
+        """ Return the list of `ListenerFailures`, most failing listeners
+        first.
+        """
+        with self._lock:
+            failures = self._failures.values() + self._disconnected
+        return sorted(failures, key=lambda f: f.count, reverse=True)
+
+    def forget(self, notifier):
+        """ Release the failure counters of a disconnected listener.
+
+        This is called by the event manager whenever a listener is
+        disconnected. The counters of a listener disconnected by the policy
+        are kept, without holding the listener alive, the others are
+        discarded.
+        """
+        with self._lock:
+            failures = self._failures.pop(notifier, None)
+            if failures is not None and failures.disconnected:
+                failures._notifier = _weak_listener(notifier)
+                self._disconnected.append(failures)
+
+    def reset(self):
+        """ Discard all the failure counters.
+        """
+        with self._lock:
+            self._failures.clear()
+            self._disconnected = []
+
+
+###############################################################################
+# Error policies.
+###############################################################################
+class LogPolicy(ErrorPolicy):
+    """ Log every failure with its traceback. This is the default policy.
+    """
+
+    def handle(self, event_manager, evt, notifier, exc, tb, failures):
+        event_manager._log_listener_error(evt, notifier(), exc, tb)
+
+
+class LogOncePolicy(ErrorPolicy):
+    """ Log the first failure of each listener, and only count the others.
+    """
+
+    def handle(self, event_manager, evt, notifier, exc, tb, failures):
+        if failures.count == 1:
+            event_manager._log_listener_error(evt, notifier(), exc, tb,
+                'Further exceptions in this listener are only counted.')
+
+
+class SampledLogPolicy(ErrorPolicy):
+    """ Log the first failure of each listener and then one failure in
+    every ``every`` failures.
+    """
+
+    def __init__(self, every=100):
+        super(SampledLogPolicy, self).__init__()
+        self.every = every
+
+    def handle(self, event_manager, evt, notifier, exc, tb, failures):
+        if failures.count % self.every == 1 or self.every == 1:
+            event_manager._log_listener_error(evt, notifier(), exc, tb,
+                'Failure {0} of this listener, logging one in {1}.'.format(
+                                                failures.count, self.every))
+
+
+class CountPolicy(ErrorPolicy):
+    """ Only count the failures, without logging them.
+    """
+
+    def handle(self, event_manager, evt, notifier, exc, tb, failures):
+        pass
+
+
+class DisconnectPolicy(ErrorPolicy):
+    """ Log the first failure of each listener, and disconnect the listener
+    after ``max_failures`` failures.
+    """
+
+    def __init__(self, max_failures=3):
+        super(DisconnectPolicy, self).__init__()
+        self.max_failures = max_failures
+
+    def handle(self, event_manager, evt, notifier, exc, tb, failures):
+        if failures.count == 1:
+            event_manager._log_listener_error(evt, notifier(), exc, tb)
+        if failures.count >= self.max_failures and not failures.disconnected:
+            failures.disconnected = True
+            event_manager._log_listener_error(evt, notifier(), exc, '',
+                'Disconnecting the listener after {0} failures.'.format(
+                                                            failures.count))
+            event_manager._disconnect_notifier(type(evt), notifier)
+
+
+class RaisePolicy(ErrorPolicy):
+    """ Re-raise the exceptions of the listeners out of ``emit()``.
+
+    The listeners after the failing listener are not notified of the event.
+    """
+
+    def handle(self, event_manager, evt, notifier, exc, tb, failures):
+        exc_type, value, traceback = sys.exc_info()
+        if value is exc:
+            raise exc_type, value, traceback
+        raise exc
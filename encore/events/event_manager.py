@@ -16,6 +16,7 @@ import itertools
 import bisect
 import heapq
 import threading
+import time
 from types import MethodType
 import weakref
 import traceback
@@ -25,6 +26,43 @@ logger = logging.getLogger(__name__)
 
 # Local imports
 from .abstract_event_manager import BaseEvent, BaseEventManager
+from .coalescing import Coalescer
+from .error_policies import LogPolicy
+from .executors import BoundedExecutor, shutdown_at_exit
+from .filters import FilterOperator, hashable_by_value
+from .last_value_cache import LastValueCache
+from .listener_refs import listener_id, weak_method_dispatch
+from .profiling import DispatchProfiler
+from .scheduler import Scheduler
+from .topics import TopicRegistry, TopicSubscriber
+
+# Sentinel for event attributes which are not present.
+_missing = object()
+
+# The builtin, shadowed by the listener ids in `EventInfo` methods.
+_id = id
+
+# Whether the instances of classes compare by identity, by class.
+_identity_classes = weakref.WeakKeyDictionary()
+
+
+def _compares_by_identity(obj):
+    """ Whether an object is only equal to itself, because neither its class
+    nor a base class other than object defines ``__eq__`` or ``__cmp__``.
+    """
+    cls = type(obj)
+    try:
+        return _identity_classes[cls]
+    except KeyError:
+        pass
+    result = not any(['__eq__' in vars(c) or '__cmp__' in vars(c)
+                      for c in cls.__mro__ if c is not object])
+    try:
+        _identity_classes[cls] = result
+    except TypeError:
+        # Not weakly referenceable.
+        pass
+    return result
 
 
 ###############################################################################
@@ -32,10 +70,16 @@ from .abstract_event_manager import BaseEvent, BaseEventManager
 ###############################################################################
 class CallableNotifier(object):
     """ Notifier for general callables, whose strong reference is stored.
+
+    ``dispatch`` is the callable to call with an emitted event, here the
+    listener itself. ``executor`` is the executor the listener is called by,
+    or None if it is called inline.
     """
-    __slots__ = ['func']
+    __slots__ = ['func', 'dispatch', 'executor']
     def __init__(self, func, notify=None, args=()):
         self.func = func
+        self.dispatch = func
+        self.executor = None
 
     def __call__(self):
         """ Return the original listener callable.
@@ -44,21 +88,33 @@ class CallableNotifier(object):
 
 class MethodNotifier(object):
     """ Notifiers for methods, for which weak refs of object is stored.
+
+    ``dispatch`` is the callable to call with an emitted event. It is created
+    once, so that no bound method is created on every emit, and does nothing
+    if the object of the method has been garbage collected. ``executor`` is
+    the executor the listener is called by, or None if it is called inline.
     """
-    __slots__ = ['func', 'cls', 'obj', '_notify', '_args']
+    __slots__ = ['func', 'cls', 'obj', 'dispatch', 'executor', '_notify',
+                 '_args']
     def __init__(self, meth, notify=None, args=()):
         self.func = meth.im_func
         self.cls = meth.im_class
+        self.executor = None
         obj = meth.im_self
         if obj is None:
             # Unbound Method.
             self.obj = None
-        else:
-            # Bound method.
+            self.dispatch = meth
+            return
+        elif notify:
+            # Bound method, notify the garbage collection of its object.
             self.obj = weakref.ref(meth.im_self, self.notify)
-        if notify:
             self._notify = notify
             self._args = args
+        else:
+            # Bound method.
+            self.obj = weakref.ref(meth.im_self)
+        self.dispatch = weak_method_dispatch(self.func, self.obj)
 
     def notify(self, ref):
         """ Notify the garbage collection listeners.
@@ -79,31 +135,232 @@ class MethodNotifier(object):
                 return
         return MethodType(self.func, objc, self.cls)
 
+###############################################################################
+# `ChunkedSortedList` Private Class.
+###############################################################################
+class ChunkedSortedList(object):
+    """ A sorted list of keys stored in chunks of bounded size.
+
+    Adding and removing a key takes a bisection and an insertion or deletion
+    in a single chunk, instead of copying the whole list. The changes are
+    made visible to readers by ``publish()``, which freezes the chunks
+    changed since the last call into tuples. Readers get an immutable tuple
+    snapshot of the keys. Except for short lists, it is built from the
+    published chunks by the first reader after a change, without any lock,
+    so that the cost of a change does not grow with the number of keys.
+
+    The keys are modified and published by a single writer at a time.
+    """
+    # The number of keys of the chunks, which are split at twice the load.
+    load = 256
+
+    def __init__(self):
+        self._chunks = []
+        # The last key of each chunk.
+        self._maxes = []
+        # The tuples of the chunks as last published, or None for the chunks
+        # changed since.
+        self._frozen = []
+        self._len = 0
+        self._changed = False
+        self._published = ()
+        # The published chunks and the snapshot built from them.
+        self._snapshot = ((), ())
+
+    def __len__(self):
+        return self._len
+
+    def snapshot(self):
+        """ Return the sorted tuple of the published keys.
+        """
+        published = self._published
+        chunks, snapshot = self._snapshot
+        if chunks is not published:
+            snapshot = tuple(itertools.chain.from_iterable(published))
+            self._snapshot = (published, snapshot)
+        return snapshot
+
+    def publish(self):
+        """ Make the changes visible to the readers of the snapshot.
+        """
+        if not self._changed:
+            return
+        frozen = self._frozen
+        for pos, chunk in enumerate(frozen):
+            if chunk is None:
+                frozen[pos] = tuple(self._chunks[pos])
+        published = self._published = tuple(frozen)
+        if self._len <= self.load:
+            # Cheap enough to spare the readers the rebuild.
+            self._snapshot = (published, tuple(itertools.chain.from_iterable(
+                                                                published)))
+        else:
+            # Release the outdated snapshot, which holds removed keys.
+            self._snapshot = ((), ())
+        self._changed = False
+
+    def add(self, key):
+        """ Insert a key.
+        """
+        chunks = self._chunks
+        maxes = self._maxes
+        frozen = self._frozen
+        if not chunks:
+            chunks.append([key])
+            maxes.append(key)
+            frozen.append(None)
+        else:
+            pos = bisect.bisect_left(maxes, key)
+            if pos == len(maxes):
+                pos -= 1
+                chunk = chunks[pos]
+                chunk.append(key)
+                maxes[pos] = key
+            else:
+                chunk = chunks[pos]
+                bisect.insort_left(chunk, key)
+            frozen[pos] = None
+            if len(chunk) > 2 * self.load:
+                half = chunk[self.load:]
+                del chunk[self.load:]
+                maxes[pos] = chunk[-1]
+                chunks.insert(pos + 1, half)
+                maxes.insert(pos + 1, half[-1])
+                frozen.insert(pos + 1, None)
+        self._len += 1
+        self._changed = True
+
+    def remove(self, key):
+        """ Remove a key. Raises `KeyError` if it is not present.
+        """
+        chunks = self._chunks
+        maxes = self._maxes
+        pos = bisect.bisect_left(maxes, key)
+        if pos == len(maxes):
+            raise KeyError(key)
+        chunk = chunks[pos]
+        idx = bisect.bisect_left(chunk, key)
+        if chunk[idx] != key:
+            raise KeyError(key)
+        del chunk[idx]
+        if chunk:
+            maxes[pos] = chunk[-1]
+            self._frozen[pos] = None
+        else:
+            del chunks[pos]
+            del maxes[pos]
+            del self._frozen[pos]
+        self._len -= 1
+        self._changed = True
+
+    def update(self, keys):
+        """ Insert many keys, merging them with the keys in a single pass
+        unless they are few.
+        """
+        keys = list(keys)
+        if len(keys) < 8 or len(keys) * 8 < self._len:
+            for key in keys:
+                self.add(key)
+            return
+        # Sorting the concatenation of two sorted runs merges them.
+        merged = list(itertools.chain.from_iterable(self._chunks))
+        merged.extend(sorted(keys))
+        merged.sort()
+        load = self.load
+        self._chunks = [merged[i:i + load]
+                        for i in xrange(0, len(merged), load)]
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+        self._frozen = [None] * len(self._chunks)
+        self._len = len(merged)
+        self._changed = True
+
+
 ###############################################################################
 # `EventInfo` Private Class.
 ###############################################################################
 class EventInfo(object):
     """ A class which manages handling of a single event.
+
+    The listener structures read on event emission are immutable snapshots
+    which are replaced, under a lock, whenever listeners are connected or
+    disconnected. Emitting an event therefore never takes a lock. The sorted
+    lists of listeners are published in chunks by the writers, and the first
+    emit after a change rebuilds their tuple from the chunks.
     """
-    def __init__(self, cls):
+    def __init__(self, cls, on_change=None, on_disconnect=None):
         """ Constructor.
 
         Parameters:
         -----------
         cls : class
             Class of the event.
+        on_change : callable
+            Called without arguments whenever the listeners or the enabled
+            state of the event change.
+        on_disconnect : callable
+            Called with the notifier of each listener disconnected, or
+            replaced by reconnecting it.
         """
         self.cls = cls
-        self._priority_list = [] # sorted priority list
+        self._on_change = on_change
+        self._on_disconnect = on_disconnect
         self._priority_info = {}
         self._listener_filters = {}
-        self._filter_keys = set() # to precompute filters on event emit
+        self._filter_keys = frozenset() # to precompute filters on event emit
         self._disable = False
+        # the number of listeners called by an executor
+        self._offloaded = 0
 
+        # lock serializing the modifications of the snapshots
         self._priority_list_lock = threading.RLock()
 
+        # sorted priority keys of all the listeners, and of the listeners
+        # without any filter
+        self._priority_keys = ChunkedSortedList()
+        self._unfiltered_keys = ChunkedSortedList()
+        # inverted index: {attribute: {value: {id: (key, filter)}}}, every
+        # filtered listener is indexed on a single attribute of its filter;
+        # the innermost dicts are replaced rather than modified
+        self._filter_index = {}
+        # prefix index: {attribute: {prefix: {id: (key, filter)}}}, for
+        # listeners indexed on a `Prefix` filter, and the sorted lengths of
+        # the prefixes of each attribute (a dict replaced rather than
+        # modified), maintained from the number of listeners per prefix
+        # length: {attribute: {length: count}}
+        self._prefix_index = {}
+        self._prefix_lengths = {}
+        self._prefix_counts = {}
+        # source index: {id(source): {id: (key, filter)}}, for listeners
+        # filtering on the ``source`` of events, which are indexed by the
+        # identity of the source; the filters hold the sources alive, so
+        # their ids are not reused while they are indexed
+        self._source_index = {}
+        # filtered listeners which cannot be indexed, because their filter
+        # values are unhashable or their filter operators not indexable:
+        # {id: (key, filter)}, modified in place under the lock, and the
+        # sorted ``(key, filter)`` entries read on emit
+        self._unindexed = {}
+        self._unindexed_keys = ChunkedSortedList()
+
+    @property
+    def _priority_list(self):
+        """ Sorted priority tuple of all the listeners.
+        """
+        return self._priority_keys.snapshot()
+
+    @property
+    def _unfiltered_list(self):
+        """ Sorted priority tuple of the listeners without any filter.
+        """
+        return self._unfiltered_keys.snapshot()
+
+    @property
+    def _unindexed_list(self):
+        """ Sorted tuple of the ``(key, filter)`` of the unindexed listeners.
+        """
+        return self._unindexed_keys.snapshot()
 
-    def connect(self, func, filter=None, priority=0, count=0):
+    def connect(self, func, filter=None, priority=0, count=0, executor=None):
         """ Add a listener for the event.
 
         Parameters:
@@ -121,65 +378,311 @@ class EventInfo(object):
             A unique integer to break a tie in priority. This is generally
             an incremental number assigned by EventManager in order of
             registration.
+        executor : executor
+            The executor calling the listener off the emitting thread, or
+            None to call it inline.
 
         Filter specification:
             key - string which is name of an attribute of the event instance.
-            value - the value of the specified attribute.
+            value - the value of the specified attribute, or a filter
+                operator of `encore.events.filters` which the attribute must
+                satisfy.
 
         Note: Reconnecting an already connected listener will disconnect the
         old listener. This may have rammifications in changing the filters
         and the priority.
 
-        The filtering is added so that future optimizations can be done
-        on specific events with large number of handlers. For example there
-        should be a fast way to filter key events to specific listeners rather
-        than iterating through all listeners.
+        Filtered listeners are kept in an inverted index from an attribute
+        value (or prefix) to listeners, so that emitting an event only
+        considers the listeners whose filter can match the event. Listeners
+        filtering on the ``source`` of events are indexed on the identity of
+        the source, and only receive events whose source is that object.
+        Listeners whose filters are neither values, `In` nor `Prefix` filters
+        are matched against every event. An event which lacks a filtered
+        attribute does not match the filter.
         """
-        id = self.get_id(func)
-        if id in self._priority_info:
-            # Ensure a function is connected only once.
-            # Reconnecting will update its sequence and filters.
-            self._disconnect(id)
-        with self._priority_list_lock:
+        self.connect_many([(func, filter, priority, count, executor)])
+
+    def connect_many(self, listeners):
+        """ Add many listeners for the event at once.
+
+        ``listeners`` is an iterable of ``(func, filter, priority, count)``
+        or ``(func, filter, priority, count, executor)`` tuples of the
+        arguments of `connect`. The listeners are added in a single pass under
+        the lock, and the change is notified once. If a listener cannot be
+        connected, such as a method of an unhashable object, none are.
+        """
+        # Make the notifiers first, so that a failure changes nothing.
+        prepared = []
+        for listener in listeners:
+            func, filter, priority, count = listener[:4]
+            id = self.get_id(func)
+            hash(id)
             sub = self._get_notifier(func, self._listener_deleted)
-            if filter:
-                self._listener_filters[id] = filter
-                for key in filter:
-                    self._filter_keys.add(key)
-            key = (-priority, count, sub)
-            bisect.insort_left(self._priority_list, key)
-            self._priority_info[id] = key
+            if len(listener) > 4 and listener[4] is not None:
+                sub.executor = listener[4]
+            prepared.append((id, filter, (-priority, count, sub)))
+
+        removed = []
+        with self._priority_list_lock:
+            staged = {}
+            added = {}
+            for id, filter, key in prepared:
+                if id in self._priority_info:
+                    # Ensure a function is connected only once.
+                    # Reconnecting will update its sequence and filters.
+                    removed.append(self._remove(id, staged, added))
+                if key[-1].executor is not None:
+                    self._offloaded += 1
+                self._priority_info[id] = key
+                added[id] = key
+                if filter:
+                    self._listener_filters[id] = filter
+                    self._add_to_index(id, key, filter, staged)
+            self._priority_keys.update(added.itervalues())
+            self._unfiltered_keys.update([key for id, key in
+                added.iteritems() if id not in self._listener_filters])
+            self._publish(staged)
+        self._changed()
+        self._disconnected(removed)
 
     def disconnect(self, func):
         """ Disconnects a listener from being notified about the event.
         """
         self._disconnect(self.get_id(func))
 
+    def disconnect_many(self, funcs):
+        """ Disconnect many listeners at once.
+
+        Raises KeyError, without disconnecting any listener, if one of the
+        listeners is not connected.
+        """
+        self._disconnect_many([self.get_id(func) for func in funcs])
+
     def _listener_deleted(self, id):
-        if id in self._priority_info:
-            self._disconnect(id)
+        """ Disconnect a method listener whose object was garbage collected.
+
+        This removes the listener from all the dispatch structures, and the
+        dispatch plans of the event manager are invalidated.
+        """
+        with self._priority_list_lock:
+            if id in self._priority_info:
+                self._disconnect(id)
 
     def _disconnect(self, id):
+        self._disconnect_many([id])
+
+    def _disconnect_many(self, ids):
         with self._priority_list_lock:
-            key = self._priority_info[id]
-            idx = bisect.bisect_left(self._priority_list, key)
-            del self._priority_info[id]
-            del self._priority_list[idx]
-            if id in self._listener_filters:
-                del self._listener_filters[id]
+            for id in ids:
+                if id not in self._priority_info:
+                    raise KeyError(id)
+            staged = {}
+            removed = [self._remove(id, staged) for id in ids
+                       if id in self._priority_info]
+            self._publish(staged)
+        self._changed()
+        self._disconnected(removed)
 
-    def get_id(self, func):
-        """ Get an id as unique key for the function. """
-        if type(func) is MethodType:
-            obj = func.im_self
-            if obj is None:
-                # Unbound method
-                return weakref.ref(func.im_func),weakref.ref(func.im_class)
+    def _remove(self, id, staged, added=None):
+        """ Remove a listener from the structures, except the staged index
+        buckets.
+
+        ``added`` are the keys of the listeners added in the same batch,
+        which are not yet in the sorted lists. Returns the notifier of the
+        listener.
+        """
+        key = self._priority_info.pop(id)
+        filter = self._listener_filters.pop(id, None)
+        if key[-1].executor is not None:
+            self._offloaded -= 1
+        if added is not None and id in added:
+            del added[id]
+        else:
+            self._priority_keys.remove(key)
+            if filter is None:
+                self._unfiltered_keys.remove(key)
+        if filter is not None:
+            self._remove_from_index(id, filter, staged)
+        return key[-1]
+
+    def _changed(self):
+        """ Notify the owner that the listeners or enabled state changed.
+        """
+        if self._on_change is not None:
+            self._on_change()
+
+    def _disconnected(self, notifiers):
+        """ Notify the owner of the notifiers of disconnected listeners.
+        """
+        if self._on_disconnect is not None:
+            for notifier in notifiers:
+                self._on_disconnect(notifier)
+
+    def _index_entry(self, filter):
+        """ Where a filtered listener is indexed.
+
+        Returns an ``(attribute, values, prefix)`` tuple, for a listener
+        indexed on either the ``values`` or the ``prefix`` of the attribute,
+        or None for a listener which cannot be indexed, because its values
+        are unhashable or hashed by identity but compared by value. Values
+        are preferred over prefixes, and the first attribute by name is
+        chosen.
+        """
+        prefixed = None
+        for attr in sorted(filter):
+            value = filter[attr]
+            if isinstance(value, FilterOperator):
+                values = value.index_values()
+                if values is not None:
+                    return attr, frozenset(values), None
+                prefix = value.index_prefix()
+                if prefix is not None and prefixed is None:
+                    prefixed = attr, None, prefix
+            elif hashable_by_value(value):
+                return attr, (value,), None
+        return prefixed
+
+    def _source_key(self, filter):
+        """ The key of a filtered listener in the source index, or None if
+        it is not indexed on the source of events.
+
+        Only sources which compare by identity are indexed on their identity,
+        other sources, such as strings or numbers, are indexed on their value
+        so that equal sources match.
+        """
+        source = filter.get('source', _missing)
+        if (source is _missing or isinstance(source, FilterOperator) or
+                not _compares_by_identity(source)):
+            return None
+        return _id(source)
+
+    def _index_buckets(self, filter, staged):
+        """ Return the staged copies of the index buckets of a filtered
+        listener.
+
+        ``staged`` maps ``(index, attribute, value)`` tuples to the copies of
+        the buckets modified by a batch of changes, which are published by
+        `_publish` once the batch is done. The bucket of the unindexed
+        listeners is not copied, but modified in place.
+        """
+        source_key = self._source_key(filter)
+        if source_key is not None:
+            locations = [('source', None, source_key)]
+        else:
+            entry = self._index_entry(filter)
+            if entry is None:
+                locations = [('unindexed', None, None)]
             else:
-                # Bound method.
-                return weakref.ref(func.im_func),weakref.ref(func.im_self)
+                attr, values, prefix = entry
+                if values is None:
+                    locations = [('prefix', attr, prefix)]
+                else:
+                    locations = [('value', attr, value) for value in values]
+        buckets = []
+        for location in locations:
+            bucket = staged.get(location)
+            if bucket is None:
+                kind, attr, value = location
+                if kind == 'unindexed':
+                    # Modified in place, emits read its snapshot.
+                    bucket = self._unindexed
+                elif kind == 'source':
+                    bucket = dict(self._source_index.get(value, ()))
+                elif kind == 'prefix':
+                    bucket = dict(self._prefix_index.get(attr, {}).get(value,
+                                                                       ()))
+                else:
+                    bucket = dict(self._filter_index.get(attr, {}).get(value,
+                                                                       ()))
+                staged[location] = bucket
+            buckets.append(bucket)
+        return buckets
+
+    def _add_to_index(self, id, key, filter, staged):
+        """ Add a filtered listener to the staged filter index buckets.
+        """
+        for bucket in self._index_buckets(filter, staged):
+            bucket[id] = (key, filter)
+            if bucket is self._unindexed:
+                self._unindexed_keys.add((key, filter))
+
+    def _remove_from_index(self, id, filter, staged):
+        """ Remove a filtered listener from the staged filter index buckets.
+        """
+        for bucket in self._index_buckets(filter, staged):
+            entry = bucket.pop(id)
+            if bucket is self._unindexed:
+                self._unindexed_keys.remove(entry)
+
+    def _publish(self, staged):
+        """ Replace the index buckets by their staged copies, and publish the
+        changes of the sorted lists of listeners.
+        """
+        prefix_attrs = set()
+        for (kind, attr, value), bucket in staged.iteritems():
+            if kind == 'unindexed':
+                # Modified in place.
+                continue
+            if kind == 'source':
+                index = self._source_index
+            elif kind == 'prefix':
+                index = self._prefix_index.setdefault(attr, {})
+                if self._count_prefix(attr, len(value),
+                                      len(bucket) - len(index.get(value, ()))):
+                    prefix_attrs.add(attr)
+            else:
+                index = self._filter_index.setdefault(attr, {})
+                if attr not in self._filter_keys:
+                    self._filter_keys = self._filter_keys.union([attr])
+            if bucket:
+                index[value] = bucket
+            else:
+                index.pop(value, None)
+            if not index and kind == 'value':
+                self._filter_keys = self._filter_keys.difference([attr])
+                del self._filter_index[attr]
+            elif not index and kind == 'prefix':
+                del self._prefix_index[attr]
+        for attr in prefix_attrs:
+            self._update_prefix_lengths(attr)
+        self._priority_keys.publish()
+        self._unfiltered_keys.publish()
+        self._unindexed_keys.publish()
+
+    def _count_prefix(self, attr, length, delta):
+        """ Add ``delta`` to the number of listeners indexed on a prefix of
+        ``length`` of an attribute.
+
+        Returns whether the length appeared or disappeared, so that the
+        lengths of the attribute need to be updated.
+        """
+        if not delta:
+            return False
+        counts = self._prefix_counts.setdefault(attr, {})
+        count = counts.get(length, 0)
+        counts[length] = count + delta
+        if counts[length]:
+            return not count
+        del counts[length]
+        if not counts:
+            del self._prefix_counts[attr]
+        return True
+
+    def _update_prefix_lengths(self, attr):
+        """ Update the lengths of the indexed prefixes of an attribute.
+        """
+        prefix_lengths = self._prefix_lengths.copy()
+        counts = self._prefix_counts.get(attr)
+        if counts:
+            prefix_lengths[attr] = tuple(sorted(counts))
         else:
-            return func
+            prefix_lengths.pop(attr, None)
+        self._prefix_lengths = prefix_lengths
+
+    def get_id(self, func):
+        """ Get an id as unique key for the function. """
+        return listener_id(func)
 
     def _get_notifier(self, func, notify=None):
         """ Notify is callable to be called when the bound func's object
@@ -200,34 +703,111 @@ class EventInfo(object):
         If ``evt`` is None, all listeners are returned.
         If ``eve`` is an event, only listeners which will be called for the
         event are returned (satisfying any filters on the listeners).
+
+        The returned sequence must not be modified.
+        """
+        if evt is None or not self._listener_filters:
+            return self._priority_list
+        unfiltered = self._unfiltered_list
+        index = self._filter_index
+        matched = []
+        if self._source_index:
+            bucket = self._source_index.get(_id(getattr(evt, 'source',
+                                                        _missing)))
+            if bucket:
+                for linfo, filter in bucket.itervalues():
+                    if self._matches(evt, filter):
+                        matched.append(linfo)
+        for attr in self._filter_keys:
+            values = index.get(attr)
+            if values is None:
+                # Concurrently removed from the index.
+                continue
+            try:
+                bucket = values.get(getattr(evt, attr, _missing))
+            except TypeError:
+                # Unhashable event attribute, cannot match indexed values.
+                continue
+            if bucket:
+                for linfo, filter in bucket.itervalues():
+                    if self._matches(evt, filter):
+                        matched.append(linfo)
+        for attr, lengths in self._prefix_lengths.iteritems():
+            prefixes = self._prefix_index.get(attr)
+            value = getattr(evt, attr, _missing)
+            if prefixes is None or value is _missing:
+                continue
+            try:
+                size = len(value)
+            except TypeError:
+                # Not a sequence, cannot match indexed prefixes.
+                continue
+            for length in lengths:
+                if length > size:
+                    break
+                try:
+                    bucket = prefixes.get(value[:length])
+                except TypeError:
+                    # Unhashable slices, cannot match indexed prefixes.
+                    break
+                if bucket:
+                    for linfo, filter in bucket.itervalues():
+                        if self._matches(evt, filter):
+                            matched.append(linfo)
+        for linfo, filter in self._unindexed_list:
+            if self._matches(evt, filter):
+                matched.append(linfo)
+        if not matched:
+            return unfiltered
+        matched.sort()
+        return tuple(heapq.merge(unfiltered, matched))
+
+    def _matches(self, evt, filter):
+        """ Whether the event satisfies all the items of the filter.
+        """
+        for key, value in filter.iteritems():
+            attr = getattr(evt, key, _missing)
+            if isinstance(value, FilterOperator):
+                if attr is _missing or not value.matches(attr):
+                    return False
+            elif attr != value:
+                return False
+        return True
+
+    def disconnect_notifier(self, notifier):
+        """ Disconnect the listener with the given notifier, if connected.
+
+        Returns whether the listener was connected.
         """
         with self._priority_list_lock:
-            if evt is None or not self._listener_filters:
-                return self._priority_list[:]
-            ret = []
-            l_filter = self._listener_filters
-            for linfo in self._priority_list:
-                listener = linfo[-1]
-                id = self.get_id(listener())
-                if id in l_filter:
-                    for key, value in l_filter[id].iteritems():
-                        if getattr(evt, key) != value:
-                            break
-                    else:
-                        ret.append(linfo)
-                else:
-                    ret.append(linfo)
-            return ret
+            for id, key in self._priority_info.items():
+                if key[-1] is notifier:
+                    self._disconnect(id)
+                    return True
+        return False
+
+    def has_filters(self):
+        """ Whether any of the listeners of the event has a filter.
+        """
+        return bool(self._listener_filters)
+
+    def has_executors(self):
+        """ Whether any of the listeners of the event is called by an
+        executor.
+        """
+        return bool(self._offloaded)
 
     def disable(self):
         """ Disable the event from generating notifications.
         """
         self._disable = True
+        self._changed()
 
     def enable(self):
         """ Enable the event again to generate notifications.
         """
         self._disable = False
+        self._changed()
 
     def is_enabled(self):
         """ Check if the event is enabled.
@@ -235,6 +815,35 @@ class EventInfo(object):
         return not self._disable
 
 
+###############################################################################
+# `DispatchPlan` Private Class.
+###############################################################################
+class DispatchPlan(object):
+    """ The precomputed listeners to be notified for an event class.
+
+    A plan is valid as long as the generation of the `EventManager` it was
+    computed for does not change.
+    """
+    __slots__ = ['generation', 'enabled', 'infos', 'listeners', 'filtered',
+                 'offloaded', 'caches']
+    def __init__(self, generation, enabled, infos, listeners, filtered,
+                 offloaded=False, caches=()):
+        # The generation of the event manager the plan was computed for.
+        self.generation = generation
+        # Whether the event class and all its superclasses are enabled.
+        self.enabled = enabled
+        # The EventInfo instances of the event class hierarchy.
+        self.infos = infos
+        # Merged priority-ordered tuple of all the listeners.
+        self.listeners = listeners
+        # Whether any listener has a filter, the merged tuple then has to be
+        # recomputed for every event.
+        self.filtered = filtered
+        # Whether any listener is called by an executor.
+        self.offloaded = offloaded
+        # The last value caches of the event class hierarchy.
+        self.caches = caches
+
 ###############################################################################
 # `EventManager` Class.
 ###############################################################################
@@ -245,9 +854,68 @@ class EventManager(BaseEventManager):
     """
     # store the length of the BaseEvent's __mro__
     bmro_clip = -len(BaseEvent.__mro__)+1
-    def __init__(self):
+    def __init__(self, executor=None, error_policy=None, scheduler=None):
+        """ Constructor.
+
+        Parameters:
+        -----------
+        executor : executor
+            The executor used for non-blocking emits. It must have a
+            ``submit(fn, *args)`` method returning a future-like object, such
+            as `BoundedExecutor`, or `OrderedExecutor` for FIFO delivery per
+            event source. A default `BoundedExecutor` is created on the first
+            non-blocking emit if not specified.
+        error_policy : ErrorPolicy
+            The policy handling the exceptions raised by listeners, see
+            `encore.events.error_policies`. Defaults to a `LogPolicy`, which
+            logs every exception.
+        scheduler : Scheduler
+            The scheduler of delayed emits, see `encore.events.scheduler`.
+            A default `Scheduler` is created on the first delayed emit if not
+            specified. Keys of delayed emits are shared by the event managers
+            sharing a scheduler.
+        """
         self.event_map = {}
         self.count = itertools.count()
+        self.executor = executor
+        self._executor_lock = threading.Lock()
+        self.scheduler = scheduler
+
+        # The futures of the deliveries by executors of listeners, by the id
+        # of their event: {id(evt): set(futures)}. The futures hold the events
+        # alive, so their ids are not reused while they are tracked.
+        self._deliveries = {}
+        self._deliveries_lock = threading.Lock()
+
+        # The last value caches of event classes, and the sequence ordering
+        # the events of different caches.
+        self._caches = {}
+        self._cache_sequence = itertools.count()
+
+        # The subscriptions to string topics, see `encore.events.topics`.
+        self.topics = TopicRegistry(
+            on_unsubscribe=self._listener_disconnected)
+
+        # Counts and handles the exceptions raised by listeners.
+        if error_policy is None:
+            error_policy = LogPolicy()
+        self.error_policy = error_policy
+
+        # Dispatch statistics, recorded only while profiling is enabled.
+        self.profiler = None
+        self._profiling = False
+        # Tracers notified of the dispatch of events, see
+        # `encore.events.tracing`, replaced rather than modified.
+        self._tracers = ()
+        # Whether events are dispatched through the instrumented path, when
+        # profiling or tracing.
+        self._instrumented = False
+
+        # Cached dispatch plans for event classes, invalidated by bumping
+        # the generation whenever listeners or enabled states change.
+        self._plans = {}
+        self._generation = 0
+        self._generation_lock = threading.Lock()
 
     ###########################################################################
     # `EventManager` Interface
@@ -266,9 +934,12 @@ class EventManager(BaseEventManager):
         if cls in self.event_map:
             raise ValueError('Event {0} already registered'.format(cls))
         else:
-            self.event_map[cls] = EventInfo(cls)
+            self.event_map[cls] = EventInfo(cls, self._invalidate,
+                                            self._listener_disconnected)
+            self._invalidate()
 
-    def connect(self, cls, func, filter=None, priority=0):
+    def connect(self, cls, func, filter=None, priority=0, executor=None,
+                coalesce_by=None, window=0.1, batch=False, replay=False):
         """ Add a listener for the event.
 
         Parameters:
@@ -285,28 +956,111 @@ class EventManager(BaseEventManager):
             before lower priority listeners (even from sub/superclass events).
             Listeners with same priority are called in order of `count`.
 
+        executor : executor
+            If not None, the listener is called by this executor rather than
+            by the thread emitting the event, so that a slow listener does
+            not hold up the emitter and the other listeners. An
+            `OrderedExecutor` calls it in order of emission per event source,
+            and a single threaded `BoundedExecutor` always calls it from the
+            same thread. The executor must have a ``submit(fn, *args)``
+            method returning a future with ``wait(timeout)`` and
+            ``add_done_callback(fn)`` methods, such as an `EventFuture`.
+        coalesce_by : sequence of str
+            If not None, the events are buffered for ``window`` seconds and
+            collapsed by the values of these attributes, so that the listener
+            receives only the last event emitted for each of them, see
+            `encore.events.coalescing`. The listener is called by the
+            scheduler thread, or by ``executor`` if given.
+        window : float
+            The time in seconds during which coalesced events are buffered.
+        batch : bool
+            Whether the coalesced events of a window are given to the listener
+            together, as a list, rather than in turn. The exceptions raised
+            for a batch are reported to the error policy for its last event.
+        replay : bool
+            Whether to notify the listener of the events of class ``cls``
+            matching the filter in the last value caches, see
+            ``enable_last_value_cache()``, in the order they were emitted.
+
         Filter specification:
             key - string which is name of an attribute of the event instance.
-            value - the value of the specified attribute.
+            value - the value of the specified attribute, or a filter
+                operator of `encore.events.filters`, such as ``In(values)``,
+                ``Prefix(prefix)``, ``Range(low, high)`` or
+                ``NotEqual(value)``, which the attribute must satisfy.
 
         Note: Reconnecting an already connected listener will disconnect the
         old listener. This may have rammifications in changing the filters
         and the priority.
 
-        The filtering is added so that future optimizations can be done
-        on specific events with large number of handlers. For example there
-        should be a fast way to filter key events to specific listeners rather
-        than iterating through all listeners.
+        Listeners are indexed on plain values, `In` and `Prefix` filters, so
+        that emitting an event does not iterate through all the filtered
+        listeners of an event with a large number of handlers, such as key
+        events filtered by key.
+
+        Listeners called by an executor receive events after the emitting
+        thread has moved on, and cannot stop their propagation by marking
+        them as handled. Use ``wait_for_deliveries(evt)`` to wait for them.
         """
+        if coalesce_by is not None:
+            executor = Coalescer(self._get_scheduler(), coalesce_by, window,
+                                 batch, executor)
         if cls not in self.event_map:
             self.register(cls)
-        self.event_map[cls].connect(func, filter, priority, next(self.count))
+        self.event_map[cls].connect(func, filter, priority, next(self.count),
+                                    executor)
+        if replay:
+            return self._replay(cls, func, filter)
 
     def disconnect(self, cls, func):
         """ Disconnects a listener from being notified about the event'
         """
         self.event_map[cls].disconnect(func)
 
+    def connect_many(self, cls, listeners, filter=None, priority=0,
+                     executor=None):
+        """ Add many listeners for the event at once.
+
+        This is equivalent to connecting each listener in turn, but the
+        listeners are added in a single pass and the dispatch plans are
+        invalidated once, so that connecting many thousands of listeners
+        does not take quadratic time.
+
+        Parameters:
+        -----------
+        cls : class
+            The class of events for which the listeners are registered.
+        listeners : iterable
+            The listeners, each either a callable, connected with the
+            ``filter`` and ``priority`` arguments, or a ``(func, filter)`` or
+            ``(func, filter, priority)`` tuple.
+        filter : dict
+            The filter of the listeners given as callables.
+        priority : int
+            The priority of the listeners not given with a priority.
+        executor : executor
+            The executor calling all the listeners, see ``connect()``.
+        """
+        if cls not in self.event_map:
+            self.register(cls)
+        count = self.count
+        items = []
+        for listener in listeners:
+            if isinstance(listener, tuple):
+                func, lfilter, lpriority = (listener + (priority,))[:3]
+            else:
+                func, lfilter, lpriority = listener, filter, priority
+            items.append((func, lfilter, lpriority, next(count), executor))
+        self.event_map[cls].connect_many(items)
+
+    def disconnect_many(self, cls, funcs):
+        """ Disconnect many listeners at once.
+
+        Raises `KeyError`, without disconnecting any listener, if one of the
+        listeners is not connected.
+        """
+        self.event_map[cls].disconnect_many(funcs)
+
     def emit(self, evt, block=True):
         """ Notifies all listeners about the event with the specified arguments.
 
@@ -316,39 +1070,265 @@ class EventManager(BaseEventManager):
             The BaseEvent instance to emit.
         block : bool
             Whether to block the call until the event handling is finished.
-            If block is False, the event will be emitted in a separate thread
-            and the thread will be returned, so you can later query its status
-            or do ``wait()`` on the thread.
+            If block is False, the event will be emitted by the executor of
+            the event manager and a future-like handle will be returned, so
+            you can later query its status or do ``wait()`` on it.
 
         Note: Listeners of superclasses of the event are also called.
         BaseEvent listener will also be notified about any derived class events.
+
+        The default executor finishes its pending non-blocking emits at
+        interpreter exit. An executor given to the constructor is not shut
+        down, use `encore.events.executors.shutdown_at_exit` for that.
         """
         if not block:
-            t = threading.Thread(target=self.emit, args=(evt, True),
-                                 name='Event emit: {0}'.format(evt))
-            t.start()
-            return t
-        cls = type(evt)
-        if not self.is_enabled(cls):
+            return self._get_executor().submit(self.emit, evt, True)
+        plan = self._get_plan(type(evt))
+        if not plan.enabled:
             return
+        if plan.caches:
+            self._store(evt, plan.caches)
 
-        listeners = self.get_listeners(evt, cls)
+        self._dispatch(evt, self._plan_listeners(plan, evt), plan.offloaded)
 
-        evt.pre_emit()
+    def emit_many(self, events, block=True):
+        """ Notifies all listeners about each of the events in turn.
 
-        for listener in listeners:
+        This is equivalent to calling ``emit()`` for each event, except that
+        the enabled state and the listeners of each event class are resolved
+        only once for the whole batch. Listeners connected, disconnected,
+        enabled or disabled while the batch is being emitted take effect from
+        the next batch.
+
+        Parameters:
+        -----------
+        events : iterable of BaseEvent instances
+            The events to emit, in order.
+        block : bool
+            Whether to block the call until the event handling is finished.
+            If block is False, the events will be emitted by the executor of
+            the event manager and a future-like handle will be returned.
+        """
+        if not block:
+            return self._get_executor().submit(self.emit_many, list(events),
+                                               True)
+        plans = {}
+        for evt in events:
+            cls = type(evt)
             try:
-                listener(evt)
+                plan = plans[cls]
+            except KeyError:
+                plan = plans[cls] = self._get_plan(cls)
+            if plan.enabled:
+                if plan.caches:
+                    self._store(evt, plan.caches)
+                self._dispatch(evt, self._plan_listeners(plan, evt),
+                               plan.offloaded)
+
+    def emit_later(self, evt, delay, key=None, block=True):
+        """ Emit an event after a delay, from the scheduler thread.
+
+        Parameters:
+        -----------
+        evt : BaseEvent instance
+            The BaseEvent instance to emit.
+        delay : float
+            The delay in seconds.
+        key : hashable
+            If not None, a pending delayed emit with the same key is
+            cancelled, so that only the last of a burst of events is emitted.
+        block : bool
+            If False, the event is emitted by the executor of the event
+            manager, so that slow listeners do not hold up the scheduler.
+
+        Returns a `ScheduledCall` handle, whose ``cancel()`` method cancels
+        the emit if it is still pending.
+        """
+        scheduler = self._get_scheduler()
+        return scheduler.schedule(scheduler.timer() + delay, self.emit,
+                                  (evt, block), key)
+
+    def emit_at(self, evt, when, key=None, block=True):
+        """ Emit an event at the time ``when`` of the timer of the
+        scheduler, ``time.time()`` by default, from the scheduler thread.
+
+        See ``emit_later()`` for the other parameters.
+        """
+        return self._get_scheduler().schedule(when, self.emit, (evt, block),
+                                              key)
+
+    def cancel_emit(self, key):
+        """ Cancel the pending delayed emit with the given key. Returns
+        whether there was one.
+        """
+        scheduler = self.scheduler
+        return scheduler is not None and scheduler.cancel(key)
+
+    def subscribe(self, pattern, func, priority=0):
+        """ Subscribe a listener to the string topics matching a pattern.
+
+        Parameters:
+        -----------
+        pattern : str
+            A dot separated topic pattern, such as ``'store.*.update'``,
+            whose ``*`` segments match any single segment of a topic, and
+            ``**`` segments any number of segments.
+        func : callable
+            The listener, called as ``func(topic, payload)`` for each
+            published topic matching the pattern. Bound methods are weakly
+            referenced, like the listeners of events.
+        priority : int
+            The priority of the listener. Higher priority listeners of a topic
+            are called first.
+
+        A listener subscribed to several patterns matching a topic is called
+        for each of them.
+        """
+        self.topics.subscribe(pattern, func, priority, next(self.count))
+
+    def unsubscribe(self, pattern, func):
+        """ Unsubscribe a listener from a topic pattern.
+
+        Raises KeyError if the listener is not subscribed to the pattern.
+        """
+        self.topics.unsubscribe(pattern, func)
+
+    def publish(self, topic, payload=None):
+        """ Notify the subscribers of a string topic, with a payload.
+
+        This is a lightweight alternative to ``emit()`` for trivial
+        notifications: no event object is created, and the subscribers of a
+        topic are resolved once until the subscriptions change. Exceptions
+        of subscribers are handled by the error policy, but topics are not
+        profiled, traced, cached nor delivered by executors.
+        """
+        for subscriber in self.topics.subscribers(topic):
+            try:
+                subscriber.dispatch(topic, payload)
             except BaseException as e:
-                logger.warn('Exception {0} occurred in listener: {1} for '
-                    'event: {2}:\n{3}'.format(e, listener, evt,
-                                              traceback.format_exc()))
-            if evt._handled:
-                logger.info('Event: {0} handled by listener: {1}'.format(
-                                                        evt, listener))
-                break
+                self._listener_error(topic, subscriber, e)
+
+    def wait_for_deliveries(self, evt, timeout=None):
+        """ Wait until the listeners called by executors have been notified
+        of an event, see ``connect()``.
+
+        Returns whether all of them were notified before the timeout, in
+        seconds.
+        """
+        with self._deliveries_lock:
+            futures = list(self._deliveries.get(_id(evt), ()))
+        if timeout is not None:
+            deadline = time.time() + timeout
+        for future in futures:
+            if timeout is None:
+                future.wait()
+            elif not future.wait(max(0, deadline - time.time())):
+                return False
+        return True
+
+    def enable_last_value_cache(self, cls, key_by=(), max_size=1000):
+        """ Cache the last emitted event of class ``cls``, or of a subclass,
+        for each value of the ``key_by`` attributes.
+
+        The cached events are replayed to the listeners connected with
+        ``replay=True``. At most ``max_size`` events are cached, evicting the
+        least recently updated keys. Returns the `LastValueCache`, replacing
+        any previous cache of the class.
+        """
+        cache = LastValueCache(key_by, max_size)
+        self._caches[cls] = cache
+        self._invalidate()
+        return cache
+
+    def disable_last_value_cache(self, cls):
+        """ Stop caching the events of class ``cls``, dropping its cache.
+        """
+        if self._caches.pop(cls, None) is not None:
+            self._invalidate()
+
+    def get_last_value_cache(self, cls):
+        """ Return the `LastValueCache` of class ``cls``, or None.
+        """
+        return self._caches.get(cls)
+
+    def enable_profiling(self, timer=None):
+        """ Start recording dispatch statistics of the listeners.
+
+        Parameters:
+        -----------
+        timer : callable
+            A function returning the current wall time in seconds, used to
+            time the listeners. Defaults to ``timeit.default_timer``.
+        """
+        if self.profiler is None:
+            self.profiler = DispatchProfiler()
+        if timer is not None:
+            self.profiler.timer = timer
+        self._profiling = True
+        self._update_instrumented()
+
+    def disable_profiling(self):
+        """ Stop recording dispatch statistics of the listeners.
+
+        The statistics recorded so far can still be queried.
+        """
+        self._profiling = False
+        self._update_instrumented()
+
+    def get_profile_stats(self, cls=None):
+        """ Return the recorded dispatch statistics, slowest listeners first.
+
+        Returns a list of `ListenerStats`, one for each pair of emitted event
+        class and listener. If ``cls`` is specified, only the statistics for
+        emitted events of that exact class are returned. The statistics of
+        disconnected listeners are discarded.
+        """
+        if self.profiler is None:
+            return []
+        return self.profiler.get_stats(cls)
+
+    def reset_profile_stats(self):
+        """ Discard the recorded dispatch statistics.
+        """
+        if self.profiler is not None:
+            self.profiler.reset()
+
+    def add_tracer(self, tracer):
+        """ Install a tracer notified of the dispatch of events.
+
+        The ``pre_dispatch(evt)`` and ``post_dispatch(evt)`` methods of the
+        tracer are called around the notification of the listeners of each
+        emitted event, and its ``pre_listener(evt, listener)`` and
+        ``post_listener(evt, listener, exc)`` methods around the call of each
+        listener. See `encore.events.tracing.DispatchTracer`.
+        """
+        with self._generation_lock:
+            self._tracers = self._tracers + (tracer,)
+        self._update_instrumented()
+
+    def remove_tracer(self, tracer):
+        """ Uninstall a tracer.
+
+        Raises ValueError if the tracer is not installed.
+        """
+        with self._generation_lock:
+            tracers = list(self._tracers)
+            tracers.remove(tracer)
+            self._tracers = tuple(tracers)
+        self._update_instrumented()
+
+    def get_listener_failures(self):
+        """ Return the failure counters of the listeners which raised
+        exceptions, most failing listeners first.
 
-        evt.post_emit()
+        Returns a list of `ListenerFailures` recorded by the error policy.
+        """
+        return self.error_policy.get_failures()
+
+    def reset_listener_failures(self):
+        """ Discard the failure counters of the listeners.
+        """
+        self.error_policy.reset()
 
     def get_event(self, cls=None):
         """ Returns an ``EventInfo`` instance for the event.
@@ -371,18 +1351,15 @@ class EventManager(BaseEventManager):
         If ``cls`` is specified as a subclass of ``BaseEvent``, then only
         listeners for the specified event class and superclasses are returned.
         """
-        evt_map = self.event_map
         if cls is None:
             if isinstance(event, BaseEvent):
                 cls = type(event)
             else:
                 cls = event
                 event = None
-        classes = self.get_event_hierarchy(cls)
-        listeners = heapq.merge(*[evt_map[cls].get_listeners(event)
-                                    for cls in classes if cls in evt_map])
-        listeners = (l[-1]() for l in listeners)
-        return listeners
+        listeners = (l[-1]() for l in self._get_listener_infos(event, cls))
+        # Method listeners whose object was just garbage collected.
+        return (l for l in listeners if l is not None)
 
     def disable(self, cls):
         """ Disable the event from generating notifications.
@@ -400,14 +1377,337 @@ class EventManager(BaseEventManager):
 
     def is_enabled(self, cls):
         """ Check if the event is enabled.
+
+        An event is enabled if its class and all its superclasses are. The
+        effective enabled state is precomputed in the dispatch plan of the
+        event class, and updated whenever an event is enabled, disabled or
+        registered.
         """
-        for cls in self.get_event_hierarchy(cls):
-            if cls in self.event_map and not self.event_map[cls].is_enabled():
-                return False
-        return True
+        return self._get_plan(cls).enabled
 
     def get_event_hierarchy(self, cls):
         """ The the sequence of event classes which are notified for given cls.
         """
         return cls.__mro__[:self.bmro_clip]
 
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+    def _dispatch(self, evt, listeners, offloaded=False):
+        """ Notify the listeners, given by their infos, about the event.
+
+        ``offloaded`` is whether some of the listeners may be called by
+        executors.
+        """
+        if self._instrumented or offloaded:
+            return self._dispatch_instrumented(evt, listeners)
+
+        evt.pre_emit()
+
+        # The event is post-emitted even if the error policy re-raises.
+        try:
+            for linfo in listeners:
+                notifier = linfo[-1]
+                try:
+                    notifier.dispatch(evt)
+                except BaseException as e:
+                    self._listener_error(evt, notifier, e)
+                if evt._handled:
+                    logger.info('Event: {0} handled by listener: {1}'.format(
+                                                            evt, notifier()))
+                    break
+        finally:
+            evt.post_emit()
+
+    def _dispatch_instrumented(self, evt, listeners):
+        """ Notify the listeners about the event, recording their statistics
+        when profiling and notifying the tracers, and submitting the
+        listeners called by executors.
+        """
+        profiler = self.profiler if self._profiling else None
+        tracers = self._tracers
+        cls = type(evt)
+
+        for tracer in tracers:
+            tracer.pre_dispatch(evt)
+        try:
+            evt.pre_emit()
+
+            try:
+                for linfo in listeners:
+                    notifier = linfo[-1]
+                    if notifier.executor is not None:
+                        self._submit_delivery(evt, notifier)
+                        continue
+                    listener = notifier()
+                    if listener is None:
+                        continue
+                    for tracer in tracers:
+                        tracer.pre_listener(evt, listener)
+                    exc = None
+                    if profiler is not None:
+                        start = profiler.timer()
+                    try:
+                        notifier.dispatch(evt)
+                    except BaseException as e:
+                        exc = e
+                        if profiler is not None:
+                            elapsed = profiler.timer() - start
+                        try:
+                            self._listener_error(evt, notifier, e)
+                        except BaseException:
+                            # Re-raised by the error policy, close the span.
+                            for tracer in tracers:
+                                tracer.post_listener(evt, listener, exc)
+                            raise
+                    else:
+                        if profiler is not None:
+                            elapsed = profiler.timer() - start
+                    handled = evt._handled
+                    if profiler is not None:
+                        profiler.record(cls, notifier, elapsed,
+                                        exc is not None, handled)
+                    for tracer in tracers:
+                        tracer.post_listener(evt, listener, exc)
+                    if handled:
+                        logger.info(
+                            'Event: {0} handled by listener: {1}'.format(
+                                evt, listener))
+                        break
+            finally:
+                evt.post_emit()
+        finally:
+            for tracer in tracers:
+                tracer.post_dispatch(evt)
+
+    def _store(self, evt, caches):
+        """ Store an event in the last value caches of its class hierarchy.
+        """
+        sequence = next(self._cache_sequence)
+        for cache in caches:
+            cache.store(evt, sequence)
+
+    def _replay(self, cls, func, filter=None):
+        """ Notify a connected listener of the cached events of class ``cls``
+        matching the filter.
+        """
+        notifier, events = self._replayed(cls, func, filter)
+        for evt in events:
+            if notifier.executor is not None:
+                self._submit_delivery(evt, notifier)
+                continue
+            try:
+                notifier.dispatch(evt)
+            except BaseException as e:
+                self._listener_error(evt, notifier, e)
+
+    def _replayed(self, cls, func, filter=None):
+        """ Return the notifier of a connected listener, and the cached
+        events of class ``cls`` matching the filter in the order they were
+        emitted, or no events if it was concurrently disconnected.
+        """
+        info = self.event_map[cls]
+        key = info._priority_info.get(info.get_id(func))
+        if key is None:
+            # Concurrently disconnected.
+            return None, []
+        entries = {}
+        for cache in self._caches.values():
+            for sequence, evt in cache.entries():
+                if isinstance(evt, cls):
+                    entries[sequence] = evt
+        events = []
+        for sequence in sorted(entries):
+            evt = entries[sequence]
+            if not filter or info._matches(evt, filter):
+                events.append(evt)
+        return key[-1], events
+
+    def _submit_delivery(self, evt, notifier, *args):
+        """ Submit the notification of a listener, given by its notifier, to
+        its executor, and track it until it is done. ``args`` are passed on
+        to `_deliver`.
+
+        An executor refusing the notification, such as a full or shut down
+        `BoundedExecutor`, is handled by the error policy as a failure of the
+        listener, so that the other listeners are still notified.
+        """
+        try:
+            future = notifier.executor.submit(self._deliver, evt, notifier,
+                                              *args)
+        except BaseException as e:
+            self._listener_error(evt, notifier, e)
+            return
+        key = _id(evt)
+        with self._deliveries_lock:
+            futures = self._deliveries.get(key)
+            if futures is None:
+                futures = self._deliveries[key] = set()
+            futures.add(future)
+        future.add_done_callback(lambda future: self._delivered(key, future))
+
+    def _deliver(self, evt, notifier):
+        """ Notify a listener called by an executor about an event, or
+        about a list of events batched by a `Coalescer`.
+        """
+        try:
+            notifier.dispatch(evt)
+        except BaseException as e:
+            self._delivery_error(evt, notifier, e)
+
+    def _delivery_error(self, evt, notifier, exc, tb=None):
+        """ Handle an exception raised by a listener called by an executor
+        for an event, or for a list of events batched by a `Coalescer`.
+        """
+        if isinstance(evt, list):
+            # Report the batch by an event of the connected class, so that
+            # the error policy can disconnect the listener.
+            evt = evt[-1]
+        self._listener_error(evt, notifier, exc, tb)
+
+    def _delivered(self, key, future):
+        """ Stop tracking the delivery of an event to a listener.
+        """
+        with self._deliveries_lock:
+            futures = self._deliveries.get(key)
+            if futures is not None:
+                futures.discard(future)
+                if not futures:
+                    del self._deliveries[key]
+
+    def _update_instrumented(self):
+        """ Update whether events are dispatched through the instrumented
+        path.
+        """
+        self._instrumented = self._profiling or bool(self._tracers)
+
+    def _listener_error(self, evt, notifier, exc, tb=None):
+        """ Handle an exception raised by a listener, given by its notifier,
+        for an event according to the error policy.
+
+        ``tb`` is the formatted traceback, defaulting to the traceback of the
+        exception being handled.
+        """
+        self.error_policy.listener_error(self, evt, notifier, exc, tb)
+
+    def _listener_disconnected(self, notifier):
+        """ Release the failure counters and the dispatch statistics of a
+        disconnected listener, given by its notifier, so that they do not
+        hold it alive, and discard the events buffered for it.
+        """
+        executor = getattr(notifier, 'executor', None)
+        if isinstance(executor, Coalescer):
+            executor.discard()
+        self.error_policy.forget(notifier)
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.forget(notifier)
+
+    def _log_listener_error(self, evt, listener, exc, tb=None, note=''):
+        """ Log an exception raised by a listener for an event.
+
+        ``tb`` is the formatted traceback, defaulting to the traceback of the
+        exception being handled. ``note`` is appended to the message.
+        """
+        if tb is None:
+            tb = traceback.format_exc()
+        logger.warn('Exception {0} occurred in listener: {1} for '
+            'event: {2}:\n{3}{4}'.format(exc, listener, evt, tb, note))
+
+    def _disconnect_notifier(self, cls, notifier):
+        """ Disconnect a listener, given by its notifier, notified for events
+        of class ``cls``, or unsubscribe a topic subscriber.
+        """
+        if isinstance(notifier, TopicSubscriber):
+            self.topics.remove_subscriber(notifier)
+            return
+        for info in self._get_plan(cls).infos:
+            if info.disconnect_notifier(notifier):
+                break
+
+    def _get_executor(self):
+        """ Return the executor for non-blocking emits, creating it if needed.
+        """
+        executor = self.executor
+        if executor is None:
+            with self._executor_lock:
+                if self.executor is None:
+                    self.executor = BoundedExecutor()
+                    shutdown_at_exit(self.executor)
+                executor = self.executor
+        return executor
+
+    def _get_scheduler(self):
+        """ Return the scheduler for delayed emits, creating it if needed.
+        """
+        scheduler = self.scheduler
+        if scheduler is None:
+            with self._executor_lock:
+                if self.scheduler is None:
+                    self.scheduler = Scheduler()
+                scheduler = self.scheduler
+        return scheduler
+
+    def _invalidate(self):
+        """ Invalidate all the cached dispatch plans.
+        """
+        with self._generation_lock:
+            self._generation += 1
+            # Drop the outdated plans, which hold disconnected listeners.
+            self._plans = {}
+
+    def _get_plan(self, cls):
+        """ Return the (cached) `DispatchPlan` for the event class.
+        """
+        plan = self._plans.get(cls)
+        if plan is None or plan.generation != self._generation:
+            plan = self._make_plan(cls)
+            self._plans[cls] = plan
+        return plan
+
+    def _make_plan(self, cls):
+        """ Compute the `DispatchPlan` for the event class.
+        """
+        # Read the generation first so that concurrent changes leave the
+        # plan outdated rather than wrongly valid.
+        generation = self._generation
+        evt_map = self.event_map
+        infos = tuple([evt_map[c] for c in self.get_event_hierarchy(cls)
+                       if c in evt_map])
+        enabled = True
+        filtered = False
+        offloaded = False
+        caches = tuple([self._caches[c] for c in self.get_event_hierarchy(cls)
+                        if c in self._caches])
+        for info in infos:
+            if not info.is_enabled():
+                enabled = False
+            if info.has_filters():
+                filtered = True
+            if info.has_executors():
+                offloaded = True
+        if len(infos) == 1:
+            listeners = tuple(infos[0].get_listeners(None))
+        else:
+            listeners = tuple(heapq.merge(*[info.get_listeners(None)
+                                            for info in infos]))
+        return DispatchPlan(generation, enabled, infos, listeners, filtered,
+                            offloaded, caches)
+
+    def _get_listener_infos(self, event, cls):
+        """ Return the priority-ordered listener infos for the event.
+
+        If ``event`` is None, all the listeners of ``cls`` are returned.
+        """
+        return self._plan_listeners(self._get_plan(cls), event)
+
+    def _plan_listeners(self, plan, event):
+        """ Return the priority-ordered listener infos of a plan for the event.
+        """
+        if event is None or not plan.filtered:
+            return plan.listeners
+        infos = plan.infos
+        if len(infos) == 1:
+            return infos[0].get_listeners(event)
+        return heapq.merge(*[info.get_listeners(event) for info in infos])
+
@@ -0,0 +1,417 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" This module defines executors used for non-blocking event emission.
+
+The main class of the module is the `BoundedExecutor`, a pool of worker
+threads with a bounded queue of pending work. The `OrderedExecutor` shards
+work over single threaded queues to guarantee FIFO execution per ordering key.
+Submitting work to an executor returns an `EventFuture` which can be used to
+wait for the work to finish.
+"""
+
+# Standard library imports.
+import atexit
+import sys
+import threading
+from collections import deque
+import weakref
+
+
+# Backpressure policies of the `BoundedExecutor` when its queue is full.
+BLOCK = 'block'
+DROP_OLDEST = 'drop_oldest'
+RAISE = 'raise'
+
+
+class QueueFullError(Exception):
+    """ Raised on submitting work to an executor whose queue is full.
+    """
+
+
+# The executors shut down at interpreter exit.
+_exit_executors = weakref.WeakSet()
+
+# The group of the executor whose worker is the current thread, if any.
+_worker = threading.local()
+
+
+def shutdown_at_exit(executor):
+    """ Shut down an executor at interpreter exit, once its pending work is
+    finished, rather than dropping the work with its daemon threads.
+    """
+    _exit_executors.add(executor)
+
+
+def _shutdown_executors():
+    for executor in list(_exit_executors):
+        executor.shutdown()
+
+atexit.register(_shutdown_executors)
+
+
+###############################################################################
+# `EventFuture` Class.
+###############################################################################
+class EventFuture(object):
+    """ A handle to the result of work submitted to an executor.
+
+    The interface is a subset of the ``concurrent.futures.Future`` interface,
+    with ``join()`` and ``is_alive()`` for compatibility with the threads
+    which used to be returned for non-blocking emits.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FINISHED = 'finished'
+    CANCELLED = 'cancelled'
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._state = self.PENDING
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+
+    def cancel(self):
+        """ Cancel the work if it has not started yet.
+
+        Returns whether the work was cancelled.
+        """
+        with self._condition:
+            if self._state == self.CANCELLED:
+                return True
+            if self._state != self.PENDING:
+                return False
+            self._state = self.CANCELLED
+            self._condition.notify_all()
+        self._invoke_callbacks()
+        return True
+
+    def cancelled(self):
+        """ Whether the work was cancelled.
+        """
+        return self._state == self.CANCELLED
+
+    def running(self):
+        """ Whether the work is being executed.
+        """
+        return self._state == self.RUNNING
+
+    def done(self):
+        """ Whether the work was finished or cancelled.
+        """
+        return self._state in (self.FINISHED, self.CANCELLED)
+
+    def is_alive(self):
+        """ Whether the work is pending or running.
+        """
+        return not self.done()
+
+    def wait(self, timeout=None):
+        """ Wait until the work is done. Returns whether it is done.
+        """
+        with self._condition:
+            if not self.done():
+                self._condition.wait(timeout)
+            return self.done()
+
+    join = wait
+
+    def result(self, timeout=None):
+        """ Return the result of the work, waiting for it if necessary.
+
+        Raises the exception raised by the work, if any.
+        """
+        self._check_done(timeout)
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def exception(self, timeout=None):
+        """ Return the exception raised by the work, or None.
+        """
+        self._check_done(timeout)
+        return self._exception
+
+    def add_done_callback(self, fn):
+        """ Call ``fn(future)`` when the work is done.
+        """
+        with self._condition:
+            if not self.done():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    ###########################################################################
+    # Executor interface.
+    ###########################################################################
+    def set_running(self):
+        """ Mark the work as running. Returns False if it was cancelled.
+        """
+        with self._condition:
+            if self._state == self.CANCELLED:
+                return False
+            self._state = self.RUNNING
+            return True
+
+    def set_result(self, result):
+        """ Set the result of the work and mark the future as finished.
+        """
+        with self._condition:
+            self._result = result
+            self._state = self.FINISHED
+            self._condition.notify_all()
+        self._invoke_callbacks()
+
+    def set_exception(self, exception):
+        """ Set the exception of the work and mark the future as finished.
+        """
+        with self._condition:
+            self._exception = exception
+            self._state = self.FINISHED
+            self._condition.notify_all()
+        self._invoke_callbacks()
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+    def _check_done(self, timeout):
+        if not self.wait(timeout):
+            raise RuntimeError('Timed out waiting for {0}'.format(self))
+        if self.cancelled():
+            raise RuntimeError('{0} was cancelled'.format(self))
+
+    def _invoke_callbacks(self):
+        callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            fn(self)
+
+
+###############################################################################
+# `BoundedExecutor` Class.
+###############################################################################
+class BoundedExecutor(object):
+    """ A pool of worker threads with a bounded queue of pending work.
+
+    Worker threads are started lazily, up to ``max_workers``. When the queue
+    holds ``max_queue`` pending items, submitting more work applies the
+    backpressure ``policy``:
+
+    ``'block'``
+        Block the caller until there is room in the queue. Work submitted
+        from the executor's own worker threads (e.g. a listener doing a
+        non-blocking emit) is queued past the limit instead, as blocking the
+        threads which drain the queue would deadlock the executor.
+    ``'drop_oldest'``
+        Cancel the oldest pending work to make room for the new one.
+    ``'raise'``
+        Raise a `QueueFullError`.
+    """
+
+    def __init__(self, max_workers=4, max_queue=1024, policy=BLOCK,
+                 name='EventExecutor'):
+        """ Constructor.
+
+        Parameters:
+        -----------
+        max_workers : int
+            The maximum number of worker threads.
+        max_queue : int
+            The maximum number of pending work items. Zero means unbounded.
+        policy : str
+            One of 'block', 'drop_oldest' or 'raise'.
+        name : str
+            The prefix of the names of the worker threads.
+        """
+        if policy not in (BLOCK, DROP_OLDEST, RAISE):
+            raise ValueError('Unknown backpressure policy: {0}'.format(policy))
+        if max_workers < 1:
+            raise ValueError('max_workers must be at least 1')
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.policy = policy
+        self.name = name
+
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._threads = []
+        self._idle = 0
+        self._shutdown = False
+        # The executors whose workers are not blocked by a full queue.
+        self._group = self
+
+    def submit(self, fn, *args, **kwargs):
+        """ Schedule ``fn(*args, **kwargs)`` and return an `EventFuture`.
+        """
+        future = EventFuture()
+        dropped = None
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('Cannot submit to a shut down executor')
+            if self.max_queue and len(self._queue) >= self.max_queue:
+                if self.policy == RAISE:
+                    raise QueueFullError('Queue of {0} is full ({1} items)'
+                                    .format(self.name, len(self._queue)))
+                elif self.policy == DROP_OLDEST:
+                    dropped = self._queue.popleft()[0]
+                elif getattr(_worker, 'group', None) is self._group:
+                    # Blocking a worker could wait on itself to drain.
+                    pass
+                else:
+                    while (len(self._queue) >= self.max_queue and
+                           not self._shutdown):
+                        self._not_full.wait()
+                    if self._shutdown:
+                        raise RuntimeError('Executor was shut down')
+            self._queue.append((future, fn, args, kwargs))
+            self._not_empty.notify()
+            if (len(self._queue) > self._idle and
+                    len(self._threads) < self.max_workers):
+                self._start_worker()
+        if dropped is not None:
+            dropped.cancel()
+        return future
+
+    def qsize(self):
+        """ The number of pending work items.
+        """
+        return len(self._queue)
+
+    def shutdown(self, wait=True):
+        """ Stop the workers once the pending work is finished.
+        """
+        with self._lock:
+            self._shutdown = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+            threads = self._threads[:]
+        if wait:
+            for thread in threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+    def _start_worker(self):
+        thread = threading.Thread(target=self._work, name='{0}-{1}'.format(
+                                    self.name, len(self._threads)))
+        thread.daemon = True
+        self._threads.append(thread)
+        thread.start()
+
+    def _work(self):
+        _worker.group = self._group
+        while True:
+            with self._lock:
+                self._idle += 1
+                while not self._queue and not self._shutdown:
+                    self._not_empty.wait()
+                self._idle -= 1
+                if not self._queue:
+                    # Shut down and no pending work.
+                    return
+                future, fn, args, kwargs = self._queue.popleft()
+                self._not_full.notify()
+            if not future.set_running():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                future.set_exception(sys.exc_info()[1])
+            else:
+                future.set_result(result)
+
+
+def source_key(evt):
+    """ The default ordering key of `OrderedExecutor`: the event's source.
+
+    Hashable sources are compared by value, so that equal sources share
+    their order, and unhashable sources by identity. Events without a source
+    (whose source is an empty list) share the ``None`` key, and are
+    delivered in order with each other.
+    """
+    source = getattr(evt, 'source', None)
+    if source is None or (type(source) is list and not source):
+        return None
+    try:
+        hash(source)
+    except TypeError:
+        return id(source)
+    return source
+
+
+###############################################################################
+# `OrderedExecutor` Class.
+###############################################################################
+class OrderedExecutor(object):
+    """ An executor which preserves submission order per ordering key.
+
+    Work is sharded on the hash of its ordering key over a number of queues,
+    each served by a single dispatcher thread. Work with the same ordering key
+    is therefore executed in FIFO order, while work with different keys is
+    executed in parallel (unless the keys land on the same shard).
+
+    When used as the executor of an `EventManager`, the ordering key is
+    computed by calling ``key`` with the emitted event, by default giving
+    FIFO delivery per event source.
+
+    With the 'block' policy, work submitted from a dispatcher thread is never
+    blocked, so that listeners emitting to a full shard do not deadlock.
+    """
+
+    def __init__(self, num_shards=4, key=None, max_queue=1024, policy=BLOCK,
+                 name='OrderedExecutor'):
+        """ Constructor.
+
+        Parameters:
+        -----------
+        num_shards : int
+            The number of queues and dispatcher threads.
+        key : callable
+            Called with the first positional argument of ``submit()`` (the
+            event) to compute the ordering key. Defaults to `source_key`.
+        max_queue : int
+            The maximum number of pending work items per shard.
+        policy : str
+            The backpressure policy of the shards, see `BoundedExecutor`.
+        name : str
+            The prefix of the names of the dispatcher threads.
+        """
+        if num_shards < 1:
+            raise ValueError('num_shards must be at least 1')
+        self.key = source_key if key is None else key
+        self._shards = [BoundedExecutor(1, max_queue, policy,
+                                        '{0}-{1}'.format(name, i))
+                        for i in range(num_shards)]
+        for shard in self._shards:
+            shard._group = self
+
+    def submit(self, fn, *args, **kwargs):
+        """ Schedule ``fn(*args, **kwargs)`` ordered on the key of ``args[0]``.
+        """
+        key = self.key(args[0]) if args else None
+        return self.submit_ordered(key, fn, *args, **kwargs)
+
+    def submit_ordered(self, key, fn, *args, **kwargs):
+        """ Schedule ``fn(*args, **kwargs)`` after earlier work with ``key``.
+        """
+        shard = self._shards[hash(key) % len(self._shards)]
+        return shard.submit(fn, *args, **kwargs)
+
+    def qsize(self):
+        """ The number of pending work items over all the shards.
+        """
+        return sum([shard.qsize() for shard in self._shards])
+
+    def shutdown(self, wait=True):
+        """ Stop the dispatcher threads once the pending work is finished.
+        """
+        for shard in self._shards:
+            shard.shutdown(wait)
@@ -0,0 +1,197 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" This module defines the filter operators of listeners.
+
+A value of the ``filter`` dict passed to ``EventManager.connect()`` may be a
+filter operator instead of a plain value, which the event attribute must then
+satisfy instead of being equal to the value::
+
+    event_manager.connect(StoreKeyEvent, listener,
+                          filter={'key': Prefix('images/')})
+
+The event manager indexes listeners on `In` and `Prefix` filters, as it does
+for plain values, so that emitting an event only considers the listeners
+whose filter can match it. `Range` and `NotEqual` filters are evaluated for
+every emitted event, and are best combined with an indexable filter on
+another attribute.
+
+An event which lacks a filtered attribute never matches the filter.
+"""
+
+# Standard library imports.
+import weakref
+
+# Whether the hash of the instances agrees with their equality, by class.
+_value_hash_classes = weakref.WeakKeyDictionary()
+
+
+def hashable_by_value(value):
+    """ Whether a value can be looked up by hash among the values equal to it.
+
+    This is false for unhashable values, and for instances of classes which
+    define ``__eq__`` or ``__cmp__`` but inherit the identity hash of object,
+    as equal instances then have different hashes. Tuples and frozensets are
+    checked item by item.
+    """
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    if isinstance(value, (tuple, frozenset)):
+        return all([hashable_by_value(item) for item in value])
+    cls = type(value)
+    try:
+        return _value_hash_classes[cls]
+    except KeyError:
+        pass
+    result = True
+    defines_eq = False
+    for c in cls.__mro__:
+        attrs = vars(c)
+        if '__hash__' in attrs:
+            result = c is not object or not defines_eq
+            break
+        if '__eq__' in attrs or '__cmp__' in attrs:
+            defines_eq = True
+    try:
+        _value_hash_classes[cls] = result
+    except TypeError:
+        # Not weakly referenceable.
+        pass
+    return result
+
+
+###############################################################################
+# `FilterOperator` Class.
+###############################################################################
+class FilterOperator(object):
+    """ Base class of the filter operators.
+    """
+    __slots__ = ()
+
+    def matches(self, value):
+        """ Whether the value of an event attribute satisfies the filter.
+        """
+        raise NotImplementedError
+
+    def index_values(self):
+        """ Return the values of the event attribute under which the listener
+        may be indexed, or None if the filter cannot be indexed on values.
+
+        An event attribute which is not one of these values does not satisfy
+        the filter.
+        """
+        return None
+
+    def index_prefix(self):
+        """ Return the prefix under which the listener may be indexed, or
+        None if the filter cannot be indexed on prefixes.
+
+        An event attribute which does not start with the prefix does not
+        satisfy the filter.
+        """
+        return None
+
+
+###############################################################################
+# Filter operators.
+###############################################################################
+class In(FilterOperator):
+    """ Matches if the attribute is one of the given values.
+    """
+    __slots__ = ['values', '_set']
+
+    def __init__(self, values):
+        self.values = tuple(values)
+        if all([hashable_by_value(value) for value in self.values]):
+            self._set = frozenset(self.values)
+        else:
+            # Unhashable values, or values hashed by identity but compared
+            # by value, matched linearly.
+            self._set = None
+
+    def matches(self, value):
+        if self._set is not None:
+            try:
+                return value in self._set
+            except TypeError:
+                # Unhashable attribute, fall back to comparisons.
+                pass
+        return value in self.values
+
+    def index_values(self):
+        return self.values if self._set is not None else None
+
+    def __repr__(self):
+        return 'In({0!r})'.format(self.values)
+
+
+class Prefix(FilterOperator):
+    """ Matches if the attribute is a string (or other sequence) starting
+    with the given prefix.
+    """
+    __slots__ = ['prefix']
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+
+    def matches(self, value):
+        prefix = self.prefix
+        try:
+            return value[:len(prefix)] == prefix
+        except TypeError:
+            return False
+
+    def index_prefix(self):
+        if not hashable_by_value(self.prefix):
+            return None
+        return self.prefix
+
+    def __repr__(self):
+        return 'Prefix({0!r})'.format(self.prefix)
+
+
+class Range(FilterOperator):
+    """ Matches if ``low <= attribute < high``.
+
+    Either bound may be None for an unbounded range. ``inclusive=True``
+    includes the ``high`` bound in the range.
+    """
+    __slots__ = ['low', 'high', 'inclusive']
+
+    def __init__(self, low=None, high=None, inclusive=False):
+        self.low = low
+        self.high = high
+        self.inclusive = inclusive
+
+    def matches(self, value):
+        if self.low is not None and not value >= self.low:
+            return False
+        if self.high is not None:
+            if self.inclusive:
+                return value <= self.high
+            return value < self.high
+        return True
+
+    def __repr__(self):
+        return 'Range({0!r}, {1!r}, inclusive={2!r})'.format(self.low,
+                                                self.high, self.inclusive)
+
+
+class NotEqual(FilterOperator):
+    """ Matches if the attribute is not equal to the given value.
+    """
+    __slots__ = ['value']
+
+    def __init__(self, value):
+        self.value = value
+
+    def matches(self, value):
+        return value != self.value
+
+    def __repr__(self):
+        return 'NotEqual({0!r})'.format(self.value)
@@ -0,0 +1,294 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" This module defines the recording and replay of event streams.
+
+The `JournalRecorder` listens to the events emitted on an event manager and
+appends them to a binary journal file, which `replay_journal` emits again on
+another event manager, with the original timing or as fast as possible::
+
+    recorder = JournalRecorder(event_manager, 'events.journal').start()
+    ...
+    recorder.close()
+
+    report = replay_journal(EventManager(), 'events.journal')
+    print report.events_per_second, report.latency(0.99)
+
+A journal starts with the `MAGIC` string, followed by frames made of a
+one byte frame type, the four bytes little-endian length of the frame body
+and the body:
+
+- a class frame body is the two bytes id of an event class followed by the
+  path of the class (see `encore.events.serialization.class_path`), and
+  precedes the first event of the class recorded in a session;
+- an event frame body is the two bytes id of the event class, the eight
+  bytes timestamp of the emission (``time.time()``) and the pickled dict of
+  the event attributes.
+
+Journals are append-only, recording again to an existing journal appends a
+new session redefining its class ids.
+"""
+
+# Standard library imports.
+import logging
+import struct
+import sys
+import threading
+import time
+from timeit import default_timer
+
+# Local imports.
+from .abstract_event_manager import BaseEvent
+from .profiling import percentile
+from .serialization import (class_path, event_attributes, event_from_record,
+    dumps, loads, picklable_record, root_classes)
+
+# Logging.
+logger = logging.getLogger(__name__)
+
+# The first bytes of journal files.
+MAGIC = 'ENCJRNL\x01'
+
+# Frame types.
+_CLASS = 1
+_EVENT = 2
+
+_FRAME_HEADER = struct.Struct('<BI')
+_CLASS_HEADER = struct.Struct('<H')
+_EVENT_HEADER = struct.Struct('<Hd')
+
+
+###############################################################################
+# `JournalRecorder` Class.
+###############################################################################
+class JournalRecorder(object):
+    """ Appends the events emitted on an event manager to a journal.
+
+    The recorder listens at the highest priority, so that events marked as
+    handled by other listeners are recorded as well. The `source` of events
+    is not recorded, and attributes which cannot be pickled are dropped.
+    """
+
+    def __init__(self, event_manager, journal, classes=(BaseEvent,),
+                 timer=time.time):
+        """ Constructor.
+
+        Parameters:
+        -----------
+        event_manager : EventManager
+            The event manager whose events are recorded.
+        journal : str or file
+            The path of the journal file, or a file opened for appending in
+            binary mode.
+        classes : sequence of classes
+            The event classes (and subclasses) to record. An event is recorded
+            once, even if it is an instance of several of them.
+        timer : callable
+            A function returning the current time in seconds, recorded as
+            the timestamp of events.
+        """
+        self.event_manager = event_manager
+        self.classes = tuple(classes)
+        self.timer = timer
+        if isinstance(journal, basestring):
+            self.file = open(journal, 'ab')
+            self._owns_file = True
+        else:
+            self.file = journal
+            self._owns_file = False
+        # The number of events recorded.
+        self.events = 0
+
+        self._class_ids = {}
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self):
+        """ Start recording events.
+        """
+        with self._lock:
+            self.file.seek(0, 2)
+            if self.file.tell() == 0:
+                self.file.write(MAGIC)
+        for cls in root_classes(self.classes):
+            self.event_manager.connect(cls, self.record, priority=sys.maxint)
+        self._started = True
+        return self
+
+    def record(self, evt):
+        """ Listener appending an event to the journal.
+        """
+        timestamp = self.timer()
+        cls = type(evt)
+        attributes = event_attributes(evt)
+        try:
+            data = dumps(attributes)
+        except Exception:
+            data = dumps(picklable_record((class_path(cls), attributes))[1])
+        with self._lock:
+            class_id = self._class_ids.get(cls)
+            if class_id is None:
+                class_id = self._class_ids[cls] = len(self._class_ids)
+                self._write(_CLASS, _CLASS_HEADER.pack(class_id) +
+                            class_path(cls))
+            self._write(_EVENT, _EVENT_HEADER.pack(class_id, timestamp) +
+                        data)
+            self.events += 1
+
+    def flush(self):
+        """ Flush the recorded events to the journal file.
+        """
+        with self._lock:
+            self.file.flush()
+
+    def close(self):
+        """ Stop recording events and close the journal.
+        """
+        if self._started:
+            self._started = False
+            for cls in root_classes(self.classes):
+                try:
+                    self.event_manager.disconnect(cls, self.record)
+                except KeyError:
+                    pass
+        with self._lock:
+            if self._owns_file:
+                self.file.close()
+            else:
+                self.file.flush()
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+    def _write(self, kind, body):
+        self.file.write(_FRAME_HEADER.pack(kind, len(body)) + body)
+
+
+###############################################################################
+# Journal reading and replay.
+###############################################################################
+def read_journal(journal):
+    """ Iterate over the ``(timestamp, record)`` tuples of the events in a
+    journal, where ``record`` is an event record as returned by
+    `encore.events.serialization.event_to_record`.
+
+    ``journal`` is the path of the journal file, or a file opened for
+    reading in binary mode. Raises ValueError if it is not a journal.
+    """
+    if isinstance(journal, basestring):
+        with open(journal, 'rb') as f:
+            for item in read_journal(f):
+                yield item
+        return
+    if journal.read(len(MAGIC)) != MAGIC:
+        raise ValueError('Not an event journal')
+    paths = {}
+    header_size = _FRAME_HEADER.size
+    while True:
+        header = journal.read(header_size)
+        if len(header) < header_size:
+            break
+        kind, length = _FRAME_HEADER.unpack(header)
+        body = journal.read(length)
+        if len(body) < length:
+            logger.warn('Truncated event journal frame')
+            break
+        if kind == _EVENT:
+            class_id, timestamp = _EVENT_HEADER.unpack_from(body)
+            attributes = loads(body[_EVENT_HEADER.size:])
+            yield timestamp, (paths[class_id], attributes)
+        elif kind == _CLASS:
+            class_id, = _CLASS_HEADER.unpack_from(body)
+            paths[class_id] = body[_CLASS_HEADER.size:]
+
+
+class ReplayReport(object):
+    """ The dispatch statistics of a journal replay.
+    """
+
+    def __init__(self, events, skipped, seconds, latencies):
+        # The number of events emitted, and of events whose class could not
+        # be imported.
+        self.events = events
+        self.skipped = skipped
+        # The wall time of the replay, in seconds.
+        self.seconds = seconds
+        # The sorted durations of the emits, in seconds.
+        self.latencies = sorted(latencies)
+
+    @property
+    def dispatch_seconds(self):
+        """ The total time spent emitting events, in seconds.
+        """
+        return sum(self.latencies)
+
+    @property
+    def events_per_second(self):
+        """ The dispatch throughput, excluding the time spent waiting for
+        the original timing of the events.
+        """
+        seconds = self.dispatch_seconds
+        return self.events / seconds if seconds else 0.0
+
+    def latency(self, fraction):
+        """ The emit latency percentile, e.g. ``latency(0.99)``, in seconds.
+        """
+        return percentile(self.latencies, fraction)
+
+    def __repr__(self):
+        return ('ReplayReport(events={0}, skipped={1}, seconds={2:.6f}, '
+                'events_per_second={3:.0f}, p50={4:.6f}, p99={5:.6f}, '
+                'max={6:.6f})'.format(self.events, self.skipped, self.seconds,
+                    self.events_per_second, self.latency(0.5),
+                    self.latency(0.99), self.latency(1.0)))
+
+
+def replay_journal(event_manager, journal, realtime=False, speed=1.0,
+                   source=None, timer=default_timer, sleep=time.sleep):
+    """ Emit the events of a journal on an event manager.
+
+    Returns a `ReplayReport` of the dispatch throughput and latency.
+
+    Parameters:
+    -----------
+    event_manager : EventManager
+        The event manager to emit the events on.
+    journal : str or file
+        The path of the journal file, or a file opened for reading.
+    realtime : bool
+        Whether to emit the events with their original timing, instead of as
+        fast as possible.
+    speed : float
+        The factor by which the original timing is accelerated.
+    source : object
+        The source of the replayed events.
+    timer : callable
+        A function returning the current wall time in seconds.
+    sleep : callable
+        A function sleeping for a number of seconds.
+    """
+    emit = event_manager.emit
+    latencies = []
+    skipped = 0
+    first = None
+    start = timer()
+    for timestamp, record in read_journal(journal):
+        try:
+            evt = event_from_record(record, source)
+        except ImportError:
+            logger.warn('Cannot import event class {0}'.format(record[0]))
+            skipped += 1
+            continue
+        if realtime:
+            if first is None:
+                first = timestamp
+            delay = start + (timestamp - first) / speed - timer()
+            if delay > 0:
+                sleep(delay)
+        t = timer()
+        emit(evt)
+        latencies.append(timer() - t)
+    return ReplayReport(len(latencies), skipped, timer() - start, latencies)
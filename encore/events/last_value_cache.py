@@ -0,0 +1,104 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" This module defines the cache of the last events emitted per key.
+
+An `EventManager` keeps a `LastValueCache` for the event classes it was asked
+to cache, and replays the cached events to listeners connected with
+``replay=True``, so that components started late learn the current state::
+
+    event_manager.enable_last_value_cache(StoreUpdateEvent, key_by=('key',),
+                                          max_size=10000)
+    ...
+    event_manager.connect(StoreUpdateEvent, listener, replay=True)
+
+The cache holds the last event for each distinct value of the key attributes,
+and evicts the least recently updated keys beyond ``max_size``.
+"""
+
+# Standard library imports.
+import threading
+from collections import OrderedDict
+
+
+###############################################################################
+# `LastValueCache` Class.
+###############################################################################
+class LastValueCache(object):
+    """ A bounded cache of the last event for each value of key attributes.
+    """
+
+    def __init__(self, key_by=(), max_size=1000):
+        """ Constructor.
+
+        Parameters:
+        -----------
+        key_by : sequence of str
+            The names of the attributes whose values identify the events
+            replacing each other. A missing attribute counts as None. With no
+            attribute, only the last event is kept.
+        max_size : int
+            The maximum number of cached events. The least recently updated
+            keys are evicted first.
+        """
+        if isinstance(key_by, basestring):
+            key_by = (key_by,)
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1')
+        self.key_by = tuple(key_by)
+        self.max_size = max_size
+        # {key: (sequence, evt)}, from the least to the most recently updated
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # The number of events evicted to stay within the size limit.
+        self.evicted = 0
+
+    def store(self, evt, sequence=0):
+        """ Cache an event, replacing the cached event with the same key.
+
+        ``sequence`` orders the events of different caches. Events whose key
+        values are unhashable are not cached.
+        """
+        key = tuple([getattr(evt, attr, None) for attr in self.key_by])
+        entries = self._entries
+        with self._lock:
+            try:
+                entries.pop(key, None)
+            except TypeError:
+                return
+            entries[key] = (sequence, evt)
+            while len(entries) > self.max_size:
+                entries.popitem(last=False)
+                self.evicted += 1
+
+    def get(self, *values):
+        """ Return the cached event for the given values of the key
+        attributes, or None.
+        """
+        entry = self._entries.get(values)
+        return None if entry is None else entry[1]
+
+    def entries(self):
+        """ Return a list of the ``(sequence, evt)`` cached entries, from the
+        least to the most recently updated.
+        """
+        with self._lock:
+            return self._entries.values()
+
+    def events(self):
+        """ Return a list of the cached events, from the least to the most
+        recently updated.
+        """
+        return [evt for sequence, evt in self.entries()]
+
+    def clear(self):
+        """ Remove all the cached events.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,56 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" This module defines the helpers shared by the notifiers of event
+listeners and of topic subscribers.
+
+Listeners which are bound methods are weakly referenced: they are identified
+by weak references to their function and object, and called through a
+dispatch function holding only a weak reference to the object.
+"""
+
+# Standard library imports.
+from types import MethodType
+import weakref
+
+
+def listener_id(func):
+    """ Get an id as unique key for the listener, which is the same for the
+    bound methods of an object.
+    """
+    if type(func) is MethodType:
+        obj = func.im_self
+        if obj is None:
+            # Unbound method.
+            return weakref.ref(func.im_func), weakref.ref(func.im_class)
+        else:
+            # Bound method.
+            return weakref.ref(func.im_func), weakref.ref(obj)
+    else:
+        return func
+
+
+def weak_method_dispatch(func, ref, nargs=1):
+    """ Return a function calling ``func`` with the object of the weakref
+    ``ref`` and ``nargs`` (1 or 2) arguments, without creating a bound
+    method, and doing nothing once the object is garbage collected.
+
+    The returned function does not reference the caller, so that it can be
+    stored on a notifier without creating a reference cycle.
+    """
+    if nargs == 1:
+        def dispatch(arg):
+            obj = ref()
+            if obj is not None:
+                return func(obj, arg)
+    elif nargs == 2:
+        def dispatch(arg, arg2):
+            obj = ref()
+            if obj is not None:
+                return func(obj, arg, arg2)
+    else:
+        raise ValueError('Unsupported number of arguments: {0}'.format(nargs))
+    return dispatch
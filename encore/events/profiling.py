@@ -0,0 +1,152 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" This module defines the collection of listener dispatch statistics.
+
+The main class of the module is the `DispatchProfiler`, which is used by the
+`EventManager` when profiling is enabled to record a `ListenerStats` for each
+pair of emitted event class and listener.
+"""
+
+# Standard library imports.
+import threading
+from timeit import default_timer
+
+
+def percentile(values, fraction):
+    """ Return the value at the given fraction of the sorted sequence
+    ``values``, or 0.0 if it is empty.
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+###############################################################################
+# `ListenerStats` Class.
+###############################################################################
+class ListenerStats(object):
+    """ Dispatch statistics of a listener for a class of emitted events.
+
+    The statistics of a listener are discarded once it is disconnected.
+    """
+    __slots__ = ['event_class', '_notifier', 'calls', 'total_time',
+                 'max_time', 'exceptions', 'handled']
+
+    def __init__(self, event_class, notifier):
+        # The class of the emitted events.
+        self.event_class = event_class
+        # The notifier of the listener, which holds methods without their
+        # object.
+        self._notifier = notifier
+        # The number of calls of the listener.
+        self.calls = 0
+        # The total and maximum wall time spent in the listener, in seconds.
+        self.total_time = 0.0
+        self.max_time = 0.0
+        # The number of exceptions raised by the listener.
+        self.exceptions = 0
+        # The number of events marked as handled by the listener.
+        self.handled = 0
+
+    @property
+    def listener(self):
+        """ The listener, or None if it has been garbage collected.
+        """
+        return self._notifier()
+
+    @property
+    def mean_time(self):
+        """ The mean wall time spent in the listener per call, in seconds.
+        """
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def __repr__(self):
+        return ('ListenerStats(event_class={0}, listener={1}, calls={2}, '
+                'total_time={3:.6f}, max_time={4:.6f}, exceptions={5}, '
+                'handled={6})'.format(self.event_class.__name__,
+                    self.listener, self.calls, self.total_time, self.max_time,
+                    self.exceptions, self.handled))
+
+
+###############################################################################
+# `DispatchProfiler` Class.
+###############################################################################
+class DispatchProfiler(object):
+    """ Records the dispatch statistics of listeners.
+    """
+
+    def __init__(self, timer=default_timer):
+        """ Constructor.
+
+        Parameters:
+        -----------
+        timer : callable
+            A function returning the current wall time in seconds.
+        """
+        self.timer = timer
+        # {notifier: {event_class: ListenerStats}}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, event_class, notifier, elapsed, failed, handled):
+        """ Record a call of a listener.
+
+        Parameters:
+        -----------
+        event_class : class
+            The class of the emitted event.
+        notifier : notifier
+            The notifier of the called listener.
+        elapsed : float
+            The wall time spent in the listener, in seconds.
+        failed : bool
+            Whether the listener raised an exception.
+        handled : bool
+            Whether the event was marked as handled by the listener.
+        """
+        with self._lock:
+            listener_stats = self._stats.get(notifier)
+            if listener_stats is None:
+                listener_stats = self._stats[notifier] = {}
+            stats = listener_stats.get(event_class)
+            if stats is None:
+                stats = listener_stats[event_class] = ListenerStats(
+                                                    event_class, notifier)
+            stats.calls += 1
+            stats.total_time += elapsed
+            if elapsed > stats.max_time:
+                stats.max_time = elapsed
+            if failed:
+                stats.exceptions += 1
+            if handled:
+                stats.handled += 1
+
+    def get_stats(self, event_class=None):
+        """ Return the list of `ListenerStats`, slowest listeners first.
+
+        If ``event_class`` is specified, only the statistics for events of
+        that class are returned.
+        """
+        with self._lock:
+            stats = [s for listener_stats in self._stats.itervalues()
+                     for s in listener_stats.itervalues()]
+        if event_class is not None:
+            stats = [s for s in stats if s.event_class is event_class]
+        return sorted(stats, key=lambda s: s.total_time, reverse=True)
+
+    def forget(self, notifier):
+        """ Discard the statistics of a disconnected listener, given by its
+        notifier, so that they do not hold it alive.
+        """
+        with self._lock:
+            self._stats.pop(notifier, None)
+
+    def reset(self):
+        """ Discard all the recorded statistics.
+        """
+        with self._lock:
+            self._stats.clear()
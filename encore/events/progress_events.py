@@ -8,7 +8,20 @@
 from .abstract_event_manager import BaseEvent
 
 class ProgressEvent(BaseEvent):
-    pass
+    """ Abstract base class of progress events.
+
+    Attributes
+    ----------
+
+    operation_id :
+        A unique identifier for the operation being performed.
+
+    message : string
+        A human-readable message about the operation being performed.
+
+    """
+    __fields__ = ('operation_id', 'message')
+    __slots__ = ()
 
 class ProgressStartEvent(ProgressEvent):
     """
@@ -26,6 +39,7 @@ class ProgressStartEvent(ProgressEvent):
         The number of steps in the operation.  If unknown or variable, use -1.
         
     """
+    __fields__ = ('steps',)
 
 class ProgressStepEvent(ProgressEvent):
     """
@@ -43,6 +57,7 @@ class ProgressStepEvent(ProgressEvent):
         The count of the step.  If unknown, use -1.
         
     """
+    __fields__ = ('step',)
 
 class ProgressEndEvent(ProgressEvent):
     """
@@ -61,6 +76,7 @@ class ProgressEndEvent(ProgressEvent):
         'warning', 'error' or 'exception'.
         
     """
+    __fields__ = ('exit_state',)
 
 
 class ProgressManager(object):
@@ -0,0 +1,234 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" This module defines the scheduling of deferred calls on a single thread.
+
+The `Scheduler` is used by the `EventManager` for ``emit_later()`` and
+``emit_at()``. Pending calls are kept in a heap ordered by due time, so that
+scheduling and cancelling take logarithmic time however many calls are
+pending, and a single thread runs all the calls when they are due.
+
+Calls may be scheduled with a key, in which case scheduling another call with
+the same key replaces the pending call, for example to debounce events.
+"""
+
+# Standard library imports.
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+# Logging.
+logger = logging.getLogger(__name__)
+
+# States of scheduled calls.
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+CANCELLED = 'cancelled'
+
+
+###############################################################################
+# `ScheduledCall` Class.
+###############################################################################
+class ScheduledCall(object):
+    """ A handle on a call scheduled by a `Scheduler`.
+    """
+    __slots__ = ['when', 'fn', 'args', 'key', '_state', '_scheduler']
+
+    def __init__(self, scheduler, when, fn, args, key):
+        # The time the call is due at.
+        self.when = when
+        self.fn = fn
+        self.args = args
+        # The key of the call, or None.
+        self.key = key
+        self._state = PENDING
+        self._scheduler = scheduler
+
+    def cancel(self):
+        """ Cancel the call if it is still pending. Returns whether it was.
+        """
+        return self._scheduler._cancel(self)
+
+    def cancelled(self):
+        """ Whether the call was cancelled or replaced.
+        """
+        return self._state == CANCELLED
+
+    def pending(self):
+        """ Whether the call is still waiting to be run.
+        """
+        return self._state == PENDING
+
+    def done(self):
+        """ Whether the call has been run, or was cancelled.
+        """
+        return self._state in (DONE, CANCELLED)
+
+    def __repr__(self):
+        return 'ScheduledCall(when={0!r}, fn={1!r}, key={2!r}, state={3})'\
+            .format(self.when, self.fn, self.key, self._state)
+
+
+###############################################################################
+# `Scheduler` Class.
+###############################################################################
+class Scheduler(object):
+    """ Runs calls at given times on a single worker thread.
+
+    The calls are run in the order of their due times. A call which takes a
+    long time delays the calls due after it.
+    """
+
+    def __init__(self, name='EventScheduler', timer=time.time):
+        """ Constructor.
+
+        Parameters:
+        -----------
+        name : str
+            The name of the worker thread.
+        timer : callable
+            A function returning the current time in seconds, to which the due
+            times of the calls are compared.
+        """
+        self.name = name
+        self.timer = timer
+        # Heap of (when, sequence, call) tuples. Cancelled calls are removed
+        # lazily, or when they make up half of the heap.
+        self._heap = []
+        self._cancelled = 0
+        self._keys = {}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition(threading.Lock())
+        self._thread = None
+        self._shutdown = False
+
+    def schedule(self, when, fn, args=(), key=None):
+        """ Schedule a call of ``fn(*args)`` at time ``when``.
+
+        If ``key`` is not None, a pending call scheduled with the same key is
+        cancelled. Returns a `ScheduledCall`.
+        """
+        call = ScheduledCall(self, when, fn, args, key)
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError('Scheduler {0} is shut down'.format(
+                                   self.name))
+            if key is not None:
+                previous = self._keys.get(key)
+                if previous is not None:
+                    self._cancel_call(previous)
+                self._keys[key] = call
+            heapq.heappush(self._heap, (when, next(self._sequence), call))
+            if self._heap[0][2] is call:
+                # Due before the call the worker waits for.
+                self._condition.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                name=self.name)
+                self._thread.daemon = True
+                self._thread.start()
+        return call
+
+    def schedule_later(self, delay, fn, args=(), key=None):
+        """ Schedule a call of ``fn(*args)`` in ``delay`` seconds.
+        """
+        return self.schedule(self.timer() + delay, fn, args, key)
+
+    def cancel(self, key):
+        """ Cancel the pending call scheduled with ``key``. Returns whether
+        there was one.
+        """
+        with self._condition:
+            call = self._keys.get(key)
+            return call is not None and self._cancel_call(call)
+
+    def get(self, key):
+        """ Return the pending call scheduled with ``key``, or None.
+        """
+        return self._keys.get(key)
+
+    def pending(self):
+        """ The number of pending calls.
+        """
+        with self._condition:
+            return len(self._heap) - self._cancelled
+
+    def shutdown(self, wait=True):
+        """ Stop the worker thread, cancelling the pending calls.
+        """
+        with self._condition:
+            self._shutdown = True
+            for when, sequence, call in self._heap:
+                if call._state == PENDING:
+                    call._state = CANCELLED
+            del self._heap[:]
+            self._keys.clear()
+            self._cancelled = 0
+            self._condition.notify()
+            thread = self._thread
+        if wait and thread is not None and \
+                thread is not threading.current_thread():
+            thread.join()
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+    def _cancel(self, call):
+        with self._condition:
+            return self._cancel_call(call)
+
+    def _cancel_call(self, call):
+        """ Cancel a call, with the condition held.
+        """
+        if call._state != PENDING:
+            return False
+        call._state = CANCELLED
+        if call.key is not None and self._keys.get(call.key) is call:
+            del self._keys[call.key]
+        self._cancelled += 1
+        heap = self._heap
+        if self._cancelled > 64 and self._cancelled * 2 > len(heap):
+            heap[:] = [item for item in heap if item[2]._state == PENDING]
+            heapq.heapify(heap)
+            self._cancelled = 0
+        return True
+
+    def _next_call(self):
+        """ Wait for the next due call and return it, or None on shutdown.
+        """
+        heap = self._heap
+        with self._condition:
+            while not self._shutdown:
+                while heap and heap[0][2]._state != PENDING:
+                    heapq.heappop(heap)
+                    self._cancelled -= 1
+                if not heap:
+                    self._condition.wait()
+                    continue
+                delay = heap[0][0] - self.timer()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                call = heapq.heappop(heap)[2]
+                call._state = RUNNING
+                if call.key is not None and self._keys.get(call.key) is call:
+                    del self._keys[call.key]
+                return call
+
+    def _run(self):
+        while True:
+            call = self._next_call()
+            if call is None:
+                return
+            try:
+                call.fn(*call.args)
+            except Exception:
+                logger.exception('Exception in scheduled call {0}'.format(
+                                 call))
+            call._state = DONE
@@ -0,0 +1,136 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" This module defines the conversion of events to and from records.
+
+An event record is a tuple ``(class_path, attributes)`` of the importable
+path of the event class and a dictionary of the event attributes, which can be
+pickled to send events to other processes or to store them.
+
+The `source` of an event is not part of the record, since it generally only
+makes sense in the process which emitted the event.
+"""
+
+# Standard library imports.
+import cPickle
+import logging
+import sys
+
+# Logging.
+logger = logging.getLogger(__name__)
+
+# The pickle protocol used for records.
+PROTOCOL = cPickle.HIGHEST_PROTOCOL
+
+# Event attributes which are not part of records.
+EXCLUDED_ATTRIBUTES = frozenset(['source', '_handled'])
+
+# Caches of class paths, which are also shared so they are memoized by pickle.
+_class_paths = {}
+_classes = {}
+
+
+def class_path(cls):
+    """ Return the importable path ``'module:name'`` of a class.
+    """
+    try:
+        return _class_paths[cls]
+    except KeyError:
+        path = _class_paths[cls] = '{0}:{1}'.format(cls.__module__,
+                                                   cls.__name__)
+        return path
+
+
+def import_class(path):
+    """ Return the class for a path returned by `class_path`.
+
+    Raises ImportError if the class cannot be found.
+    """
+    try:
+        return _classes[path]
+    except KeyError:
+        module_name, name = path.split(':')
+        __import__(module_name)
+        try:
+            cls = getattr(sys.modules[module_name], name)
+        except AttributeError:
+            raise ImportError('Cannot import {0}'.format(path))
+        _classes[path] = cls
+        return cls
+
+
+def event_attributes(evt):
+    """ Return a dict of the attributes of an event which belong in a record.
+
+    These are the declared fields of the event and the attributes in its
+    instance dict.
+    """
+    attributes = dict([(name, value) for name, value in vars(evt).iteritems()
+                       if name not in EXCLUDED_ATTRIBUTES])
+    for name in getattr(type(evt), '_all_fields', ()):
+        attributes[name] = getattr(evt, name, None)
+    return attributes
+
+
+def event_to_record(evt, exclude=()):
+    """ Return the record of an event, excluding the given attribute names.
+    """
+    attributes = event_attributes(evt)
+    for name in exclude:
+        attributes.pop(name, None)
+    return (class_path(type(evt)), attributes)
+
+
+def event_from_record(record, source=None):
+    """ Create an event from a record, with the specified source.
+
+    The event is created without calling the constructor of its class, so
+    that event classes with any constructor signature can be restored.
+    """
+    path, attributes = record
+    cls = import_class(path)
+    evt = cls.__new__(cls)
+    for name, value in attributes.iteritems():
+        setattr(evt, name, value)
+    evt.source = [] if source is None else source
+    evt._handled = False
+    return evt
+
+
+def dumps(obj):
+    """ Pickle records, or any object containing records.
+    """
+    return cPickle.dumps(obj, PROTOCOL)
+
+
+def loads(data):
+    """ Unpickle data returned by `dumps`.
+    """
+    return cPickle.loads(data)
+
+
+def root_classes(classes):
+    """ Return the classes which are not subclasses of other ones, so that
+    listening to them receives each event once.
+    """
+    return [cls for cls in classes if not [base for base in classes
+                    if base is not cls and issubclass(cls, base)]]
+
+
+def picklable_record(record):
+    """ Return the record without the attributes which cannot be pickled.
+    """
+    path, attributes = record
+    picklable = {}
+    for name, value in attributes.iteritems():
+        try:
+            cPickle.dumps(value, PROTOCOL)
+        except Exception:
+            logger.debug('Dropping unpicklable attribute {0} of {1}'.format(
+                         name, path))
+        else:
+            picklable[name] = value
+    return (path, picklable)
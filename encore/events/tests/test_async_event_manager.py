@@ -0,0 +1,227 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+
+# Standard library imports.
+import threading
+import unittest
+import mock
+
+try:
+    import trollius as asyncio
+    from trollius import From
+except ImportError:
+    asyncio = None
+
+# Local imports.
+from encore.events.api import BaseEvent, RaisePolicy
+if asyncio is not None:
+    from encore.events.async_event_manager import AsyncEventManager
+
+
+@unittest.skipIf(asyncio is None, 'trollius is not available')
+class TestAsyncEventManager(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.evt_mgr = AsyncEventManager(loop=self.loop)
+        self.calls = []
+
+    def tearDown(self):
+        self.loop.close()
+
+    def make_listener(self, name, delay=0, handle=False, fail=False):
+        @asyncio.coroutine
+        def listener(evt):
+            self.calls.append(('start', name))
+            yield From(asyncio.sleep(delay, loop=self.loop))
+            self.calls.append(('end', name))
+            if handle:
+                evt.mark_as_handled()
+            if fail:
+                raise RuntimeError('failed')
+        return listener
+
+    def emit(self, evt):
+        self.loop.run_until_complete(self.evt_mgr.emit(evt))
+
+    def test_sequential(self):
+        """ Test if coroutine listeners are run one after the other.
+        """
+        self.evt_mgr.connect(BaseEvent, self.make_listener(1, 0.02))
+        self.evt_mgr.connect(BaseEvent, self.make_listener(2, 0.01))
+        self.evt_mgr.connect(BaseEvent, lambda evt: self.calls.append(3))
+        self.emit(BaseEvent())
+        self.assertEqual(self.calls, [('start', 1), ('end', 1),
+                                      ('start', 2), ('end', 2), 3])
+
+    def test_concurrent(self):
+        """ Test if listeners of the same priority are run concurrently.
+        """
+        self.evt_mgr.concurrent = True
+        self.evt_mgr.connect(BaseEvent, self.make_listener(1, 0.02),
+                             priority=1)
+        self.evt_mgr.connect(BaseEvent, self.make_listener(2, 0.01),
+                             priority=1)
+        self.evt_mgr.connect(BaseEvent, self.make_listener(3))
+        self.emit(BaseEvent())
+        self.assertEqual(self.calls, [('start', 1), ('start', 2), ('end', 2),
+                                      ('end', 1), ('start', 3), ('end', 3)])
+
+    def test_mark_as_handled(self):
+        """ Test if handled events are not delivered to further listeners.
+        """
+        self.evt_mgr.connect(BaseEvent, self.make_listener(1, handle=True),
+                             priority=1)
+        self.evt_mgr.connect(BaseEvent, self.make_listener(2))
+        self.emit(BaseEvent())
+        self.assertEqual(self.calls, [('start', 1), ('end', 1)])
+
+    def test_filter_and_subclass(self):
+        """ Test if filtering and subclass propagation work.
+        """
+        class MyEvt(BaseEvent):
+            pass
+        self.evt_mgr.connect(BaseEvent, self.make_listener(1),
+                             filter={'key':1})
+        self.evt_mgr.connect(MyEvt, self.make_listener(2))
+        self.emit(MyEvt(key=2))
+        self.emit(BaseEvent(key=1))
+        self.assertEqual(self.calls, [('start', 2), ('end', 2),
+                                      ('start', 1), ('end', 1)])
+
+    def test_exception(self):
+        """ Test if exceptions in coroutines do not stop the delivery.
+        """
+        self.evt_mgr.connect(BaseEvent, self.make_listener(1, fail=True))
+        self.evt_mgr.connect(BaseEvent, self.make_listener(2))
+        with mock.patch('encore.events.event_manager.logger') as logger:
+            self.emit(BaseEvent())
+        self.assertEqual(logger.warn.call_count, 1)
+        self.assertEqual(self.calls, [('start', 1), ('end', 1),
+                                      ('start', 2), ('end', 2)])
+
+    def test_raise_policy(self):
+        """ Test if exceptions re-raised by the error policy are set on the
+        future of the emit.
+        """
+        evt_mgr = AsyncEventManager(loop=self.loop,
+                                    error_policy=RaisePolicy())
+        def failing(evt):
+            raise ValueError('failure')
+        class MyEvt(BaseEvent):
+            def post_emit(self):
+                self.posted = True
+        evt_mgr.connect(BaseEvent, self.make_listener(2))
+        for listener in (self.make_listener(1, fail=True), failing):
+            evt_mgr.connect(BaseEvent, listener, priority=1)
+            evt = MyEvt()
+            future = evt_mgr.emit(evt)
+            with self.assertRaises((RuntimeError, ValueError)):
+                self.loop.run_until_complete(
+                    asyncio.wait_for(future, 5, loop=self.loop))
+            self.assertTrue(evt.posted)
+            evt_mgr.disconnect(BaseEvent, listener)
+        self.assertEqual(self.calls, [('start', 1), ('end', 1)])
+
+        # A failing event stops the batch and fails its future.
+        for listener in (self.make_listener(1, fail=True), failing):
+            evt_mgr.connect(BaseEvent, listener, priority=1)
+            events = [MyEvt(), MyEvt()]
+            future = evt_mgr.emit_many(events)
+            with self.assertRaises((RuntimeError, ValueError)):
+                self.loop.run_until_complete(
+                    asyncio.wait_for(future, 5, loop=self.loop))
+            self.assertTrue(events[0].posted)
+            self.assertFalse(hasattr(events[1], 'posted'))
+            evt_mgr.disconnect(BaseEvent, listener)
+
+    def test_last_value_cache(self):
+        """ Test if emitted events are cached and replayed.
+        """
+        cache = self.evt_mgr.enable_last_value_cache(BaseEvent, ('key',))
+        events = [BaseEvent(key=1), BaseEvent(key=2), BaseEvent(key=1)]
+        for evt in events:
+            self.emit(evt)
+        self.assertEqual(cache.events(), events[1:])
+        received = []
+        self.evt_mgr.connect(BaseEvent, lambda evt: received.append(evt),
+                             replay=True)
+        self.assertEqual(received, events[1:])
+
+        # The coroutines of the listener are run in turn.
+        future = self.evt_mgr.connect(BaseEvent, self.make_listener(1),
+                                      replay=True)
+        self.loop.run_until_complete(asyncio.wait_for(future, 5,
+                                                      loop=self.loop))
+        self.assertEqual(self.calls, [('start', 1), ('end', 1)] * 2)
+
+    def test_coalesced_coroutine(self):
+        """ Test if the coroutines of coalesced listeners are run on the
+        event loop, and their exceptions handled.
+        """
+        @asyncio.coroutine
+        def listener(evt):
+            yield From(asyncio.sleep(0, loop=self.loop))
+            received.set_result(evt)
+            raise ValueError('failure')
+        self.evt_mgr.connect(BaseEvent, listener, coalesce_by=('key',),
+                             window=0.01)
+        received = asyncio.Future(loop=self.loop)
+        events = [BaseEvent(key=1), BaseEvent(key=1)]
+        with mock.patch('encore.events.event_manager.logger') as logger:
+            for evt in events:
+                self.emit(evt)
+            self.assertIs(self.loop.run_until_complete(
+                asyncio.wait_for(received, 5, loop=self.loop)), events[1])
+            self.loop.run_until_complete(asyncio.sleep(0, loop=self.loop))
+        self.assertEqual(logger.warn.call_count, 1)
+        self.evt_mgr.scheduler.shutdown()
+
+    def test_emit_later(self):
+        """ Test if delayed emits are made on the event loop.
+        """
+        received = asyncio.Future(loop=self.loop)
+        def listener(evt):
+            received.set_result(threading.current_thread())
+        self.evt_mgr.connect(BaseEvent, listener)
+        self.evt_mgr.emit_later(BaseEvent(), 0.01)
+        self.assertIs(self.loop.run_until_complete(
+            asyncio.wait_for(received, 5, loop=self.loop)),
+            threading.current_thread())
+        self.evt_mgr.scheduler.shutdown()
+
+    def test_instrumentation(self):
+        """ Test if profiling and tracing are refused.
+        """
+        with self.assertRaises(NotImplementedError):
+            self.evt_mgr.enable_profiling()
+        with self.assertRaises(NotImplementedError):
+            self.evt_mgr.add_tracer(object())
+        self.assertFalse(self.evt_mgr._instrumented)
+
+    def test_disabled(self):
+        """ Test if disabled events are not delivered.
+        """
+        self.evt_mgr.connect(BaseEvent, self.make_listener(1))
+        self.evt_mgr.disable(BaseEvent)
+        self.emit(BaseEvent())
+        self.assertEqual(self.calls, [])
+
+    def test_emit_many(self):
+        """ Test if batches of events are delivered in order.
+        """
+        @asyncio.coroutine
+        def listener(evt):
+            yield From(asyncio.sleep(0.01 * (3 - evt.value), loop=self.loop))
+            self.calls.append(evt.value)
+        self.evt_mgr.connect(BaseEvent, listener)
+        events = [BaseEvent(value=i) for i in range(3)]
+        self.loop.run_until_complete(self.evt_mgr.emit_many(events))
+        self.assertEqual(self.calls, [0, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+
+# Standard library imports.
+import os
+import threading
+import unittest
+from multiprocessing import AuthenticationError, Pipe, Process, current_process
+from multiprocessing.connection import Listener
+from shutil import rmtree
+from tempfile import mkdtemp
+
+# Local imports.
+from encore.events.api import BaseEvent, EventManager
+from encore.events.bridge import EventBridge, connect_bridge, listen_bridge
+
+
+class BridgedEvent(BaseEvent):
+    pass
+
+class OtherEvent(BaseEvent):
+    pass
+
+
+def remote_echo(address):
+    """ Process connecting to a bridge and emitting a reply for each event.
+    """
+    evt_mgr = EventManager()
+    bridge = connect_bridge(evt_mgr, address, classes=[BridgedEvent])
+    done = threading.Event()
+    def reply(evt):
+        if evt.value is None:
+            done.set()
+        else:
+            evt_mgr.emit(BridgedEvent(value=-evt.value, pid=os.getpid()))
+    evt_mgr.connect(BridgedEvent, reply, filter={'source':bridge})
+    done.wait(10)
+    bridge.close()
+
+
+class Collector(object):
+    def __init__(self):
+        self.events = []
+        self.received = threading.Condition()
+
+    def __call__(self, evt):
+        with self.received:
+            self.events.append(evt)
+            self.received.notify_all()
+
+    def wait(self, count, timeout=5):
+        with self.received:
+            while len(self.events) < count and timeout > 0:
+                self.received.wait(0.05)
+                timeout -= 0.05
+        return len(self.events) >= count
+
+
+class TestEventBridge(unittest.TestCase):
+    def setUp(self):
+        self.evt_mgr1 = EventManager()
+        self.evt_mgr2 = EventManager()
+        conn1, conn2 = Pipe()
+        self.bridge1 = EventBridge(self.evt_mgr1, conn1, [BridgedEvent],
+                                   node_id='node1').start()
+        self.bridge2 = EventBridge(self.evt_mgr2, conn2, [BridgedEvent],
+                                   node_id='node2').start()
+        self.assertTrue(self.bridge1.wait_connected(5))
+        self.assertTrue(self.bridge2.wait_connected(5))
+
+    def tearDown(self):
+        self.bridge1.close()
+        self.bridge2.close()
+
+    def test_forward(self):
+        """ Test if bridged events are emitted on the remote event manager.
+        """
+        collector = Collector()
+        self.evt_mgr2.connect(BaseEvent, collector)
+        self.evt_mgr1.emit(BridgedEvent(source=self, key='a', metadata={1:2}))
+        self.evt_mgr1.emit(OtherEvent(key='b'))
+        self.assertTrue(collector.wait(1))
+
+        evt = collector.events[0]
+        self.assertEqual(type(evt), BridgedEvent)
+        self.assertEqual(evt.key, 'a')
+        self.assertEqual(evt.metadata, {1:2})
+        self.assertTrue(evt.source is self.bridge2)
+        self.assertFalse(collector.wait(2, timeout=0.1))
+
+    def test_batching(self):
+        """ Test if events emitted in a burst are sent in batches.
+        """
+        collector = Collector()
+        self.evt_mgr2.connect(BridgedEvent, collector)
+        for i in range(500):
+            self.evt_mgr1.emit(BridgedEvent(value=i))
+        self.assertTrue(collector.wait(500))
+        self.assertEqual([evt.value for evt in collector.events], range(500))
+        self.assertTrue(self.bridge1.batches_sent < 500)
+        self.assertEqual(self.bridge1.events_sent, 500)
+
+    def test_loop_suppression(self):
+        """ Test if forwarded events are not forwarded back.
+        """
+        collector1 = Collector()
+        collector2 = Collector()
+        self.evt_mgr1.connect(BridgedEvent, collector1)
+        self.evt_mgr2.connect(BridgedEvent, collector2)
+        self.evt_mgr1.emit(BridgedEvent(value=1))
+        self.assertTrue(collector2.wait(1))
+        self.assertFalse(collector1.wait(2, timeout=0.2))
+        self.assertFalse(collector2.wait(2, timeout=0.01))
+        self.assertEqual(self.bridge2.events_sent, 0)
+
+    def test_unpicklable(self):
+        """ Test if unpicklable attributes are dropped.
+        """
+        collector = Collector()
+        self.evt_mgr2.connect(BridgedEvent, collector)
+        self.evt_mgr1.emit(BridgedEvent(value=1, lock=threading.Lock()))
+        self.assertTrue(collector.wait(1))
+        self.assertEqual(collector.events[0].value, 1)
+        self.assertFalse(hasattr(collector.events[0], 'lock'))
+
+
+class TestProcessBridge(unittest.TestCase):
+    def setUp(self):
+        self.path = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.path)
+
+    def test_unix_socket(self):
+        """ Test if events are exchanged with another process.
+        """
+        address = os.path.join(self.path, 'events.sock')
+        listener = Listener(address, authkey=current_process().authkey)
+        process = Process(target=remote_echo, args=(address,))
+        process.start()
+        evt_mgr = EventManager()
+        connection = listener.accept()
+        listener.close()
+        bridge = EventBridge(evt_mgr, connection, [BridgedEvent]).start()
+        collector = Collector()
+        evt_mgr.connect(BridgedEvent, collector)
+        try:
+            for i in range(1, 4):
+                evt_mgr.emit(BridgedEvent(value=i))
+            self.assertTrue(collector.wait(6))
+            replies = collector.events[3:]
+            self.assertEqual([evt.value for evt in replies], [-1, -2, -3])
+            self.assertEqual(replies[0].pid, process.pid)
+            evt_mgr.emit(BridgedEvent(value=None))
+        finally:
+            process.join(10)
+            bridge.close()
+        self.assertEqual(process.exitcode, 0)
+
+    def test_authentication(self):
+        """ Test if bridges authenticate their peer and refuse TCP addresses.
+        """
+        evt_mgr = EventManager()
+        with self.assertRaises(ValueError):
+            connect_bridge(evt_mgr, ('localhost', 9999))
+        with self.assertRaises(ValueError):
+            listen_bridge(evt_mgr, ('localhost', 9999))
+
+        address = os.path.join(self.path, 'events.sock')
+        listener = Listener(address, authkey='other key')
+        thread = threading.Thread(target=self.accept, args=(listener,))
+        thread.start()
+        try:
+            with self.assertRaises(AuthenticationError):
+                connect_bridge(evt_mgr, address)
+        finally:
+            thread.join(5)
+            listener.close()
+
+    def accept(self, listener):
+        try:
+            listener.accept()
+        except (AuthenticationError, EOFError, IOError):
+            pass
+
+
+if __name__ == '__main__':
+    unittest.main()
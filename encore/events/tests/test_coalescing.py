@@ -0,0 +1,209 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+
+# Standard library imports.
+import threading
+import unittest
+import mock
+
+# Local imports.
+from encore.events.api import (BaseEvent, EventManager, Coalescer, Scheduler,
+    BoundedExecutor, DisconnectPolicy)
+
+
+class UpdateEvent(BaseEvent):
+    __fields__ = ('key', 'value')
+
+
+class TestCoalescer(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = Scheduler()
+        self.calls = []
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def record(self, evt, *args):
+        self.calls.append((evt, args))
+
+    def test_flush(self):
+        """ Test if buffered calls are collapsed by key until flushed.
+        """
+        coalescer = Coalescer(self.scheduler, ('key',), window=60)
+        events = [UpdateEvent(key=i % 2, value=i) for i in range(5)]
+        futures = [coalescer.submit(self.record, evt, 'arg')
+                   for evt in events]
+        coalescer.submit(self.record, events[0], 'other')
+        self.assertEqual(coalescer.pending(), 3)
+        self.assertEqual(self.scheduler.pending(), 1)
+        self.assertFalse(any(future.done() for future in futures))
+
+        coalescer.flush()
+        self.assertEqual(self.calls, [(events[4], ('arg',)),
+                                      (events[3], ('arg',)),
+                                      (events[0], ('other',))])
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(coalescer.pending(), 0)
+        self.assertEqual(self.scheduler.pending(), 0)
+        coalescer.flush()
+        self.assertEqual(len(self.calls), 3)
+
+    def test_batch(self):
+        """ Test if coalesced events can be delivered as a list.
+        """
+        coalescer = Coalescer(self.scheduler, 'key', window=60, batch=True)
+        events = [UpdateEvent(key=i % 3, value=i) for i in range(6)]
+        for evt in events:
+            coalescer.submit(self.record, evt)
+        coalescer.flush()
+        self.assertEqual(self.calls, [(events[3:], ())])
+
+    def test_unhashable(self):
+        """ Test if events with unhashable values are not coalesced.
+        """
+        coalescer = Coalescer(self.scheduler, ('key',), window=60)
+        events = [UpdateEvent(key=[1]), UpdateEvent(key=[1])]
+        for evt in events:
+            coalescer.submit(self.record, evt)
+        coalescer.flush()
+        self.assertEqual([evt for evt, args in self.calls], events)
+
+    def test_discard(self):
+        """ Test if discarded calls are dropped and their futures cancelled.
+        """
+        coalescer = Coalescer(self.scheduler, ('key',), window=60)
+        future = coalescer.submit(self.record, UpdateEvent(key=1))
+        coalescer.discard()
+        self.assertTrue(future.cancelled())
+        self.assertEqual(coalescer.pending(), 0)
+        self.assertEqual(self.scheduler.pending(), 0)
+        self.assertTrue(coalescer.submit(self.record,
+                                         UpdateEvent(key=1)).cancelled())
+        coalescer.flush()
+        self.assertEqual(self.calls, [])
+
+    def test_window(self):
+        """ Test if the scheduler flushes the buffer at the end of the window.
+        """
+        done = threading.Event()
+        def record(evt):
+            self.calls.append(evt)
+            done.set()
+        coalescer = Coalescer(self.scheduler, ('key',), window=0.01)
+        events = [UpdateEvent(key=1, value=i) for i in range(3)]
+        for evt in events:
+            future = coalescer.submit(record, evt)
+        self.assertTrue(done.wait(5))
+        self.assertTrue(future.wait(5))
+        self.assertEqual(self.calls, [events[-1]])
+
+
+class TestCoalescedListener(unittest.TestCase):
+    def setUp(self):
+        self.evt_mgr = EventManager()
+
+    def tearDown(self):
+        self.evt_mgr.scheduler.shutdown()
+
+    def test_connect(self):
+        """ Test if listeners connected with coalesce_by get the last events.
+        """
+        received = []
+        self.evt_mgr.connect(UpdateEvent, lambda evts: received.extend(evts),
+                             coalesce_by=('key',), window=60, batch=True)
+        callback = mock.Mock()
+        self.evt_mgr.connect(UpdateEvent, callback)
+
+        events = [UpdateEvent(key=i % 10, value=i) for i in range(500)]
+        for evt in events:
+            self.evt_mgr.emit(evt)
+        self.assertEqual(callback.call_count, 500)
+        self.assertEqual(received, [])
+        self.assertFalse(self.evt_mgr.wait_for_deliveries(events[-1], 0))
+
+        notifier = self.evt_mgr.event_map[UpdateEvent]._priority_list[0][-1]
+        notifier.executor.flush()
+        self.assertEqual(received, events[-10:])
+        self.assertTrue(self.evt_mgr.wait_for_deliveries(events[0], 0))
+        self.assertEqual(self.evt_mgr._deliveries, {})
+
+    def test_disconnect(self):
+        """ Test if the events buffered for a disconnected or reconnected
+        listener are dropped.
+        """
+        callback = mock.Mock()
+        self.evt_mgr.connect(UpdateEvent, callback, coalesce_by=('key',),
+                             window=0.05)
+        evt = UpdateEvent(key=1)
+        self.evt_mgr.emit(evt)
+        self.evt_mgr.disconnect(UpdateEvent, callback)
+        self.assertTrue(self.evt_mgr.wait_for_deliveries(evt, 0))
+        self.assertEqual(self.evt_mgr.scheduler.pending(), 0)
+
+        self.evt_mgr.connect(UpdateEvent, callback, coalesce_by=('key',),
+                             window=60)
+        evt = UpdateEvent(key=1)
+        self.evt_mgr.emit(evt)
+        self.evt_mgr.connect(UpdateEvent, callback)
+        self.assertTrue(self.evt_mgr.wait_for_deliveries(evt, 0))
+        self.assertEqual(self.evt_mgr.scheduler.pending(), 0)
+        self.assertFalse(callback.called)
+
+    def test_batch_errors(self):
+        """ Test if the error policy gets the last event of a failing batch
+        and can disconnect the listener.
+        """
+        evt_mgr = self.evt_mgr
+        evt_mgr.error_policy = DisconnectPolicy(max_failures=1)
+        def failing(evts):
+            raise ValueError('failure')
+        evt_mgr.connect(UpdateEvent, failing, coalesce_by=('key',),
+                        window=60, batch=True)
+        notifier = evt_mgr.event_map[UpdateEvent]._priority_list[0][-1]
+        events = [UpdateEvent(key=i) for i in range(3)]
+        for evt in events:
+            evt_mgr.emit(evt)
+        with mock.patch('encore.events.event_manager.logger') as logger:
+            notifier.executor.flush()
+        self.assertEqual(logger.warn.call_count, 2)
+        self.assertIn(repr(events[-1]), logger.warn.call_args[0][0])
+        failures = evt_mgr.get_listener_failures()
+        self.assertTrue(failures[0].disconnected)
+        self.assertEqual(list(evt_mgr.get_listeners(UpdateEvent)), [])
+
+    def test_window(self):
+        """ Test if coalesced events are delivered by the scheduler, or by the
+        executor.
+        """
+        executor = BoundedExecutor(max_workers=1)
+        threads = []
+        done = threading.Event()
+        def callback(evt):
+            threads.append(threading.current_thread())
+            done.set()
+        self.evt_mgr.connect(UpdateEvent, callback, coalesce_by=('key',),
+                             window=0.01)
+        evt = UpdateEvent(key=1)
+        self.evt_mgr.emit(evt)
+        self.assertTrue(self.evt_mgr.wait_for_deliveries(evt, 5))
+        self.assertTrue(done.wait(5))
+        self.assertEqual(threads, [self.evt_mgr.scheduler._thread])
+
+        self.evt_mgr.disconnect(UpdateEvent, callback)
+        self.evt_mgr.connect(UpdateEvent, callback, coalesce_by=('key',),
+                             window=0.01, executor=executor)
+        threads[:] = []
+        evt = UpdateEvent(key=1)
+        self.evt_mgr.emit(evt)
+        self.assertTrue(self.evt_mgr.wait_for_deliveries(evt, 5))
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0] in executor._threads)
+        executor.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+
+# Standard library imports.
+import unittest
+import weakref
+import mock
+
+# Local imports.
+from encore.events.api import (BaseEvent, EventManager, LogPolicy,
+    LogOncePolicy, SampledLogPolicy, CountPolicy, DisconnectPolicy,
+    RaisePolicy)
+
+
+class MyEvt(BaseEvent):
+    pass
+
+
+class Listener(object):
+    def __init__(self):
+        self.calls = 0
+
+    def callback(self, evt):
+        self.calls += 1
+        raise ValueError('failure {0}'.format(self.calls))
+
+
+class TestErrorPolicies(unittest.TestCase):
+
+    def emit(self, policy, num_events=10):
+        """ Emit events to a failing and a working listener, returning the
+        number of logged warnings.
+        """
+        self.evt_mgr = EventManager(error_policy=policy)
+        self.failing = Listener()
+        self.working = mock.Mock()
+        self.evt_mgr.connect(MyEvt, self.failing.callback, priority=1)
+        self.evt_mgr.connect(BaseEvent, self.working)
+        with mock.patch('encore.events.event_manager.logger') as logger:
+            for i in range(num_events):
+                self.evt_mgr.emit(MyEvt())
+        return logger.warn.call_count
+
+    def assertFailures(self, count):
+        failures = self.evt_mgr.get_listener_failures()
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(failures[0].listener, self.failing.callback)
+        self.assertEqual(failures[0].count, count)
+        self.assertEqual(failures[0].last_event_class, MyEvt)
+        self.assertEqual(str(failures[0].last_exception),
+                         'failure {0}'.format(count))
+
+    def test_default(self):
+        """ Test if every failure is logged by default.
+        """
+        self.assertEqual(self.emit(None), 10)
+        self.assertTrue(isinstance(self.evt_mgr.error_policy, LogPolicy))
+        self.assertEqual(self.working.call_count, 10)
+        self.assertFailures(10)
+
+    def test_log_once(self):
+        """ Test if only the first failure of a listener is logged.
+        """
+        self.assertEqual(self.emit(LogOncePolicy()), 1)
+        self.assertEqual(self.working.call_count, 10)
+        self.assertFailures(10)
+
+    def test_sampled_log(self):
+        """ Test if one failure in every few failures is logged.
+        """
+        self.assertEqual(self.emit(SampledLogPolicy(every=4)), 3)
+        self.assertEqual(self.working.call_count, 10)
+        self.assertFailures(10)
+
+    def test_count(self):
+        """ Test if failures are only counted.
+        """
+        self.assertEqual(self.emit(CountPolicy()), 0)
+        self.assertEqual(self.working.call_count, 10)
+        self.assertFailures(10)
+
+        self.evt_mgr.reset_listener_failures()
+        self.assertEqual(self.evt_mgr.get_listener_failures(), [])
+
+    def test_disconnect(self):
+        """ Test if a failing listener is disconnected.
+        """
+        self.assertEqual(self.emit(DisconnectPolicy(max_failures=3)), 2)
+        self.assertEqual(self.failing.calls, 3)
+        self.assertEqual(self.working.call_count, 10)
+        self.assertFailures(3)
+        self.assertTrue(self.evt_mgr.get_listener_failures()[0].disconnected)
+        self.assertEqual(list(self.evt_mgr.get_listeners(MyEvt)),
+                         [self.working])
+
+    def test_disconnected_release(self):
+        """ Test if the failure counters do not hold disconnected listeners
+        alive.
+        """
+        evt_mgr = EventManager(error_policy=DisconnectPolicy(max_failures=2))
+        def failing(evt):
+            raise ValueError('failure')
+        ref = weakref.ref(failing)
+        evt_mgr.connect(MyEvt, failing)
+        evt_mgr.subscribe('a', lambda topic, payload: 1 / 0)
+        with mock.patch('encore.events.event_manager.logger'):
+            evt_mgr.emit(MyEvt())
+            evt_mgr.publish('a')
+        self.assertEqual(len(evt_mgr.get_listener_failures()), 2)
+        evt_mgr.unsubscribe('a', evt_mgr.topics.subscribers('a')[0]())
+        failures = evt_mgr.get_listener_failures()
+        self.assertEqual(len(failures), 1)
+        self.assertIs(failures[0].listener, failing)
+
+        with mock.patch('encore.events.event_manager.logger'):
+            evt_mgr.emit(MyEvt())
+        self.assertTrue(failures[0].disconnected)
+        del failing
+        self.assertIsNone(ref())
+        self.assertIsNone(failures[0].listener)
+        self.assertEqual(evt_mgr.get_listener_failures(), failures)
+
+        evt_mgr.reset_listener_failures()
+        self.assertEqual(evt_mgr.get_listener_failures(), [])
+
+    def test_raise(self):
+        """ Test if failures are re-raised out of emit.
+        """
+        self.evt_mgr = EventManager(error_policy=RaisePolicy())
+        self.failing = Listener()
+        self.working = mock.Mock()
+        self.evt_mgr.connect(MyEvt, self.failing.callback, priority=1)
+        self.evt_mgr.connect(BaseEvent, self.working)
+        with self.assertRaises(ValueError):
+            self.evt_mgr.emit(MyEvt())
+        self.assertFalse(self.working.called)
+        self.assertFailures(1)
+
+    def test_raise_post_emit(self):
+        """ Test if events are post-emitted when failures are re-raised, as
+        by the AsyncEventManager.
+        """
+        self.evt_mgr = EventManager(error_policy=RaisePolicy())
+        self.failing = Listener()
+        self.evt_mgr.connect(MyEvt, self.failing.callback)
+        for profiling in (False, True):
+            if profiling:
+                self.evt_mgr.enable_profiling()
+            evt = MyEvt()
+            evt.post_emit = mock.Mock()
+            with self.assertRaises(ValueError):
+                self.evt_mgr.emit(evt)
+            self.assertEqual(evt.post_emit.call_count, 1)
+
+    def test_sorted(self):
+        """ Test if the most failing listeners come first.
+        """
+        evt_mgr = EventManager(error_policy=CountPolicy())
+        listeners = [Listener() for i in range(3)]
+        for i, listener in enumerate(listeners):
+            evt_mgr.connect(MyEvt, listener.callback, filter={'key': i})
+        for i in range(3):
+            for j in range(i + 1):
+                evt_mgr.emit(MyEvt(key=i))
+        self.assertEqual([(f.listener, f.count) for f in
+                          evt_mgr.get_listener_failures()],
+                         [(listeners[2].callback, 3),
+                          (listeners[1].callback, 2),
+                          (listeners[0].callback, 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
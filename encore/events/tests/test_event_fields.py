@@ -0,0 +1,149 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+
+# Standard library imports.
+import cPickle
+import unittest
+import weakref
+
+# Local imports.
+from encore.events.abstract_event_manager import EventType
+from encore.events.api import (BaseEvent, EventManager, ProgressEvent,
+    ProgressStepEvent)
+from encore.events.serialization import event_to_record, event_from_record
+from encore.storage.events import (StoreProgressStepEvent, StoreSetEvent,
+    StoreKeyEvent)
+
+
+class FieldEvent(BaseEvent):
+    __fields__ = ('value', 'other')
+
+class SubFieldEvent(FieldEvent):
+    __fields__ = ('extra',)
+
+class CustomInitEvent(FieldEvent):
+    def __init__(self, value):
+        super(CustomInitEvent, self).__init__(value=value * 2)
+
+
+class TestEventFields(unittest.TestCase):
+    def test_slots(self):
+        """ Test if declared fields are stored in slots.
+        """
+        self.assertEqual(FieldEvent.__slots__, ('value', 'other'))
+        self.assertEqual(SubFieldEvent.__slots__, ('extra',))
+        self.assertEqual(SubFieldEvent._all_fields, ('value', 'other', 'extra'))
+
+        evt = SubFieldEvent(value=1, extra=2)
+        self.assertEqual((evt.value, evt.other, evt.extra), (1, None, 2))
+        self.assertEqual(evt.source, [])
+        self.assertFalse(evt._handled)
+        self.assertEqual(vars(evt), {})
+
+    def test_extra_attributes(self):
+        """ Test if undeclared attributes are still accepted.
+        """
+        evt = FieldEvent('src', value=1, undeclared=3)
+        self.assertEqual(evt.source, 'src')
+        self.assertEqual(evt.undeclared, 3)
+        self.assertEqual(vars(evt), {'undeclared': 3})
+        evt.later = 4
+        self.assertEqual(evt.later, 4)
+
+    def test_custom_init(self):
+        """ Test if a constructor defined by the class is kept.
+        """
+        evt = CustomInitEvent(2)
+        self.assertEqual(evt.value, 4)
+        self.assertEqual(evt.other, None)
+
+    def test_builtin_events(self):
+        """ Test if built-in progress and store events use slots.
+        """
+        self.assertEqual(ProgressEvent.__slots__, ())
+        self.assertEqual(StoreKeyEvent.__slots__, ())
+        evt = StoreProgressStepEvent(self, operation_id=1, message='copying',
+                                     step=10, key='key', metadata={})
+        self.assertTrue(evt.source is self)
+        self.assertEqual((evt.operation_id, evt.message, evt.step, evt.key),
+                         (1, 'copying', 10, 'key'))
+        self.assertTrue(isinstance(evt, ProgressStepEvent))
+        self.assertEqual(vars(evt), {})
+        self.assertEqual(StoreSetEvent(key='a').key, 'a')
+
+    def test_dict_events(self):
+        """ Test if events without declared fields use an instance dict.
+        """
+        evt = BaseEvent(value=1)
+        self.assertEqual(vars(evt), {'value': 1})
+        self.assertTrue(weakref.ref(evt)() is evt)
+
+    def test_emit(self):
+        """ Test if events with fields are emitted and filtered.
+        """
+        evt_mgr = EventManager()
+        received = []
+        evt_mgr.connect(FieldEvent, lambda evt: received.append(evt),
+                        filter={'value':1})
+        evt_mgr.emit(FieldEvent(value=1))
+        evt_mgr.emit(FieldEvent(value=2))
+        evt = SubFieldEvent(value=1)
+        evt_mgr.emit(evt)
+        self.assertEqual([e.value for e in received], [1, 1])
+        self.assertTrue(received[1] is evt)
+
+    def test_pickle_and_records(self):
+        """ Test if events with fields can be pickled and recorded.
+        """
+        evt = SubFieldEvent(value=1, extra=[2], undeclared=3)
+        evt.mark_as_handled()
+        for protocol in range(cPickle.HIGHEST_PROTOCOL + 1):
+            copy = cPickle.loads(cPickle.dumps(evt, protocol))
+            self.assertEqual((copy.value, copy.extra, copy.undeclared,
+                              copy.source, copy._handled),
+                             (1, [2], 3, [], True))
+        copy = cPickle.loads(cPickle.dumps(BaseEvent(a=1)))
+        self.assertEqual((copy.a, copy.source, copy._handled), (1, [], False))
+
+        record = event_to_record(evt)
+        self.assertEqual(record[1], {'value': 1, 'other': None, 'extra': [2],
+                                     'undeclared': 3})
+        copy = event_from_record(record)
+        self.assertEqual((copy.value, copy.extra, copy.undeclared),
+                         (1, [2], 3))
+
+    def test_special_slots(self):
+        """ Test if subclasses may declare the dict and weakref slots.
+        """
+        class SlottedEvent(BaseEvent):
+            __slots__ = ('value', '__dict__', '__weakref__')
+        evt = SlottedEvent(extra=1)
+        evt.value = 2
+        self.assertEqual(SlottedEvent.__slots__, ('value',))
+        self.assertTrue(weakref.ref(evt)() is evt)
+        self.assertEqual((evt.value, evt.extra), (2, 1))
+
+    def test_metaclass_mixin(self):
+        """ Test if events can mix in classes with a metaclass deriving from
+        EventType.
+        """
+        class MixinType(type):
+            pass
+        class Mixin(object):
+            __metaclass__ = MixinType
+        class MixinEventType(EventType, MixinType):
+            pass
+        class MixinEvent(BaseEvent, Mixin):
+            __metaclass__ = MixinEventType
+            __fields__ = ('value',)
+        evt = MixinEvent(value=1)
+        self.assertEqual(evt.value, 1)
+        self.assertTrue(isinstance(evt, Mixin))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,7 +12,10 @@ import weakref
 import threading
 
 # Local imports.
-from encore.events.event_manager import EventManager, BaseEvent
+from encore.events.event_manager import (EventManager, EventInfo, BaseEvent,
+    ChunkedSortedList)
+from encore.events.executors import BoundedExecutor
+from encore.events.abstract_event_manager import BaseEventManager
 
 class TestEventManager(unittest.TestCase):
     def setUp(self):
@@ -180,6 +183,36 @@ class TestEventManager(unittest.TestCase):
         self.evt_mgr.emit(MyEvt2())
         self.assertFalse(callback.called)
 
+    def test_enabled_table(self):
+        """ Test if the effective enabled state is precomputed.
+        """
+        class MyEvt(BaseEvent):
+            pass
+        class MyEvt2(MyEvt):
+            pass
+        callback = mock.Mock()
+        self.evt_mgr.connect(MyEvt2, callback)
+        self.evt_mgr.register(MyEvt)
+
+        self.assertTrue(self.evt_mgr.is_enabled(MyEvt2))
+        with mock.patch.object(EventInfo, 'is_enabled') as is_enabled:
+            for i in range(10):
+                self.evt_mgr.emit(MyEvt2())
+            self.assertTrue(self.evt_mgr.is_enabled(MyEvt2))
+        self.assertFalse(is_enabled.called)
+        self.assertEqual(callback.call_count, 10)
+
+        self.evt_mgr.disable(MyEvt)
+        self.assertFalse(self.evt_mgr.is_enabled(MyEvt2))
+        self.assertTrue(self.evt_mgr.is_enabled(BaseEvent))
+        self.evt_mgr.emit(MyEvt2())
+        self.assertEqual(callback.call_count, 10)
+
+        self.evt_mgr.enable(MyEvt)
+        self.assertTrue(self.evt_mgr.is_enabled(MyEvt2))
+        self.evt_mgr.emit(MyEvt2())
+        self.assertEqual(callback.call_count, 11)
+
     def test_mark_as_handled(self):
         """ Test if mark_as_handled() works.
         """
@@ -239,6 +272,268 @@ class TestEventManager(unittest.TestCase):
         # Notify only 0, 3
         check_count(MyEvent(prop3=BaseEvent), 3, 2, 1, 1, 1)
 
+    def test_filter_index(self):
+        """ Test if filtered listeners are dispatched through the index.
+        """
+        class MyEvent(BaseEvent):
+            def __init__(self, key=None, **kwargs):
+                super(MyEvent, self).__init__(**kwargs)
+                self.key = key
+
+        callbacks = [mock.Mock() for i in range(100)]
+        for i, callback in enumerate(callbacks):
+            self.evt_mgr.connect(MyEvent, callback, filter={'key':i % 10})
+        callback_all = mock.Mock()
+        self.evt_mgr.connect(MyEvent, callback_all)
+
+        info = self.evt_mgr.get_event(MyEvent)
+        self.assertEqual(info._filter_keys, set(['key']))
+        self.assertEqual(len(info._filter_index['key']), 10)
+
+        listeners = list(self.evt_mgr.get_listeners(MyEvent(key=3)))
+        self.assertEqual(listeners, callbacks[3::10] + [callback_all])
+        self.assertEqual(list(self.evt_mgr.get_listeners(MyEvent(key=20))),
+                         [callback_all])
+
+        # Disconnecting listeners should clean up the index.
+        for callback in callbacks:
+            self.evt_mgr.disconnect(MyEvent, callback)
+        self.assertEqual(info._filter_keys, set())
+        self.assertEqual(info._filter_index, {})
+
+    def test_filter_unhashable(self):
+        """ Test if filters on unhashable and missing attributes work.
+        """
+        class MyEvent(BaseEvent):
+            def __init__(self, value=None):
+                super(MyEvent, self).__init__()
+                self.value = value
+
+        callback = mock.Mock()
+        callback2 = mock.Mock()
+        self.evt_mgr.connect(MyEvent, callback, filter={'value':[1, 2]})
+        self.evt_mgr.connect(MyEvent, callback2, filter={'missing':1})
+
+        self.evt_mgr.emit(MyEvent(value=[1, 2]))
+        self.evt_mgr.emit(MyEvent(value=[1]))
+        self.evt_mgr.emit(MyEvent(value=1))
+        self.assertEqual(callback.call_count, 1)
+        self.assertEqual(callback2.call_count, 0)
+
+        self.evt_mgr.disconnect(MyEvent, callback)
+        self.evt_mgr.emit(MyEvent(value=[1, 2]))
+        self.assertEqual(callback.call_count, 1)
+
+    def test_source_index(self):
+        """ Test if listeners filtering on the source are indexed on it.
+        """
+        class MyEvent(BaseEvent):
+            __fields__ = ('key',)
+
+        sources = [object() for i in range(10)]
+        callbacks = [mock.Mock() for i in range(10)]
+        for source, callback in zip(sources, callbacks):
+            self.evt_mgr.connect(MyEvent, callback, filter={'source':source})
+        callback_key = mock.Mock()
+        self.evt_mgr.connect(MyEvent, callback_key,
+                             filter={'source':sources[3], 'key':1})
+        callback_all = mock.Mock()
+        self.evt_mgr.connect(MyEvent, callback_all)
+
+        info = self.evt_mgr.get_event(MyEvent)
+        self.assertEqual(len(info._source_index), 10)
+        self.assertEqual(info._filter_index, {})
+        self.assertEqual(list(self.evt_mgr.get_listeners(
+                                MyEvent(sources[3], key=1))),
+                         [callbacks[3], callback_key, callback_all])
+        self.assertEqual(list(self.evt_mgr.get_listeners(
+                                MyEvent(sources[3], key=2))),
+                         [callbacks[3], callback_all])
+        self.assertEqual(list(self.evt_mgr.get_listeners(MyEvent(object()))),
+                         [callback_all])
+
+        self.evt_mgr.emit(MyEvent(sources[5]))
+        self.assertEqual([c.call_count for c in callbacks],
+                         [0, 0, 0, 0, 0, 1, 0, 0, 0, 0])
+
+        # Disconnecting listeners should clean up the index.
+        for callback in callbacks + [callback_key]:
+            self.evt_mgr.disconnect(MyEvent, callback)
+        self.assertEqual(info._source_index, {})
+
+    def test_source_equality(self):
+        """ Test if sources with value equality match equal sources.
+        """
+        class Source(object):
+            def __init__(self, name):
+                self.name = name
+            def __eq__(self, other):
+                return self.name == getattr(other, 'name', None)
+            def __ne__(self, other):
+                return not self == other
+            def __hash__(self):
+                return hash(self.name)
+
+        callback_str = mock.Mock()
+        callback_int = mock.Mock()
+        callback_obj = mock.Mock()
+        self.evt_mgr.connect(BaseEvent, callback_str,
+                             filter={'source': 'store-1'})
+        self.evt_mgr.connect(BaseEvent, callback_int,
+                             filter={'source': 100000})
+        self.evt_mgr.connect(BaseEvent, callback_obj,
+                             filter={'source': Source('a')})
+        info = self.evt_mgr.get_event(BaseEvent)
+        self.assertEqual(info._source_index, {})
+
+        self.evt_mgr.emit(BaseEvent(''.join(['store-', '1'])))
+        self.evt_mgr.emit(BaseEvent(int('100000')))
+        self.evt_mgr.emit(BaseEvent(Source('a')))
+        self.evt_mgr.emit(BaseEvent(Source('b')))
+        self.assertEqual(callback_str.call_count, 1)
+        self.assertEqual(callback_int.call_count, 1)
+        self.assertEqual(callback_obj.call_count, 1)
+
+    def test_connect_many(self):
+        """ Test if many listeners are connected and disconnected at once.
+        """
+        class MyEvt(BaseEvent):
+            __fields__ = ('key',)
+        callbacks = [mock.Mock() for i in range(1000)]
+        callback = mock.Mock()
+        callback2 = mock.Mock()
+        self.evt_mgr.connect(MyEvt, callback)
+        self.evt_mgr.register(BaseEvent)
+        generation = self.evt_mgr._generation
+        self.evt_mgr.connect_many(MyEvt,
+            [(c, {'key': i % 10}) for i, c in enumerate(callbacks)] +
+            [(callback2, None, 1), callback])
+        self.assertEqual(self.evt_mgr._generation, generation + 1)
+
+        self.assertEqual(list(self.evt_mgr.get_listeners(MyEvt)),
+                         [callback2] + callbacks + [callback])
+        self.assertEqual(list(self.evt_mgr.get_listeners(MyEvt(key=3))),
+                         [callback2] + callbacks[3::10] + [callback])
+        self.evt_mgr.emit(MyEvt(key=4))
+        self.assertEqual(sum(c.call_count for c in callbacks), 100)
+
+        # Disconnecting fails without any change if a listener is unknown.
+        with self.assertRaises(KeyError):
+            self.evt_mgr.disconnect_many(MyEvt, callbacks[:10] + [mock.Mock()])
+        self.assertEqual(len(list(self.evt_mgr.get_listeners(MyEvt))), 1002)
+
+        self.evt_mgr.disconnect_many(MyEvt, callbacks[::2] + [callback2])
+        self.assertEqual(list(self.evt_mgr.get_listeners(MyEvt)),
+                         callbacks[1::2] + [callback])
+        self.evt_mgr.disconnect_many(MyEvt, callbacks[1::2] + [callback])
+        info = self.evt_mgr.get_event(MyEvt)
+        self.assertEqual(info._priority_list, ())
+        self.assertEqual(info._filter_index, {})
+
+    def test_connect_many_failure(self):
+        """ Test if a batch with a listener which cannot be connected does
+        not connect any.
+        """
+        callback = mock.Mock()
+        callback2 = mock.Mock()
+        with self.assertRaises(TypeError):
+            self.evt_mgr.connect_many(BaseEvent, [callback, [].append])
+        info = self.evt_mgr.get_event(BaseEvent)
+        self.assertEqual(info._priority_info, {})
+        self.assertEqual(info._priority_list, ())
+
+        self.evt_mgr.connect(BaseEvent, callback2)
+        with self.assertRaises(KeyError):
+            self.evt_mgr.disconnect(BaseEvent, callback)
+        self.evt_mgr.emit(BaseEvent())
+        self.assertFalse(callback.called)
+        self.assertEqual(callback2.call_count, 1)
+
+    def test_default_connect_many(self):
+        """ Test if the default connect_many applies the priority to the
+        listeners given without one.
+        """
+        evt_mgr = mock.Mock(spec=BaseEventManager)
+        callback, callback2, callback3 = mock.Mock(), mock.Mock(), mock.Mock()
+        BaseEventManager.connect_many(evt_mgr, BaseEvent,
+            [callback, (callback2, {'key': 1}), (callback3, None, 2)],
+            priority=5)
+        self.assertEqual(evt_mgr.connect.call_args_list, [
+            ((BaseEvent, callback, None, 5),),
+            ((BaseEvent, callback2, {'key': 1}, 5),),
+            ((BaseEvent, callback3, None, 2),)])
+
+    def test_chunked_sorted_list(self):
+        """ Test if the chunked sorted list stays sorted.
+        """
+        keys = ChunkedSortedList()
+        keys.load = 4
+        values = range(0, 200, 2)
+        for value in reversed(values):
+            keys.add(value)
+        # Changes are only visible once published.
+        self.assertEqual(keys.snapshot(), ())
+        keys.publish()
+        self.assertEqual(keys.snapshot(), tuple(values))
+        self.assertTrue(all(len(chunk) <= 8 for chunk in keys._chunks))
+
+        keys.update(range(1, 200, 2))
+        keys.publish()
+        self.assertEqual(keys.snapshot(), tuple(range(200)))
+        keys.update([50.5])
+        for value in range(0, 200, 3):
+            keys.remove(value)
+        keys.publish()
+        expected = sorted(set(range(200) + [50.5]).difference(
+                                                        range(0, 200, 3)))
+        self.assertEqual(keys.snapshot(), tuple(expected))
+        self.assertEqual(len(keys), len(expected))
+        self.assertEqual(keys._maxes, [chunk[-1] for chunk in keys._chunks])
+        for value in (0, 51.5, 1000):
+            with self.assertRaises(KeyError):
+                keys.remove(value)
+        self.assertEqual(keys.snapshot(), tuple(expected))
+
+    def test_dispatch_plan_cache(self):
+        """ Test if dispatch plans are cached and invalidated on changes.
+        """
+        class MyEvt(BaseEvent):
+            pass
+
+        class MyHeavyObject(object):
+            def callback(self, evt):
+                pass
+
+        callback = mock.Mock()
+        self.evt_mgr.connect(BaseEvent, callback)
+        self.evt_mgr.emit(MyEvt())
+        plan = self.evt_mgr._get_plan(MyEvt)
+        self.evt_mgr.emit(MyEvt())
+        self.assertTrue(self.evt_mgr._get_plan(MyEvt) is plan)
+        self.assertEqual(plan.listeners[0][-1](), callback)
+
+        def check_invalidated(action, *args):
+            plan = self.evt_mgr._get_plan(MyEvt)
+            action(*args)
+            self.assertTrue(self.evt_mgr._get_plan(MyEvt) is not plan)
+
+        callback2 = mock.Mock()
+        check_invalidated(self.evt_mgr.register, MyEvt)
+        check_invalidated(self.evt_mgr.connect, MyEvt, callback2)
+        check_invalidated(self.evt_mgr.disconnect, MyEvt, callback2)
+        check_invalidated(self.evt_mgr.disable, BaseEvent)
+        check_invalidated(self.evt_mgr.enable, BaseEvent)
+
+        obj = MyHeavyObject()
+        self.evt_mgr.connect(MyEvt, obj.callback)
+        plan = self.evt_mgr._get_plan(MyEvt)
+        del obj
+        self.assertTrue(self.evt_mgr._get_plan(MyEvt) is not plan)
+        self.assertEqual(list(self.evt_mgr.get_listeners(MyEvt)), [callback])
+
+        self.evt_mgr.emit(MyEvt())
+        self.assertEqual(callback.call_count, 3)
+
     def test_exception(self):
         """ Test if exception in handler causes subsequent notifications.
         """
@@ -439,6 +734,39 @@ class TestEventManager(unittest.TestCase):
         self.evt_mgr.emit(obj)
         self.assertEqual(data, [1, 2])
 
+    def test_notifier_dispatch(self):
+        """ Test if notifiers dispatch events without creating methods.
+        """
+        data = []
+        class MyHeavyObject(BaseEvent):
+            def callback(self, evt):
+                data.append((self, evt))
+            def callback_unbound(self):
+                data.append(self)
+        func = lambda evt: data.append(evt)
+
+        obj = MyHeavyObject()
+        self.evt_mgr.connect(BaseEvent, obj.callback, priority=2)
+        self.evt_mgr.connect(BaseEvent, MyHeavyObject.callback_unbound,
+                             priority=1)
+        self.evt_mgr.connect(BaseEvent, func)
+        notifiers = [linfo[-1] for linfo in
+                     self.evt_mgr._get_listener_infos(None, BaseEvent)]
+        dispatchers = [notifier.dispatch for notifier in notifiers]
+        self.assertEqual([n() for n in notifiers],
+                         [obj.callback, MyHeavyObject.callback_unbound, func])
+        self.assertTrue(dispatchers[2] is func)
+
+        evt = MyHeavyObject()
+        self.evt_mgr.emit(evt)
+        self.assertEqual(data, [(obj, evt), evt, evt])
+        self.assertEqual([n.dispatch for n in notifiers], dispatchers)
+
+        # The dispatcher of a collected method does nothing.
+        del obj, data[:]
+        self.assertEqual(dispatchers[0](evt), None)
+        self.assertEqual(data, [])
+
     def test_method_collect(self):
         """ Test if object garbage collection disconnects listener method.
         """
@@ -456,6 +784,43 @@ class TestEventManager(unittest.TestCase):
         self.assertEqual(data, [])
         self.assertEqual(len(list(self.evt_mgr.get_listeners(BaseEvent))), 0)
 
+    def test_method_collect_churn(self):
+        """ Stress test of garbage collected listeners being purged.
+        """
+        class MyEvt(BaseEvent):
+            pass
+        class ShortLived(object):
+            calls = 0
+            def callback(self, evt):
+                ShortLived.calls += 1
+
+        callback = mock.Mock()
+        self.evt_mgr.connect(BaseEvent, callback)
+        alive = []
+        with mock.patch('encore.events.event_manager.logger') as logger:
+            for i in xrange(100000):
+                obj = ShortLived()
+                self.evt_mgr.connect(MyEvt, obj.callback,
+                                     filter={'value':i % 4} if i % 2 else None)
+                alive.append(obj)
+                if len(alive) == 100:
+                    # Dispatch to a snapshot holding dead listeners.
+                    listeners = self.evt_mgr._get_listener_infos(None, MyEvt)
+                    del alive[:50]
+                    self.evt_mgr._dispatch(MyEvt(value=1), listeners)
+                    self.assertEqual(len(list(
+                            self.evt_mgr.get_listeners(MyEvt))), 51)
+            del obj, alive[:]
+        self.assertFalse(logger.warn.called)
+        self.assertEqual(list(self.evt_mgr.get_listeners(MyEvt)), [callback])
+
+        info = self.evt_mgr.get_event(MyEvt)
+        self.assertEqual(info._priority_list, ())
+        self.assertEqual(info._unfiltered_list, ())
+        self.assertEqual(info._priority_info, {})
+        self.assertEqual(info._listener_filters, {})
+        self.assertEqual(info._filter_index, {})
+
     def test_method_disconnect(self):
         """ Test if method disconnect works.
         """
@@ -516,6 +881,234 @@ class TestEventManager(unittest.TestCase):
         self.assertEqual(data[1], 'callback')
         self.assertEqual(data[3], 'main2')
 
+    def test_no_block_executor(self):
+        """ Test if non-blocking emits use the bounded executor.
+        """
+        executor = BoundedExecutor(max_workers=2)
+        evt_mgr = EventManager(executor=executor)
+        data = []
+        evt_mgr.connect(BaseEvent, lambda evt: data.append(evt))
+
+        events = [BaseEvent() for i in range(50)]
+        futures = [evt_mgr.emit(evt, block=False) for evt in events]
+        for future in futures:
+            self.assertTrue(future.wait(5))
+        self.assertEqual(sorted(map(id, data)), sorted(map(id, events)))
+        self.assertTrue(len(executor._threads) <= 2)
+        executor.shutdown()
+
+    def test_listener_executor(self):
+        """ Test if listeners connected with an executor are called off-thread.
+        """
+        executor = BoundedExecutor(max_workers=1)
+        lock = threading.Lock()
+        lock.acquire()
+        data = []
+        def slow(evt):
+            with lock:
+                data.append(('slow', threading.current_thread().name))
+        def fast(evt):
+            data.append(('fast', threading.current_thread().name))
+        self.evt_mgr.connect(BaseEvent, slow, priority=1, executor=executor)
+        self.evt_mgr.connect(BaseEvent, fast)
+
+        evt = BaseEvent()
+        self.evt_mgr.emit(evt)
+        self.assertEqual(data, [('fast', threading.current_thread().name)])
+        self.assertFalse(self.evt_mgr.wait_for_deliveries(evt, 0.01))
+        lock.release()
+        self.assertTrue(self.evt_mgr.wait_for_deliveries(evt, 5))
+        self.assertEqual(len(data), 2)
+        self.assertNotEqual(data[1][1], threading.current_thread().name)
+        self.assertEqual(self.evt_mgr._deliveries, {})
+        self.assertTrue(self.evt_mgr.wait_for_deliveries(BaseEvent()))
+
+        # Exceptions are handled by the error policy.
+        def failing(evt):
+            raise ValueError('failure')
+        self.evt_mgr.connect(BaseEvent, failing, executor=executor)
+        evt = BaseEvent()
+        with mock.patch('encore.events.event_manager.logger') as logger:
+            self.evt_mgr.emit(evt)
+            self.assertTrue(self.evt_mgr.wait_for_deliveries(evt, 5))
+        self.assertEqual(logger.warn.call_count, 1)
+
+        # Reconnecting inline.
+        self.evt_mgr.disconnect(BaseEvent, failing)
+        self.evt_mgr.connect(BaseEvent, slow)
+        self.assertFalse(self.evt_mgr.event_map[BaseEvent].has_executors())
+        data[:] = []
+        self.evt_mgr.emit(BaseEvent())
+        self.assertEqual([name for kind, name in data],
+                         [threading.current_thread().name] * 2)
+        executor.shutdown()
+
+    def test_listener_executor_refused(self):
+        """ Test if an executor refusing a listener does not stop the emit.
+        """
+        executor = BoundedExecutor(max_workers=1, max_queue=1, policy='raise')
+        lock = threading.Lock()
+        lock.acquire()
+        started = threading.Event()
+        def slow(evt):
+            started.set()
+            with lock:
+                pass
+        callback = mock.Mock()
+        class MyEvt(BaseEvent):
+            def post_emit(self):
+                self.posted = True
+        self.evt_mgr.connect(MyEvt, slow, priority=1, executor=executor)
+        self.evt_mgr.connect(MyEvt, callback)
+
+        with mock.patch('encore.events.event_manager.logger') as logger:
+            for i in range(3):
+                evt = MyEvt()
+                self.evt_mgr.emit(evt)
+                self.assertTrue(evt.posted)
+                self.assertTrue(started.wait(5))
+            self.assertEqual(callback.call_count, 3)
+            # The first event is being delivered, the second is queued.
+            self.assertEqual(logger.warn.call_count, 1)
+            self.assertIn('QueueFullError', logger.warn.call_args[0][0])
+            lock.release()
+            executor.shutdown()
+            evt = MyEvt()
+            self.evt_mgr.emit(evt)
+            self.assertTrue(evt.posted)
+            self.assertEqual(callback.call_count, 4)
+            self.assertEqual(logger.warn.call_count, 2)
+        self.assertEqual(self.evt_mgr._deliveries, {})
+
+    def test_emit_many(self):
+        """ Test if batches of events are emitted like separate emits.
+        """
+        call_seq = []
+        class MyEvt(BaseEvent):
+            def pre_emit(self):
+                call_seq.append(('pre', self.value))
+            def post_emit(self):
+                call_seq.append(('post', self.value))
+        class MyEvt2(BaseEvent):
+            pass
+
+        def callback(evt):
+            call_seq.append(('callback', evt.value))
+            if evt.value == 2:
+                evt.mark_as_handled()
+        def callback2(evt):
+            call_seq.append(('callback2', evt.value))
+        self.evt_mgr.connect(MyEvt, callback)
+        self.evt_mgr.connect(BaseEvent, callback2, filter={'value':1})
+        self.evt_mgr.disable(MyEvt2)
+
+        events = [MyEvt(value=1), MyEvt2(value=1), MyEvt(value=2),
+                  BaseEvent(value=1)]
+        self.evt_mgr.emit_many(events)
+        self.assertEqual(call_seq, [('pre', 1), ('callback', 1),
+                                    ('callback2', 1), ('post', 1),
+                                    ('pre', 2), ('callback', 2), ('post', 2),
+                                    ('callback2', 1)])
+        self.assertFalse(events[0]._handled)
+        self.assertTrue(events[2]._handled)
+
+        call_seq[:] = []
+        future = self.evt_mgr.emit_many(iter(events[3:]), block=False)
+        self.assertTrue(future.wait(5))
+        self.assertEqual(call_seq, [('callback2', 1)])
+
+    def test_profiling(self):
+        """ Test if per-listener dispatch statistics are recorded.
+        """
+        class MyEvt(BaseEvent):
+            pass
+        times = iter(range(100))
+        def callback(evt):
+            if getattr(evt, 'err', False):
+                raise RuntimeError('failed')
+        def callback2(evt):
+            evt.mark_as_handled()
+        self.evt_mgr.connect(BaseEvent, callback, priority=1)
+        self.evt_mgr.connect(MyEvt, callback2)
+
+        # Nothing is recorded unless profiling is enabled.
+        self.evt_mgr.emit(MyEvt())
+        self.assertEqual(self.evt_mgr.get_profile_stats(), [])
+
+        self.evt_mgr.enable_profiling(timer=lambda: next(times))
+        self.evt_mgr.emit(MyEvt())
+        self.evt_mgr.emit(MyEvt(err=True))
+        self.evt_mgr.emit(BaseEvent())
+
+        stats = sorted(self.evt_mgr.get_profile_stats(MyEvt),
+                       key=lambda s: s.listener.__name__)
+        self.assertEqual([s.listener for s in stats], [callback, callback2])
+        self.assertEqual([s.calls for s in stats], [2, 2])
+        self.assertEqual([s.total_time for s in stats], [2, 2])
+        self.assertEqual([s.exceptions for s in stats], [1, 0])
+        self.assertEqual([s.handled for s in stats], [0, 2])
+        stats = self.evt_mgr.get_profile_stats(BaseEvent)
+        self.assertEqual([(s.listener, s.calls) for s in stats],
+                         [(callback, 1)])
+        self.assertEqual(len(self.evt_mgr.get_profile_stats()), 3)
+
+        self.evt_mgr.disable_profiling()
+        self.evt_mgr.emit(MyEvt())
+        self.assertEqual(self.evt_mgr.get_profile_stats(MyEvt)[0].calls, 2)
+
+        self.evt_mgr.reset_profile_stats()
+        self.assertEqual(self.evt_mgr.get_profile_stats(), [])
+
+    def test_profiling_disconnect(self):
+        """ Test if the statistics of disconnected listeners are discarded.
+        """
+        class MyEvt(BaseEvent):
+            pass
+        def callback(evt):
+            pass
+        ref = weakref.ref(callback)
+        callback2 = mock.Mock()
+        self.evt_mgr.connect(MyEvt, callback)
+        self.evt_mgr.connect(MyEvt, callback2)
+        self.evt_mgr.enable_profiling()
+        self.evt_mgr.emit(MyEvt())
+        self.assertEqual(len(self.evt_mgr.get_profile_stats()), 2)
+
+        self.evt_mgr.disconnect(MyEvt, callback)
+        stats = self.evt_mgr.get_profile_stats()
+        self.assertEqual([s.listener for s in stats], [callback2])
+        del callback
+        self.assertIsNone(ref())
+
+    def test_concurrent_connect_emit(self):
+        """ Test if emitting while listeners are (dis)connected is safe.
+        """
+        class MyEvt(BaseEvent):
+            pass
+        data = []
+        self.evt_mgr.connect(MyEvt, lambda evt: data.append(evt.key),
+                             filter={'key':1})
+        stop = threading.Event()
+        def churn():
+            listeners = [lambda evt: None for i in range(10)]
+            while not stop.is_set():
+                for i, listener in enumerate(listeners):
+                    self.evt_mgr.connect(MyEvt, listener, filter={'key':i})
+                for listener in listeners:
+                    self.evt_mgr.disconnect(MyEvt, listener)
+
+        thread = threading.Thread(target=churn)
+        thread.start()
+        try:
+            with mock.patch('encore.events.event_manager.logger') as logger:
+                for i in range(2000):
+                    self.evt_mgr.emit(MyEvt(key=i % 2))
+        finally:
+            stop.set()
+            thread.join()
+        self.assertFalse(logger.warn.called)
+        self.assertEqual(data, [1] * 1000)
+
     def test_reentrant_emit(self):
         """ Test if reentrant emit works. """
         data = []
@@ -0,0 +1,251 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+
+# Standard library imports.
+import os
+import subprocess
+import sys
+import unittest
+import threading
+import random
+import time
+
+# Local imports.
+from encore.events.api import BaseEvent, EventManager
+from encore.events.executors import (BoundedExecutor, OrderedExecutor,
+    EventFuture, QueueFullError, source_key)
+
+class TestBoundedExecutor(unittest.TestCase):
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.lock.acquire()
+        self.started = threading.Event()
+
+    def tearDown(self):
+        if self.lock.locked():
+            self.lock.release()
+
+    def blocker(self):
+        """ Work which blocks the worker until the lock is released.
+        """
+        self.started.set()
+        with self.lock:
+            pass
+
+    def test_submit(self):
+        """ Test if submitted work is executed and results are returned.
+        """
+        executor = BoundedExecutor(max_workers=2)
+        futures = [executor.submit(pow, i, 2) for i in range(10)]
+        self.assertEqual([f.result(5) for f in futures],
+                         [i**2 for i in range(10)])
+        self.assertTrue(len(executor._threads) <= 2)
+
+        future = executor.submit(int, 'not an int')
+        self.assertTrue(isinstance(future.exception(5), ValueError))
+        with self.assertRaises(ValueError):
+            future.result()
+        executor.shutdown()
+
+    def test_block_policy(self):
+        """ Test if a full queue blocks the caller with 'block' policy.
+        """
+        executor = BoundedExecutor(max_workers=1, max_queue=1, policy='block')
+        executor.submit(self.blocker)
+        self.started.wait(5)
+        executor.submit(pow, 1, 1)
+
+        submitted = threading.Event()
+        def submit():
+            executor.submit(pow, 2, 2)
+            submitted.set()
+        thread = threading.Thread(target=submit)
+        thread.start()
+        self.assertFalse(submitted.wait(0.1))
+        self.lock.release()
+        self.assertTrue(submitted.wait(5))
+        thread.join()
+        executor.shutdown()
+
+    def test_block_policy_from_worker(self):
+        """ Test if listeners emitting to a full queue do not deadlock.
+        """
+        class A(BaseEvent):
+            pass
+        class B(BaseEvent):
+            pass
+        executor = BoundedExecutor(max_workers=1, max_queue=2, policy='block')
+        evt_mgr = EventManager(executor=executor)
+        received = []
+        evt_mgr.connect(A, lambda evt: evt_mgr.emit(B(), block=False))
+        def on_b(evt):
+            received.append(evt)
+        evt_mgr.connect(B, on_b)
+
+        def emit():
+            for i in range(10):
+                evt_mgr.emit(A(), block=False)
+        thread = threading.Thread(target=emit)
+        thread.daemon = True
+        thread.start()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        executor.shutdown()
+        self.assertEqual(len(received), 10)
+
+    def test_drop_oldest_policy(self):
+        """ Test if the oldest pending work is dropped with 'drop_oldest'.
+        """
+        executor = BoundedExecutor(max_workers=1, max_queue=2,
+                                   policy='drop_oldest')
+        executor.submit(self.blocker)
+        self.started.wait(5)
+        futures = [executor.submit(pow, i, 2) for i in range(4)]
+        self.assertEqual([f.cancelled() for f in futures],
+                         [True, True, False, False])
+        self.lock.release()
+        self.assertEqual([f.result(5) for f in futures[2:]], [4, 9])
+        executor.shutdown()
+
+    def test_raise_policy(self):
+        """ Test if a full queue raises with 'raise' policy.
+        """
+        executor = BoundedExecutor(max_workers=1, max_queue=1, policy='raise')
+        executor.submit(self.blocker)
+        self.started.wait(5)
+        executor.submit(pow, 1, 1)
+        with self.assertRaises(QueueFullError):
+            executor.submit(pow, 2, 2)
+        self.lock.release()
+        executor.shutdown()
+
+    def test_invalid_policy(self):
+        """ Test if an unknown policy is rejected.
+        """
+        with self.assertRaises(ValueError):
+            BoundedExecutor(policy='ignore')
+
+    def test_shutdown(self):
+        """ Test if shutdown finishes pending work and rejects new work.
+        """
+        executor = BoundedExecutor(max_workers=1)
+        futures = [executor.submit(pow, i, 2) for i in range(5)]
+        executor.shutdown(wait=True)
+        self.assertTrue(all(f.done() for f in futures))
+        with self.assertRaises(RuntimeError):
+            executor.submit(pow, 1, 1)
+
+
+class TestShutdownAtExit(unittest.TestCase):
+    def test_default_executor(self):
+        """ Test if the pending non-blocking emits of the default executor
+        are finished at interpreter exit.
+        """
+        script = '\n'.join([
+            'import sys, time',
+            'from encore.events.api import BaseEvent, EventManager',
+            'def callback(evt):',
+            '    time.sleep(0.01)',
+            '    sys.stdout.write("x")',
+            'evt_mgr = EventManager()',
+            'evt_mgr.connect(BaseEvent, callback)',
+            'for i in range(10):',
+            '    evt_mgr.emit(BaseEvent(), block=False)',
+        ])
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(
+            [root] + filter(None, [env.get('PYTHONPATH')]))
+        output = subprocess.check_output([sys.executable, '-c', script],
+                                         env=env)
+        self.assertEqual(output, 'x' * 10)
+
+
+class TestOrderedExecutor(unittest.TestCase):
+    def test_fifo_per_source(self):
+        """ Test if events of the same source are delivered in order.
+        """
+        executor = OrderedExecutor(num_shards=3)
+        evt_mgr = EventManager(executor=executor)
+        sources = [object() for i in range(5)]
+        received = dict((id(source), []) for source in sources)
+        def callback(evt):
+            time.sleep(random.random() * 0.001)
+            received[id(evt.source)].append(evt.seq)
+        evt_mgr.connect(BaseEvent, callback)
+
+        futures = []
+        for seq in range(40):
+            for source in sources:
+                futures.append(evt_mgr.emit(BaseEvent(source, seq=seq),
+                                            block=False))
+        for future in futures:
+            self.assertTrue(future.wait(5))
+        for source in sources:
+            self.assertEqual(received[id(source)], range(40))
+        executor.shutdown()
+
+    def test_source_key(self):
+        """ Test if equal sources, and missing sources, share their order.
+        """
+        self.assertEqual(source_key(BaseEvent(('a', 1))),
+                         source_key(BaseEvent(('a', 1))))
+        self.assertEqual(source_key(BaseEvent()), source_key(BaseEvent()))
+        self.assertIsNone(source_key(BaseEvent()))
+        source = {'a': 1}
+        self.assertEqual(source_key(BaseEvent(source)), id(source))
+        self.assertNotEqual(source_key(BaseEvent(source)),
+                            source_key(BaseEvent({'a': 1})))
+
+    def test_parallel_keys(self):
+        """ Test if different ordering keys are executed in parallel.
+        """
+        executor = OrderedExecutor(num_shards=2, key=lambda key: key)
+        lock = threading.Lock()
+        lock.acquire()
+        def blocker(key):
+            with lock:
+                return key
+
+        blocked = executor.submit(blocker, 0)
+        # Key 1 is on the other shard and is not held up by key 0.
+        self.assertEqual(executor.submit(abs, 1).result(5), 1)
+        # Key 2 is on the same shard as key 0 and waits for it.
+        queued = executor.submit(abs, 2)
+        self.assertFalse(queued.wait(0.1))
+        lock.release()
+        self.assertEqual(blocked.result(5), 0)
+        self.assertEqual(queued.result(5), 2)
+        executor.shutdown()
+
+
+class TestEventFuture(unittest.TestCase):
+    def test_callbacks(self):
+        """ Test if done callbacks are called on completion and cancellation.
+        """
+        done = []
+        future = EventFuture()
+        future.add_done_callback(done.append)
+        self.assertTrue(future.is_alive())
+        future.set_result(1)
+        self.assertEqual(done, [future])
+        self.assertFalse(future.cancel())
+
+        future2 = EventFuture()
+        future2.add_done_callback(done.append)
+        self.assertTrue(future2.cancel())
+        self.assertEqual(done, [future, future2])
+        self.assertFalse(future2.set_running())
+
+        # Callbacks added after completion are called immediately.
+        future.add_done_callback(done.append)
+        self.assertEqual(done, [future, future2, future])
+
+
+if __name__ == '__main__':
+    unittest.main()
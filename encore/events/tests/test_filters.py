@@ -0,0 +1,206 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+
+# Standard library imports.
+import unittest
+import mock
+
+# Local imports.
+from encore.events.api import (BaseEvent, EventManager, In, Prefix, Range,
+    NotEqual)
+
+
+class KeyEvent(BaseEvent):
+    __fields__ = ('key', 'size')
+    __slots__ = ()
+
+
+class Key(object):
+    """ Compared by value, but hashed by identity.
+    """
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, Key) and other.value == self.value
+
+    def __ne__(self, other):
+        return not self == other
+
+
+class TestFilterOperators(unittest.TestCase):
+
+    def test_in(self):
+        self.assertTrue(In([1, 2]).matches(2))
+        self.assertFalse(In([1, 2]).matches(3))
+        self.assertFalse(In([1, 2]).matches([1]))
+        self.assertTrue(In([[1], 2]).matches([1]))
+        self.assertEqual(In([[1], 2]).index_values(), None)
+        self.assertEqual(set(In([1, 2]).index_values()), set([1, 2]))
+
+    def test_prefix(self):
+        self.assertTrue(Prefix('ab').matches('abc'))
+        self.assertTrue(Prefix('ab').matches(u'ab'))
+        self.assertFalse(Prefix('ab').matches('a'))
+        self.assertFalse(Prefix('ab').matches(1))
+        self.assertTrue(Prefix((1,)).matches((1, 2)))
+        self.assertEqual(Prefix('ab').index_prefix(), 'ab')
+        self.assertEqual(Prefix([1]).index_prefix(), None)
+
+    def test_range(self):
+        self.assertTrue(Range(1, 3).matches(1))
+        self.assertFalse(Range(1, 3).matches(3))
+        self.assertTrue(Range(1, 3, inclusive=True).matches(3))
+        self.assertFalse(Range(1, 3).matches(0))
+        self.assertTrue(Range(low=1).matches(100))
+        self.assertTrue(Range(high=1).matches(-100))
+
+    def test_not_equal(self):
+        self.assertTrue(NotEqual(1).matches(2))
+        self.assertFalse(NotEqual(1).matches(1))
+
+
+class TestFilters(unittest.TestCase):
+    def setUp(self):
+        self.evt_mgr = EventManager()
+
+    def connect(self, filter):
+        callback = mock.Mock()
+        self.evt_mgr.connect(KeyEvent, callback, filter=filter)
+        self.info = self.evt_mgr.get_event(KeyEvent)
+        return callback
+
+    def listeners(self, **kwargs):
+        return list(self.evt_mgr.get_listeners(KeyEvent(**kwargs)))
+
+    def test_in(self):
+        """ Test if listeners are indexed on the values of In filters.
+        """
+        callback = self.connect({'key': In(['a', 'b'])})
+        callback2 = self.connect({'key': In(['b', 'c'])})
+        self.assertEqual(set(self.info._filter_index['key']),
+                         set(['a', 'b', 'c']))
+        self.assertEqual(self.listeners(key='a'), [callback])
+        self.assertEqual(self.listeners(key='b'), [callback, callback2])
+        self.assertEqual(self.listeners(key='d'), [])
+        self.assertEqual(self.listeners(key=['a']), [])
+
+        self.evt_mgr.emit(KeyEvent(key='c'))
+        self.assertFalse(callback.called)
+        self.assertEqual(callback2.call_count, 1)
+
+    def test_prefix(self):
+        """ Test if listeners are indexed on the prefixes of Prefix filters.
+        """
+        callback = self.connect({'key': Prefix('images/')})
+        callback2 = self.connect({'key': Prefix('images/2012/')})
+        callback3 = self.connect({'key': Prefix('')})
+        self.assertEqual(self.info._unindexed, {})
+        self.assertEqual(self.info._prefix_lengths['key'], (0, 7, 12))
+
+        self.assertEqual(self.listeners(key='images/2012/a.png'),
+                         [callback, callback2, callback3])
+        self.assertEqual(self.listeners(key='images/a.png'),
+                         [callback, callback3])
+        self.assertEqual(self.listeners(key='images/'),
+                         [callback, callback3])
+        self.assertEqual(self.listeners(key='docs/'), [callback3])
+        self.assertEqual(self.listeners(key=1), [])
+        self.assertEqual(self.listeners(), [])
+
+    def test_prefix_lengths(self):
+        """ Test if a prefix length is kept while listeners are indexed on
+        prefixes of that length.
+        """
+        callback = self.connect({'key': Prefix('ab')})
+        callback2 = self.connect({'key': Prefix('ab')})
+        callback3 = self.connect({'key': Prefix('cd')})
+        callback4 = self.connect({'key': Prefix('abc')})
+        self.assertEqual(self.info._prefix_lengths['key'], (2, 3))
+        self.evt_mgr.disconnect(KeyEvent, callback)
+        self.evt_mgr.disconnect(KeyEvent, callback3)
+        self.assertEqual(self.info._prefix_lengths['key'], (2, 3))
+        self.evt_mgr.disconnect(KeyEvent, callback2)
+        self.assertEqual(self.info._prefix_lengths['key'], (3,))
+        self.assertEqual(self.listeners(key='abcd'), [callback4])
+        self.evt_mgr.disconnect(KeyEvent, callback4)
+        self.assertEqual(self.info._prefix_lengths, {})
+        self.assertEqual(self.info._prefix_counts, {})
+
+    def test_equal_by_value(self):
+        """ Test if filter values compared by value but hashed by identity
+        match equal event attributes.
+        """
+        callback = self.connect({'key': Key(1)})
+        callback2 = self.connect({'key': In([Key(2), 3])})
+        callback3 = self.connect({'key': Prefix((Key(4),))})
+        self.assertEqual(len(self.info._unindexed), 3)
+
+        self.assertEqual(self.listeners(key=Key(1)), [callback])
+        self.assertEqual(self.listeners(key=Key(2)), [callback2])
+        self.assertEqual(self.listeners(key=3), [callback2])
+        self.assertEqual(self.listeners(key=(Key(4), 5)), [callback3])
+        self.assertEqual(self.listeners(key=Key(5)), [])
+        self.evt_mgr.emit(KeyEvent(key=Key(1)))
+        self.assertEqual(callback.call_count, 1)
+
+    def test_linear(self):
+        """ Test if Range and NotEqual filters are evaluated.
+        """
+        callback = self.connect({'size': Range(10, 20)})
+        callback2 = self.connect({'size': NotEqual(15)})
+        callback3 = self.connect({'key': 'a', 'size': Range(10, 20)})
+        self.assertEqual(len(self.info._unindexed), 2)
+        self.assertEqual(self.info._filter_index['key'].keys(), ['a'])
+
+        self.assertEqual(self.listeners(size=15), [callback])
+        self.assertEqual(self.listeners(size=12), [callback, callback2])
+        self.assertEqual(self.listeners(key='a', size=12),
+                         [callback, callback2, callback3])
+        self.assertEqual(self.listeners(size=20), [callback2])
+        self.assertEqual(self.listeners(key='a'), [callback2])
+
+        # Changes after a dispatch are seen by the next one.
+        callback4 = self.connect({'size': Range(20, 30)})
+        self.evt_mgr.disconnect(KeyEvent, callback2)
+        self.assertEqual(self.listeners(size=20), [callback4])
+
+    def test_mixed(self):
+        """ Test if filter operators are combined with plain values.
+        """
+        callback = self.connect({'key': Prefix('a'), 'size': In([1, 2])})
+        callback2 = self.connect({'key': 'ab', 'size': NotEqual(1)})
+        self.assertEqual(self.info._filter_index['size'].keys(), [1, 2])
+        self.assertEqual(self.info._filter_index['key'].keys(), ['ab'])
+
+        self.assertEqual(self.listeners(key='ab', size=1), [callback])
+        self.assertEqual(self.listeners(key='ab', size=2),
+                         [callback, callback2])
+        self.assertEqual(self.listeners(key='b', size=2), [])
+
+    def test_disconnect(self):
+        """ Test if disconnecting listeners cleans up the indexes.
+        """
+        callbacks = [self.connect({'key': In(['a', 'b', 'a'])}),
+                     self.connect({'key': Prefix('a')}),
+                     self.connect({'key': Prefix('ab')}),
+                     self.connect({'key': In([])}),
+                     self.connect({'size': Range(1, 2)})]
+        for callback in callbacks[1:]:
+            self.evt_mgr.disconnect(KeyEvent, callback)
+        self.assertEqual(self.listeners(key='a'), [callbacks[0]])
+        self.evt_mgr.disconnect(KeyEvent, callbacks[0])
+
+        self.assertEqual(self.info._filter_index, {})
+        self.assertEqual(self.info._filter_keys, set())
+        self.assertEqual(self.info._prefix_index, {})
+        self.assertEqual(self.info._prefix_lengths, {})
+        self.assertEqual(self.info._unindexed, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+
+# Standard library imports.
+import os
+import unittest
+import mock
+from shutil import rmtree
+from tempfile import mkdtemp
+
+# Local imports.
+from encore.events.api import BaseEvent, EventManager
+from encore.events.journal import (JournalRecorder, read_journal,
+    replay_journal, MAGIC)
+
+
+class JournalEvent(BaseEvent):
+    __fields__ = ('key', 'value')
+    __slots__ = ()
+
+class OtherEvent(BaseEvent):
+    pass
+
+
+class FakeClock(object):
+    """ Timer and sleep functions of a simulated clock.
+    """
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def timer(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'events.journal')
+        self.evt_mgr = EventManager()
+
+    def tearDown(self):
+        rmtree(self.tmpdir)
+
+    def record(self, events, classes=(BaseEvent,), **kwargs):
+        recorder = JournalRecorder(self.evt_mgr, self.path, classes=classes,
+                                   **kwargs).start()
+        for evt in events:
+            self.evt_mgr.emit(evt)
+        recorder.close()
+        return recorder
+
+    def test_record(self):
+        """ Test if emitted events are recorded.
+        """
+        def handle(evt):
+            evt.mark_as_handled()
+        self.evt_mgr.connect(BaseEvent, handle)
+        recorder = self.record([JournalEvent(key='a', value=1),
+                                OtherEvent(other=[1, 2]),
+                                JournalEvent(key='b', unpicklable=lambda: 1)])
+        self.assertEqual(recorder.events, 3)
+        self.assertEqual(list(self.evt_mgr.get_listeners(BaseEvent)),
+                         [handle])
+
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(len(MAGIC)), MAGIC)
+        records = [record for timestamp, record in read_journal(self.path)]
+        self.assertEqual(records, [
+            (__name__ + ':JournalEvent', {'key': 'a', 'value': 1}),
+            (__name__ + ':OtherEvent', {'other': [1, 2]}),
+            (__name__ + ':JournalEvent', {'key': 'b', 'value': None})])
+
+    def test_append(self):
+        """ Test if sessions are appended to a journal.
+        """
+        self.record([JournalEvent(key='a')])
+        self.record([OtherEvent(), JournalEvent(key='b')])
+        records = [record for timestamp, record in read_journal(self.path)]
+        self.assertEqual([r[0].split(':')[1] for r in records],
+                         ['JournalEvent', 'OtherEvent', 'JournalEvent'])
+        self.assertEqual(records[2][1]['key'], 'b')
+
+    def test_classes(self):
+        """ Test if only events of the recorded classes are recorded.
+        """
+        self.record([JournalEvent(key='a'), OtherEvent()],
+                    classes=[OtherEvent])
+        records = [record for timestamp, record in read_journal(self.path)]
+        self.assertEqual(records, [(__name__ + ':OtherEvent', {})])
+
+    def test_overlapping_classes(self):
+        """ Test if events of several recorded classes are recorded once.
+        """
+        recorder = self.record([JournalEvent(key='a'), OtherEvent()],
+                               classes=[BaseEvent, JournalEvent])
+        self.assertEqual(recorder.events, 2)
+        records = [record for timestamp, record in read_journal(self.path)]
+        self.assertEqual([r[0].split(':')[1] for r in records],
+                         ['JournalEvent', 'OtherEvent'])
+        self.assertEqual(list(self.evt_mgr.get_listeners(BaseEvent)), [])
+
+    def test_not_journal(self):
+        """ Test if reading other files fails.
+        """
+        with open(self.path, 'wb') as f:
+            f.write('not a journal')
+        with self.assertRaises(ValueError):
+            list(read_journal(self.path))
+
+    def test_replay(self):
+        """ Test if replayed events are emitted as fast as possible.
+        """
+        self.record([JournalEvent(key=i, value=i * i) for i in range(100)])
+        replayed = []
+        evt_mgr = EventManager()
+        evt_mgr.connect(JournalEvent, lambda evt: replayed.append(evt))
+        report = replay_journal(evt_mgr, self.path, source=self)
+        self.assertEqual(report.events, 100)
+        self.assertEqual(report.skipped, 0)
+        self.assertEqual([(evt.key, evt.value) for evt in replayed],
+                         [(i, i * i) for i in range(100)])
+        self.assertTrue(all(evt.source is self for evt in replayed))
+        self.assertTrue(report.events_per_second > 0)
+        self.assertTrue(0 <= report.latency(0.5) <= report.latency(0.99)
+                        <= report.latency(1.0))
+
+    def test_replay_realtime(self):
+        """ Test if replayed events are emitted with their original timing.
+        """
+        timestamps = iter([10.0, 10.5, 12.5])
+        self.record([JournalEvent(key=i) for i in range(3)],
+                    timer=lambda: next(timestamps))
+        replay = FakeClock()
+        report = replay_journal(EventManager(), self.path, realtime=True,
+                                speed=2.0, timer=replay.timer,
+                                sleep=replay.sleep)
+        self.assertEqual(report.events, 3)
+        self.assertEqual(replay.sleeps, [0.25, 1.0])
+        self.assertEqual(report.seconds, 1.25)
+
+    def test_replay_unknown_class(self):
+        """ Test if events of unknown classes are skipped.
+        """
+        self.record([JournalEvent(key='a')])
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        with open(self.path, 'wb') as f:
+            f.write(data.replace(':JournalEvent', ':UnknownEvent'))
+        with mock.patch('encore.events.journal.logger') as logger:
+            report = replay_journal(EventManager(), self.path)
+        self.assertEqual((report.events, report.skipped), (0, 1))
+        self.assertEqual(logger.warn.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+
+# Standard library imports.
+import unittest
+import mock
+
+# Local imports.
+from encore.events.api import (BaseEvent, EventManager, LastValueCache,
+    BoundedExecutor)
+
+
+class UpdateEvent(BaseEvent):
+    __fields__ = ('key', 'value')
+
+
+class SubUpdateEvent(UpdateEvent):
+    pass
+
+
+class OtherEvent(BaseEvent):
+    __fields__ = ('key',)
+
+
+class TestLastValueCache(unittest.TestCase):
+    def test_store(self):
+        """ Test if the last event of each key is cached.
+        """
+        cache = LastValueCache(('key',), max_size=10)
+        events = [UpdateEvent(key=i % 3, value=i) for i in range(7)]
+        for i, evt in enumerate(events):
+            cache.store(evt, i)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.events(), events[4:])
+        self.assertEqual(cache.entries()[0], (4, events[4]))
+        self.assertIs(cache.get(0), events[6])
+        self.assertIsNone(cache.get(3))
+
+        cache.store(UpdateEvent(key=[1]))
+        self.assertEqual(len(cache), 3)
+        cache.clear()
+        self.assertEqual(cache.events(), [])
+
+    def test_eviction(self):
+        """ Test if the least recently updated keys are evicted.
+        """
+        cache = LastValueCache('key', max_size=2)
+        for key in (1, 2, 1, 3):
+            cache.store(UpdateEvent(key=key))
+        self.assertEqual([evt.key for evt in cache.events()], [1, 3])
+        self.assertEqual(cache.evicted, 1)
+        with self.assertRaises(ValueError):
+            LastValueCache(max_size=0)
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.evt_mgr = EventManager()
+
+    def test_replay(self):
+        """ Test if cached events are replayed to late listeners.
+        """
+        cache = self.evt_mgr.enable_last_value_cache(UpdateEvent, ('key',))
+        self.assertIs(self.evt_mgr.get_last_value_cache(UpdateEvent), cache)
+        events = [UpdateEvent(key=1, value=1), SubUpdateEvent(key=2),
+                  UpdateEvent(key=1, value=2), OtherEvent(key=1)]
+        self.evt_mgr.emit_many(events[:2])
+        for evt in events[2:]:
+            self.evt_mgr.emit(evt)
+        self.assertEqual(cache.events(), events[1:3])
+
+        received = []
+        self.evt_mgr.connect(BaseEvent, lambda evt: received.append(evt),
+                             replay=True)
+        self.assertEqual(received, events[1:3])
+        received = []
+        self.evt_mgr.connect(SubUpdateEvent, lambda evt: received.append(evt),
+                             replay=True)
+        self.assertEqual(received, events[1:2])
+        received = []
+        self.evt_mgr.connect(UpdateEvent, lambda evt: received.append(evt),
+                             filter={'key': 1}, replay=True)
+        self.assertEqual(received, events[2:3])
+        received = []
+        self.evt_mgr.connect(UpdateEvent, lambda evt: received.append(evt))
+        self.assertEqual(received, [])
+
+        self.evt_mgr.disable_last_value_cache(UpdateEvent)
+        self.assertIsNone(self.evt_mgr.get_last_value_cache(UpdateEvent))
+        self.evt_mgr.emit(UpdateEvent(key=3))
+        self.assertEqual(len(cache), 2)
+
+    def test_hierarchy(self):
+        """ Test if events are replayed once and in order of emission from
+        the caches of several classes.
+        """
+        self.evt_mgr.enable_last_value_cache(UpdateEvent, ('key',))
+        self.evt_mgr.enable_last_value_cache(BaseEvent, max_size=1)
+        events = [SubUpdateEvent(key=1), UpdateEvent(key=2),
+                  OtherEvent(key=1)]
+        for evt in events:
+            self.evt_mgr.emit(evt)
+        received = []
+        self.evt_mgr.connect(BaseEvent, lambda evt: received.append(evt),
+                             replay=True)
+        self.assertEqual(received, events)
+
+    def test_disabled(self):
+        """ Test if the events of disabled classes are not cached.
+        """
+        cache = self.evt_mgr.enable_last_value_cache(UpdateEvent)
+        self.evt_mgr.disable(UpdateEvent)
+        self.evt_mgr.emit(UpdateEvent(key=1))
+        self.assertEqual(len(cache), 0)
+
+    def test_replay_errors_and_executor(self):
+        """ Test if replayed events go through the error policy and the
+        executor of the listener.
+        """
+        self.evt_mgr.enable_last_value_cache(UpdateEvent, 'key')
+        evt = UpdateEvent(key=1)
+        self.evt_mgr.emit(evt)
+
+        def failing(evt):
+            raise ValueError('failure')
+        with mock.patch('encore.events.event_manager.logger') as logger:
+            self.evt_mgr.connect(UpdateEvent, failing, replay=True)
+        self.assertEqual(logger.warn.call_count, 1)
+
+        executor = BoundedExecutor(max_workers=1)
+        callback = mock.Mock()
+        self.evt_mgr.connect(UpdateEvent, callback, replay=True,
+                             executor=executor)
+        self.assertTrue(self.evt_mgr.wait_for_deliveries(evt, 5))
+        callback.assert_called_once_with(evt)
+        executor.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
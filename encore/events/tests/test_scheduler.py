@@ -0,0 +1,187 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+
+# Standard library imports.
+import threading
+import time
+import unittest
+import mock
+
+# Local imports.
+from encore.events.api import BaseEvent, EventManager, Scheduler
+
+
+class MyEvt(BaseEvent):
+    __fields__ = ('key',)
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = Scheduler()
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def test_order(self):
+        """ Test if calls are run in the order of their due times.
+        """
+        calls = []
+        done = threading.Event()
+        now = time.time()
+        for i in (3, 1, 2):
+            self.scheduler.schedule(now + 0.01 * i, calls.append, (i,))
+        self.scheduler.schedule(now + 0.04, done.set)
+        done.wait(5)
+        self.assertEqual(calls, [1, 2, 3])
+        self.assertEqual(self.scheduler.pending(), 0)
+
+    def test_earlier_call(self):
+        """ Test if a call due earlier than the awaited one wakes the worker.
+        """
+        done = threading.Event()
+        self.scheduler.schedule_later(60, done.set)
+        call = self.scheduler.schedule_later(0, done.set)
+        self.assertTrue(done.wait(5))
+        self.assertFalse(call.pending())
+        self.assertEqual(self.scheduler.pending(), 1)
+
+    def test_cancel(self):
+        """ Test if cancelled calls are not run.
+        """
+        callback = mock.Mock()
+        done = threading.Event()
+        call = self.scheduler.schedule_later(0.01, callback)
+        self.assertTrue(call.pending())
+        self.assertTrue(call.cancel())
+        self.assertFalse(call.cancel())
+        self.assertTrue(call.cancelled())
+        self.assertTrue(call.done())
+        self.scheduler.schedule_later(0.02, done.set)
+        done.wait(5)
+        self.assertFalse(callback.called)
+
+    def test_replace_by_key(self):
+        """ Test if scheduling with the key of a pending call replaces it.
+        """
+        calls = []
+        done = threading.Event()
+        first = self.scheduler.schedule_later(0.01, calls.append, (1,), 'k')
+        second = self.scheduler.schedule_later(0.02, calls.append, (2,), 'k')
+        self.assertTrue(first.cancelled())
+        self.assertIs(self.scheduler.get('k'), second)
+        self.assertEqual(self.scheduler.pending(), 1)
+        self.scheduler.schedule_later(0.03, done.set)
+        done.wait(5)
+        self.assertEqual(calls, [2])
+        self.assertIsNone(self.scheduler.get('k'))
+        self.assertFalse(self.scheduler.cancel('k'))
+
+    def test_many_pending(self):
+        """ Test if many cancelled calls are purged from the heap.
+        """
+        calls = [self.scheduler.schedule_later(60, None, key=i)
+                 for i in range(10000)]
+        self.assertEqual(self.scheduler.pending(), 10000)
+        for i in range(9000):
+            self.assertTrue(self.scheduler.cancel(i))
+        self.assertEqual(self.scheduler.pending(), 1000)
+        self.assertTrue(len(self.scheduler._heap) < 10000)
+        self.assertTrue(all(call.cancelled() for call in calls[:9000]))
+        self.assertTrue(all(call.pending() for call in calls[9000:]))
+
+    def test_exception(self):
+        """ Test if exceptions of calls are logged and do not stop the worker.
+        """
+        def failing():
+            raise ValueError('failure')
+        done = threading.Event()
+        with mock.patch('encore.events.scheduler.logger') as logger:
+            self.scheduler.schedule_later(0, failing)
+            self.scheduler.schedule_later(0.01, done.set)
+            self.assertTrue(done.wait(5))
+        self.assertEqual(logger.exception.call_count, 1)
+
+    def test_shutdown(self):
+        """ Test if shutting down cancels the pending calls.
+        """
+        call = self.scheduler.schedule_later(60, None)
+        self.scheduler.shutdown()
+        self.assertTrue(call.cancelled())
+        self.assertFalse(self.scheduler._thread.is_alive())
+        with self.assertRaises(RuntimeError):
+            self.scheduler.schedule_later(0, None)
+
+
+class TestDelayedEmit(unittest.TestCase):
+    def setUp(self):
+        self.evt_mgr = EventManager()
+        self.received = []
+        self.done = threading.Event()
+        def callback(evt):
+            self.received.append(evt.key)
+            self.done.set()
+        self.evt_mgr.connect(MyEvt, callback)
+
+    def tearDown(self):
+        if self.evt_mgr.scheduler is not None:
+            self.evt_mgr.scheduler.shutdown()
+
+    def test_emit_later(self):
+        """ Test if events are emitted after the delay, in the scheduler thread.
+        """
+        threads = []
+        self.evt_mgr.connect(MyEvt, lambda evt: threads.append(
+            threading.current_thread()))
+        start = time.time()
+        self.evt_mgr.emit_later(MyEvt(key=1), 0.05)
+        self.assertEqual(self.received, [])
+        self.assertTrue(self.done.wait(5))
+        self.assertTrue(time.time() - start >= 0.05)
+        self.assertEqual(self.received, [1])
+        self.assertEqual(threads, [self.evt_mgr.scheduler._thread])
+
+    def test_emit_at(self):
+        """ Test if events are emitted at the given time.
+        """
+        when = time.time() + 0.02
+        self.evt_mgr.emit_at(MyEvt(key=1), when)
+        self.assertTrue(self.done.wait(5))
+        self.assertTrue(time.time() >= when)
+        self.assertEqual(self.received, [1])
+
+    def test_debounce(self):
+        """ Test if delayed emits with a key replace each other.
+        """
+        for i in range(10):
+            self.evt_mgr.emit_later(MyEvt(key=i), 0.02, key='reindex')
+        self.assertTrue(self.done.wait(5))
+        time.sleep(0.02)
+        self.assertEqual(self.received, [9])
+
+    def test_cancel(self):
+        """ Test if delayed emits can be cancelled by handle or key.
+        """
+        self.assertFalse(self.evt_mgr.cancel_emit('key'))
+        call = self.evt_mgr.emit_later(MyEvt(key=1), 0.01)
+        self.evt_mgr.emit_later(MyEvt(key=2), 0.01, key='key')
+        self.assertTrue(call.cancel())
+        self.assertTrue(self.evt_mgr.cancel_emit('key'))
+        self.evt_mgr.emit_later(MyEvt(key=3), 0.02)
+        self.assertTrue(self.done.wait(5))
+        self.assertEqual(self.received, [3])
+
+    def test_non_blocking(self):
+        """ Test if delayed emits can be handed to the executor.
+        """
+        self.evt_mgr.emit_later(MyEvt(key=1), 0, block=False)
+        self.assertTrue(self.done.wait(5))
+        self.assertEqual(self.received, [1])
+        self.evt_mgr.executor.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
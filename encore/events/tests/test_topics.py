@@ -0,0 +1,151 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+
+# Standard library imports.
+import unittest
+import mock
+
+# Local imports.
+from encore.events.api import EventManager, TopicRegistry, DisconnectPolicy
+
+
+class Listener(object):
+    def __init__(self):
+        self.calls = []
+
+    def callback(self, topic, payload):
+        self.calls.append((topic, payload))
+
+
+class TestTopicRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = TopicRegistry()
+
+    def patterns(self, topic):
+        return [subscriber.pattern
+                for subscriber in self.registry.subscribers(topic)]
+
+    def test_match(self):
+        """ Test if topics are matched by exact and wildcard patterns.
+        """
+        patterns = ['store.main.update', 'store.*.update', 'store.*',
+                    '*.main.*', 'store.**', '**.update', 'store.**.update',
+                    '**', 'cache.**']
+        for count, pattern in enumerate(patterns):
+            self.registry.subscribe(pattern, lambda topic, payload: None,
+                                    count=count)
+        self.assertEqual(self.patterns('store.main.update'), [
+            'store.main.update', 'store.*.update', '*.main.*', 'store.**',
+            '**.update', 'store.**.update', '**'])
+        self.assertEqual(self.patterns('store.main'), [
+            'store.*', 'store.**', '**'])
+        self.assertEqual(self.patterns('store'), ['store.**', '**'])
+        self.assertEqual(self.patterns('store.a.b.update'), [
+            'store.**', '**.update', 'store.**.update', '**'])
+        self.assertEqual(self.patterns('other'), ['**'])
+
+    def test_priority(self):
+        """ Test if subscribers are ordered by priority, then subscription.
+        """
+        self.registry.subscribe('a.b', lambda topic, payload: None, 0, 0)
+        self.registry.subscribe('a.*', lambda topic, payload: None, 1, 1)
+        self.registry.subscribe('**', lambda topic, payload: None, 0, 2)
+        self.assertEqual(self.patterns('a.b'), ['a.*', 'a.b', '**'])
+
+    def test_unsubscribe(self):
+        """ Test if unsubscribing updates the resolved subscribers and prunes
+        the trie.
+        """
+        func = lambda topic, payload: None
+        self.registry.subscribe('a.*.c', func)
+        self.registry.subscribe('a.b.c', func)
+        self.assertEqual(len(self.registry.subscribers('a.b.c')), 2)
+        self.assertEqual(self.registry.patterns(), ['a.*.c', 'a.b.c'])
+        self.registry.unsubscribe('a.*.c', func)
+        self.assertEqual(self.patterns('a.b.c'), ['a.b.c'])
+        self.assertEqual(self.registry._trie.children, {})
+        self.registry.unsubscribe('a.b.c', func)
+        self.assertEqual(self.registry.subscribers('a.b.c'), ())
+        self.assertEqual(self.registry._exact, {})
+        with self.assertRaises(KeyError):
+            self.registry.unsubscribe('a.b.c', func)
+
+    def test_invalid_pattern(self):
+        """ Test if patterns with empty segments are rejected.
+        """
+        for pattern in ('', 'a..b', '.a', 'a.'):
+            with self.assertRaises(ValueError):
+                self.registry.subscribe(pattern, lambda topic, payload: None)
+
+    def test_cache_size(self):
+        """ Test if the cache of resolved topics is bounded.
+        """
+        self.registry.max_cached = 10
+        self.registry.subscribe('**', lambda topic, payload: None)
+        for i in range(25):
+            self.assertEqual(len(self.registry.subscribers(str(i))), 1)
+        self.assertTrue(len(self.registry._resolved) <= 10)
+
+
+class TestPublish(unittest.TestCase):
+    def setUp(self):
+        self.evt_mgr = EventManager()
+
+    def test_publish(self):
+        """ Test if subscribers are called with the topic and payload.
+        """
+        callback = mock.Mock()
+        self.evt_mgr.subscribe('store.*.update', callback)
+        self.evt_mgr.publish('store.main.update', {'key': 'a'})
+        self.evt_mgr.publish('store.main.delete', {'key': 'a'})
+        self.evt_mgr.publish('store.main.update')
+        self.assertEqual(callback.call_args_list, [
+            (('store.main.update', {'key': 'a'}),),
+            (('store.main.update', None),)])
+
+        self.evt_mgr.unsubscribe('store.*.update', callback)
+        self.evt_mgr.publish('store.main.update')
+        self.assertEqual(callback.call_count, 2)
+
+    def test_method_weakref(self):
+        """ Test if subscribed methods do not keep their object alive.
+        """
+        listener = Listener()
+        self.evt_mgr.subscribe('a.b', listener.callback)
+        self.evt_mgr.subscribe('a.b', listener.callback, priority=1)
+        self.evt_mgr.publish('a.b', 1)
+        self.assertEqual(listener.calls, [('a.b', 1)])
+        subscriber = self.evt_mgr.topics.subscribers('a.b')[0]
+        self.assertEqual(subscriber(), listener.callback)
+
+        del listener
+        self.assertEqual(self.evt_mgr.topics.patterns(), [])
+        self.assertEqual(self.evt_mgr.topics.subscribers('a.b'), ())
+        self.assertIsNone(subscriber())
+
+    def test_errors(self):
+        """ Test if exceptions of subscribers are handled by the error policy.
+        """
+        evt_mgr = EventManager(error_policy=DisconnectPolicy(max_failures=2))
+        def failing(topic, payload):
+            raise ValueError('failure')
+        callback = mock.Mock()
+        evt_mgr.subscribe('a', failing, priority=1)
+        evt_mgr.subscribe('a', callback)
+        with mock.patch('encore.events.event_manager.logger'):
+            for i in range(3):
+                evt_mgr.publish('a')
+        self.assertEqual(callback.call_count, 3)
+        failures = evt_mgr.get_listener_failures()
+        self.assertEqual(failures[0].count, 2)
+        self.assertTrue(failures[0].disconnected)
+        self.assertEqual(evt_mgr.topics.subscribers('a')[0].pattern, 'a')
+        self.assertEqual(len(evt_mgr.topics.subscribers('a')), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
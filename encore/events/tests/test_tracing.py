@@ -0,0 +1,167 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+
+# Standard library imports.
+import json
+import os
+import unittest
+import mock
+from shutil import rmtree
+from tempfile import mkdtemp
+
+# Local imports.
+from encore.events.api import (BaseEvent, EventManager, DispatchTracer,
+    ChromeTraceExporter, RaisePolicy)
+
+
+class MyEvt(BaseEvent):
+    pass
+
+
+class RecordingTracer(DispatchTracer):
+    def __init__(self):
+        self.calls = []
+
+    def pre_dispatch(self, evt):
+        self.calls.append(('pre_dispatch', evt))
+
+    def post_dispatch(self, evt):
+        self.calls.append(('post_dispatch', evt))
+
+    def pre_listener(self, evt, listener):
+        self.calls.append(('pre_listener', listener))
+
+    def post_listener(self, evt, listener, exc):
+        self.calls.append(('post_listener', listener, exc))
+
+
+class Listener(object):
+    def callback(self, evt):
+        pass
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.evt_mgr = EventManager()
+
+    def test_hooks(self):
+        """ Test if the hooks of tracers are called around dispatch.
+        """
+        error = ValueError('failure')
+        def failing(evt):
+            raise error
+        callback = mock.Mock()
+        self.evt_mgr.connect(MyEvt, failing, priority=1)
+        self.evt_mgr.connect(BaseEvent, callback)
+        tracer = RecordingTracer()
+        self.evt_mgr.add_tracer(tracer)
+
+        evt = MyEvt()
+        with mock.patch('encore.events.event_manager.logger'):
+            self.evt_mgr.emit(evt)
+        self.assertEqual(tracer.calls, [
+            ('pre_dispatch', evt),
+            ('pre_listener', failing), ('post_listener', failing, error),
+            ('pre_listener', callback), ('post_listener', callback, None),
+            ('post_dispatch', evt)])
+        self.assertEqual(callback.call_count, 1)
+
+        self.evt_mgr.remove_tracer(tracer)
+        self.assertFalse(self.evt_mgr._instrumented)
+        with mock.patch('encore.events.event_manager.logger'):
+            self.evt_mgr.emit(evt)
+        self.assertEqual(len(tracer.calls), 6)
+        self.assertEqual(callback.call_count, 2)
+        with self.assertRaises(ValueError):
+            self.evt_mgr.remove_tracer(tracer)
+
+    def test_instrumented(self):
+        """ Test if the instrumented path is only taken when needed.
+        """
+        tracer = RecordingTracer()
+        self.assertFalse(self.evt_mgr._instrumented)
+        self.evt_mgr.enable_profiling()
+        self.evt_mgr.add_tracer(tracer)
+        self.evt_mgr.disable_profiling()
+        self.assertTrue(self.evt_mgr._instrumented)
+        self.evt_mgr.remove_tracer(tracer)
+        self.assertFalse(self.evt_mgr._instrumented)
+
+    def test_handled_and_raised(self):
+        """ Test if the spans are closed when dispatch stops early.
+        """
+        def handler(evt):
+            evt.mark_as_handled()
+        def failing(evt):
+            raise ValueError('failure')
+        callback = mock.Mock()
+        self.evt_mgr.connect(MyEvt, handler, priority=1)
+        self.evt_mgr.connect(MyEvt, callback)
+        tracer = RecordingTracer()
+        self.evt_mgr.add_tracer(tracer)
+        self.evt_mgr.emit(MyEvt())
+        self.assertEqual([call[0] for call in tracer.calls],
+            ['pre_dispatch', 'pre_listener', 'post_listener', 'post_dispatch'])
+        self.assertFalse(callback.called)
+
+        evt_mgr = EventManager(error_policy=RaisePolicy())
+        evt_mgr.connect(MyEvt, failing)
+        tracer = RecordingTracer()
+        evt_mgr.add_tracer(tracer)
+        with self.assertRaises(ValueError):
+            evt_mgr.emit(MyEvt())
+        self.assertEqual([call[0] for call in tracer.calls],
+            ['pre_dispatch', 'pre_listener', 'post_listener', 'post_dispatch'])
+
+
+class TestChromeTraceExporter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'trace.json')
+
+    def tearDown(self):
+        rmtree(self.tmpdir)
+
+    def test_export(self):
+        """ Test if dispatch is written as nested complete events.
+        """
+        times = iter(range(100))
+        exporter = ChromeTraceExporter(self.path, timer=lambda: next(times))
+        evt_mgr = EventManager()
+        listener = Listener()
+        def emit_nested(evt):
+            evt_mgr.emit(BaseEvent())
+        evt_mgr.connect(MyEvt, listener.callback, priority=1)
+        evt_mgr.connect(MyEvt, emit_nested)
+        evt_mgr.add_tracer(exporter)
+        evt_mgr.emit(MyEvt())
+        evt_mgr.remove_tracer(exporter)
+        exporter.close()
+
+        with open(self.path) as f:
+            trace = json.load(f)
+        spans = [(e['name'], e['cat'], e['ts'], e['dur']) for e in trace]
+        self.assertEqual(spans, [
+            ('Listener.callback', 'listener', 1e6, 1e6),
+            ('BaseEvent', 'emit', 4e6, 1e6),
+            ('emit_nested', 'listener', 3e6, 3e6),
+            ('MyEvt', 'emit', 0, 7e6)])
+        self.assertTrue(all(e['ph'] == 'X' for e in trace))
+        self.assertEqual(trace[0]['args'], {'event': 'MyEvt'})
+
+    def test_empty(self):
+        """ Test if a trace without events is valid.
+        """
+        exporter = ChromeTraceExporter(self.path)
+        exporter.close()
+        exporter.close()
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,266 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" This module defines string topic channels, a lightweight alternative to
+event classes for trivial notifications.
+
+Topics are dot separated strings, such as ``'store.main.update'``. Listeners
+subscribe to a topic pattern, whose segments may be ``*``, matching any single
+segment, or ``**``, matching any number of segments::
+
+    event_manager.subscribe('store.*.update', on_update)
+    event_manager.publish('store.main.update', {'key': 'a'})
+
+Subscribers are called with the topic and the payload. Publishing creates no
+event object and walks no class hierarchy: the subscribers of a topic are
+resolved once, from a dict of the exact patterns and a trie of the wildcard
+patterns, and cached until the subscriptions change.
+"""
+
+# Standard library imports.
+import threading
+from types import MethodType
+import weakref
+
+# Local imports.
+from .listener_refs import listener_id, weak_method_dispatch
+
+
+# The wildcards of topic patterns.
+ANY = '*'
+ANY_DEPTH = '**'
+
+
+def split_pattern(pattern):
+    """ Return the segments of a topic pattern, checking that none is empty.
+    """
+    segments = pattern.split('.')
+    if not all(segments):
+        raise ValueError('Invalid topic pattern {0!r}'.format(pattern))
+    return segments
+
+
+###############################################################################
+# `TopicSubscriber` Class.
+###############################################################################
+class TopicSubscriber(object):
+    """ Notifier of a topic subscriber, storing a weak reference to the
+    object of bound methods.
+
+    ``dispatch`` is the callable to call with a topic and a payload. Calling
+    the subscriber returns the listener, or None if it no longer exists.
+    """
+    __slots__ = ['pattern', 'func', 'obj', 'dispatch']
+
+    def __init__(self, pattern, func, notify=None):
+        self.pattern = pattern
+        if type(func) is MethodType and func.im_self is not None:
+            if notify is None:
+                ref = weakref.ref(func.im_self)
+            else:
+                ref = weakref.ref(func.im_self, lambda ref: notify(self))
+            self.obj = ref
+            self.func = func.im_func
+            self.dispatch = weak_method_dispatch(func.im_func, ref, 2)
+        else:
+            self.obj = None
+            self.func = func
+            self.dispatch = func
+
+    def __call__(self):
+        """ Return the listener, or None if its object has been garbage
+        collected.
+        """
+        if self.obj is None:
+            return self.func
+        obj = self.obj()
+        if obj is None:
+            return
+        return MethodType(self.func, obj, type(obj))
+
+    def __repr__(self):
+        return 'TopicSubscriber({0!r}, {1!r})'.format(self.pattern, self())
+
+
+###############################################################################
+# `_TrieNode` Private Class.
+###############################################################################
+class _TrieNode(object):
+    """ A node of the trie of wildcard patterns, for a pattern segment.
+    """
+    __slots__ = ['children', 'subscribers']
+
+    def __init__(self):
+        # {segment: _TrieNode}
+        self.children = {}
+        # {(pattern, id): key} of the patterns ending at the node
+        self.subscribers = {}
+
+
+###############################################################################
+# `TopicRegistry` Class.
+###############################################################################
+class TopicRegistry(object):
+    """ The subscriptions to topic patterns of an `EventManager`.
+
+    The subscribers of a topic are resolved under a lock and cached as a
+    tuple sorted by priority, which ``subscribers()`` returns without taking
+    the lock. The cache is cleared whenever the subscriptions change, and when
+    it exceeds ``max_cached`` topics. ``on_unsubscribe`` is called with each
+    unsubscribed, or replaced, `TopicSubscriber`.
+    """
+
+    def __init__(self, max_cached=10000, on_unsubscribe=None):
+        self.max_cached = max_cached
+        self.on_unsubscribe = on_unsubscribe
+        # {(pattern, id): (-priority, count, subscriber)}
+        self._keys = {}
+        # {pattern: {(pattern, id): key}} of the patterns without wildcards
+        self._exact = {}
+        self._trie = _TrieNode()
+        # {topic: tuple of subscribers}, replaced rather than cleared
+        self._resolved = {}
+        self._lock = threading.RLock()
+
+    def subscribe(self, pattern, func, priority=0, count=0):
+        """ Subscribe a listener to the topics matching a pattern.
+
+        Subscribing a listener to a pattern again replaces its priority.
+        """
+        segments = split_pattern(pattern)
+        sid = (pattern, listener_id(func))
+        subscriber = TopicSubscriber(pattern, func, self._subscriber_deleted)
+        key = (-priority, count, subscriber)
+        replaced = None
+        with self._lock:
+            if sid in self._keys:
+                replaced = self._remove(sid)
+            self._keys[sid] = key
+            if ANY in segments or ANY_DEPTH in segments:
+                node = self._trie
+                for segment in segments:
+                    child = node.children.get(segment)
+                    if child is None:
+                        child = node.children[segment] = _TrieNode()
+                    node = child
+                node.subscribers[sid] = key
+            else:
+                self._exact.setdefault(pattern, {})[sid] = key
+            self._resolved = {}
+        if replaced is not None:
+            self._unsubscribed(replaced)
+
+    def unsubscribe(self, pattern, func):
+        """ Unsubscribe a listener from a pattern.
+
+        Raises KeyError if the listener is not subscribed to the pattern.
+        """
+        sid = (pattern, listener_id(func))
+        with self._lock:
+            if sid not in self._keys:
+                raise KeyError(sid)
+            subscriber = self._remove(sid)
+            self._resolved = {}
+        self._unsubscribed(subscriber)
+
+    def remove_subscriber(self, subscriber):
+        """ Unsubscribe a listener given by its subscriber, if subscribed.
+
+        Returns whether it was subscribed.
+        """
+        with self._lock:
+            for sid, key in self._keys.items():
+                if key[-1] is subscriber:
+                    self._remove(sid)
+                    self._resolved = {}
+                    break
+            else:
+                return False
+        self._unsubscribed(subscriber)
+        return True
+
+    def subscribers(self, topic):
+        """ Return the tuple of the subscribers of a topic, in order of
+        priority.
+        """
+        subscribers = self._resolved.get(topic)
+        if subscribers is None:
+            subscribers = self._resolve(topic)
+        return subscribers
+
+    def patterns(self):
+        """ Return the list of the patterns with subscribers.
+        """
+        return sorted(set([pattern for pattern, id in self._keys]))
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+    def _subscriber_deleted(self, subscriber):
+        """ Unsubscribe a method whose object was garbage collected.
+        """
+        self.remove_subscriber(subscriber)
+
+    def _unsubscribed(self, subscriber):
+        """ Notify the owner of an unsubscribed subscriber.
+        """
+        if self.on_unsubscribe is not None:
+            self.on_unsubscribe(subscriber)
+
+    def _remove(self, sid):
+        """ Remove a subscription, with the lock held, and return its
+        subscriber.
+        """
+        subscriber = self._keys.pop(sid)[-1]
+        pattern = sid[0]
+        bucket = self._exact.get(pattern)
+        if bucket is not None:
+            del bucket[sid]
+            if not bucket:
+                del self._exact[pattern]
+            return subscriber
+        path = [self._trie]
+        for segment in split_pattern(pattern):
+            path.append(path[-1].children[segment])
+        del path[-1].subscribers[sid]
+        # Prune the nodes left empty.
+        segments = split_pattern(pattern)
+        for index in range(len(segments), 0, -1):
+            node = path[index]
+            if node.subscribers or node.children:
+                break
+            del path[index - 1].children[segments[index - 1]]
+        return subscriber
+
+    def _resolve(self, topic):
+        """ Compute and cache the subscribers of a topic.
+        """
+        with self._lock:
+            matched = dict(self._exact.get(topic, {}))
+            if self._trie.children:
+                self._match(self._trie, topic.split('.'), 0, matched)
+            subscribers = tuple([key[-1] for key in sorted(matched.values())])
+            resolved = self._resolved
+            if len(resolved) >= self.max_cached:
+                resolved = self._resolved = {}
+            resolved[topic] = subscribers
+        return subscribers
+
+    def _match(self, node, segments, index, matched):
+        """ Add the subscriptions of the trie below ``node`` matching the
+        segments of a topic from ``index``.
+        """
+        deep = node.children.get(ANY_DEPTH)
+        if deep is not None:
+            for start in range(index, len(segments) + 1):
+                self._match(deep, segments, start, matched)
+        if index == len(segments):
+            matched.update(node.subscribers)
+            return
+        for segment in (segments[index], ANY):
+            child = node.children.get(segment)
+            if child is not None:
+                self._match(child, segments, index + 1, matched)
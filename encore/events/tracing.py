@@ -0,0 +1,156 @@
+#
+# (C) Copyright 2011 Enthought, Inc., Austin, TX
+# All right reserved.
+#
+# This file is open source software distributed according to the terms in LICENSE.txt
+#
+""" This module defines the tracing of event dispatch.
+
+Tracers are notified before and after each event is dispatched by an
+`EventManager`, and before and after each of its listeners is called::
+
+    exporter = ChromeTraceExporter('trace.json')
+    event_manager.add_tracer(exporter)
+    ...
+    event_manager.remove_tracer(exporter)
+    exporter.close()
+
+The `ChromeTraceExporter` writes the dispatch of events and the calls of
+listeners as nested spans in the trace event format of Chrome, which can be
+loaded in ``chrome://tracing`` or other trace viewers.
+
+The event manager only takes the instrumented dispatch path while tracers
+are installed or profiling is enabled, so tracing costs nothing otherwise.
+"""
+
+# Standard library imports.
+import json
+import os
+import threading
+from timeit import default_timer
+
+
+def listener_name(listener):
+    """ A readable name of a listener, such as ``'Class.method'``.
+    """
+    name = getattr(listener, '__name__', None)
+    if name is None:
+        return repr(listener)
+    cls = getattr(listener, 'im_class', None)
+    if cls is not None:
+        return '{0}.{1}'.format(cls.__name__, name)
+    return name
+
+
+###############################################################################
+# `DispatchTracer` Class.
+###############################################################################
+class DispatchTracer(object):
+    """ Base class of tracers, whose hooks do nothing.
+
+    The hooks are called in the thread dispatching the event, and must not
+    raise exceptions.
+    """
+
+    def pre_dispatch(self, evt):
+        """ Called before the listeners of an event are notified.
+        """
+
+    def post_dispatch(self, evt):
+        """ Called after the listeners of an event are notified.
+        """
+
+    def pre_listener(self, evt, listener):
+        """ Called before a listener is notified of an event.
+        """
+
+    def post_listener(self, evt, listener, exc):
+        """ Called after a listener is notified of an event.
+
+        ``exc`` is the exception raised by the listener, or None.
+        """
+
+
+###############################################################################
+# `ChromeTraceExporter` Class.
+###############################################################################
+class ChromeTraceExporter(DispatchTracer):
+    """ Writes event dispatch spans to a file in the Chrome trace event format.
+
+    Each dispatched event is a complete event (``"ph": "X"``) named after the
+    class of the event, containing the complete events of its listeners. The
+    file is a JSON array of trace events, written as events are dispatched.
+    """
+
+    def __init__(self, path, timer=default_timer):
+        """ Constructor.
+
+        Parameters:
+        -----------
+        path : str
+            The path of the trace file to write.
+        timer : callable
+            A function returning the current time in seconds.
+        """
+        self.path = path
+        self.timer = timer
+        self._file = open(path, 'w')
+        self._file.write('[')
+        self._first = True
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+    def pre_dispatch(self, evt):
+        self._stack().append(self.timer())
+
+    def post_dispatch(self, evt):
+        start = self._stack().pop()
+        self._write(type(evt).__name__, 'emit', start, self.timer(),
+                    {'handled': evt._handled})
+
+    def pre_listener(self, evt, listener):
+        self._stack().append(self.timer())
+
+    def post_listener(self, evt, listener, exc):
+        start = self._stack().pop()
+        args = {'event': type(evt).__name__}
+        if exc is not None:
+            args['exception'] = repr(exc)
+        self._write(listener_name(listener), 'listener', start, self.timer(),
+                    args)
+
+    def close(self):
+        """ Terminate and close the trace file.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(']\n')
+                self._file.close()
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+    def _stack(self):
+        """ The start times of the spans open in the current thread.
+        """
+        try:
+            return self._local.stack
+        except AttributeError:
+            stack = self._local.stack = []
+            return stack
+
+    def _write(self, name, category, start, end, args):
+        record = json.dumps({'name': name, 'cat': category, 'ph': 'X',
+                             'ts': start * 1e6, 'dur': (end - start) * 1e6,
+                             'pid': self._pid,
+                             'tid': threading.current_thread().ident,
+                             'args': args})
+        with self._lock:
+            if self._file.closed:
+                return
+            if self._first:
+                self._first = False
+            else:
+                self._file.write(',\n')
+            self._file.write(record)
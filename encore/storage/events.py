@@ -10,16 +10,25 @@ from encore.events.api import (BaseEvent, ProgressEvent, ProgressStartEvent,
 
 
 class StoreEvent(BaseEvent):
-    pass
+    __slots__ = ()
 
 class StoreTransactionEvent(StoreEvent):
-    pass
+    __slots__ = ()
 
 class StoreTransactionStartEvent(StoreTransactionEvent):
-    pass
+    __slots__ = ()
 
 class StoreTransactionEndEvent(StoreTransactionEvent):
-    pass
+    """ Emitted at the end of a transaction.
+
+    Attributes
+    ----------
+
+    state : string
+        Either 'done' if the transaction was committed, or 'failed'.
+
+    """
+    __fields__ = ('state',)
 
 class StoreKeyEvent(StoreEvent):
     """ An abstract base class for evenst related to a particular key in the
@@ -36,9 +45,11 @@ class StoreKeyEvent(StoreEvent):
         The metadata of the key which is involved in the event.
         
     """
+    __fields__ = ('key', 'metadata')
+    __slots__ = ()
 
 class StoreModificationEvent(StoreKeyEvent):
-    pass
+    __slots__ = ()
 
 class StoreSetEvent(StoreModificationEvent):
     pass
@@ -50,7 +61,7 @@ class StoreDeleteEvent(StoreModificationEvent):
     pass
 
 class StoreProgressEvent(ProgressEvent, StoreKeyEvent):
-    pass
+    __slots__ = ()
 
 class StoreProgressStartEvent(ProgressStartEvent, StoreProgressEvent):
     """
@@ -89,7 +89,7 @@ class SimpleTransactionContext(object):
             if exc_value is None:
                 for event in self._events:
                     event._handled = False # Yikes!
-                    self.store.event_manager.emit(event)
+                self.store.event_manager.emit_many(self._events)
         return False
 
     def begin(self):